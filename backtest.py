@@ -1,73 +1,182 @@
 import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
+import torch
 import json
 import os
+import shutil
+import tempfile
+import time
+from contextlib import contextmanager
 from stable_baselines3 import PPO
 from trading_env import TradingEnv
 from config import get_asset_config
+from feature_pipeline import load_features
+from metrics import calculate_metrics  # re-exported: backtest.calculate_metrics
+from backtest_cache import backtest_cache_key, cached_backtest, chart_path, store_chart
+from backtest_snapshot import run_incremental
 
-def calculate_metrics(net_worths, steps_per_day=96):
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+RESULTS_FILE = "reports/results_summary.json"
+
+class ModelLoadError(Exception):
+    """PPO.load failed on the checkpoint (corrupt or incompatible zip)."""
+
+@contextmanager
+def _file_lock(path, timeout=60.0):
+    """Exclusive lock on <path>.lock (flock; O_EXCL lock file where fcntl is missing)."""
+    lock_path = path + ".lock"
+    if fcntl is not None:
+        with open(lock_path, "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+        return
+
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            break
+        except FileExistsError:
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"Could not lock {path} (stale {lock_path}?)")
+            time.sleep(0.05)
+    try:
+        yield
+    finally:
+        os.close(fd)
+        os.remove(lock_path)
+
+def update_results(updates, results_file=RESULTS_FILE):
     """
-    Calculate extensive financial metrics.
+    Merge {key: entry} into the results JSON: locked read-modify-write plus an atomic
+    replace, so concurrent backtests never clobber each other or leave a torn file.
     """
-    returns = np.diff(net_worths) / net_worths[:-1]
+    directory = os.path.dirname(results_file) or "."
+    os.makedirs(directory, exist_ok=True)
+    with _file_lock(results_file):
+        current_results = {}
+        if os.path.exists(results_file):
+            with open(results_file, 'r') as f:
+                try:
+                    current_results = json.load(f)
+                except json.JSONDecodeError:
+                    current_results = {}
+        current_results.update(updates)
+
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".results_", suffix=".json")
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump(current_results, f, indent=4)
+            os.replace(tmp_path, results_file)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+    return current_results
+
+def resolve_env_params(asset_name):
+    """TradingEnv params of the asset's specialist config (default commission only as fallback)."""
+    config = get_asset_config(asset_name)
+    if config:
+        print(f"🎯 Config loaded for {asset_name}: {config.env_params}")
+        return config.env_params
+    # Fallback for BTC or Testing
+    print(f"⚠️ No specialist config found. Using default params.")
+    return {"commission": 0.0005}
+
+def run_episode(env, model):
+    """Run the model deterministically over the whole env; returns (net_worths array, executed trades)."""
+    obs, info = env.reset()
+    done = False
+    truncated = False
     
-    # 1. Total Return
-    initial = net_worths[0]
-    final = net_worths[-1]
-    total_return_pct = ((final - initial) / initial) * 100
+    net_worths = []
+    real_trades = 0
     
-    # 2. Annualized Return (Approximate)
-    days = len(net_worths) / steps_per_day
-    years = days / 252
-    if years > 0:
-        cagr = ((final / initial) ** (1 / years)) - 1
-    else:
-        cagr = 0
+    while not done and not truncated:
+        action, _states = model.predict(obs, deterministic=True)
+        if hasattr(action, 'item'): action = int(action.item())
         
-    # 3. Sharpe Ratio
-    risk_free_rate = 0.0
-    excess_returns = returns - risk_free_rate/ (252*steps_per_day)
-    sharpe = np.mean(excess_returns) / (np.std(returns) + 1e-9) * np.sqrt(252 * steps_per_day)
-    
-    # 4. Sortino Ratio
-    negative_returns = returns[returns < 0]
-    downside_std = np.std(negative_returns) if len(negative_returns) > 0 else 1e-9
-    sortino = np.mean(excess_returns) / (downside_std + 1e-9) * np.sqrt(252 * steps_per_day)
+        obs, reward, done, truncated, info = env.step(action)
+        if info.get('trade_executed', False): real_trades += 1
+        net_worths.append(info['net_worth'])
+    return np.array(net_worths), real_trades
+
+def batched_actions(model, obs_batch, tie_tolerance=1e-4):
+    """
+    Deterministic actions for a stack of observations in one policy forward pass.
+    Batched matmuls round differently from batch-of-one calls (~1e-7 on the logits),
+    so rows whose two best logits are closer than tie_tolerance are re-run through
+    model.predict alone: the actions always match per-env model.predict exactly.
+    """
+    policy = model.policy
+    with torch.no_grad():
+        obs_tensor, _ = policy.obs_to_tensor(obs_batch)
+        logits = policy.get_distribution(obs_tensor).distribution.logits.cpu().numpy()
+    actions = logits.argmax(axis=1)
+    top2 = np.sort(logits, axis=1)[:, -2:]
+    for row in np.flatnonzero(top2[:, 1] - top2[:, 0] < tie_tolerance):
+        action, _states = model.predict(obs_batch[row], deterministic=True)
+        actions[row] = int(action.item()) if hasattr(action, 'item') else int(action)
+    return actions
+
+def run_episodes_lockstep(envs, model):
+    """
+    Step K independent envs (other assets, date ranges or env_params) together with one
+    batched forward pass per step; finished envs drop out of the batch.
+    Returns [(net_worths array, executed trades)] in env order, identical to run_episode.
+    """
+    obs = [env.reset()[0] for env in envs]
+    net_worths = [[] for _ in envs]
+    real_trades = [0] * len(envs)
+    active = list(range(len(envs)))
+
+    while active:
+        actions = batched_actions(model, np.stack([obs[i] for i in active]))
+        still_running = []
+        for i, action in zip(active, actions):
+            obs[i], reward, done, truncated, info = envs[i].step(int(action))
+            if info.get('trade_executed', False): real_trades[i] += 1
+            net_worths[i].append(info['net_worth'])
+            if not done and not truncated:
+                still_running.append(i)
+        active = still_running
+    return [(np.array(nw), trades) for nw, trades in zip(net_worths, real_trades)]
+
+def plot_equity(net_worths, initial_balance, metrics, title, chart_dest):
+    plt.figure(figsize=(12, 6))
+    plt.plot(net_worths, label='Equity Curve', color='#00ffcc', linewidth=2)
+    plt.axhline(y=initial_balance, color='white', linestyle='--', alpha=0.5)
     
-    # 5. Max Drawdown & Duration
-    running_max = np.maximum.accumulate(net_worths)
-    drawdowns = (running_max - net_worths) / running_max
-    max_drawdown_pct = drawdowns.max() * 100
+    title_text = (f"{title} | Ret: {metrics['return_pct']:.2f}% | Sharpe: {metrics['sharpe']:.2f} | "
+                  f"Sortino: {metrics['sortino']:.2f} | DD: {metrics['max_drawdown_pct']:.2f}%")
     
-    # Drawdown Duration (in steps)
-    is_drawdown = drawdowns > 0
-    current_duration = 0
-    max_duration = 0
-    for in_dd in is_drawdown:
-        if in_dd:
-            current_duration += 1
-        else:
-            max_duration = max(max_duration, current_duration)
-            current_duration = 0
-    max_duration = max(max_duration, current_duration)
+    plt.title(title_text, fontsize=12, color='white')
+    plt.xlabel('Steps', color='white')
+    plt.ylabel('Net Worth ($)', color='white')
+    plt.grid(True, alpha=0.1)
+    plt.legend()
     
-    # 6. Calmar Ratio
-    calmar = cagr / (max_drawdown_pct / 100) if max_drawdown_pct > 0 else 0
+    plt.gcf().set_facecolor('#1e1e1e')
+    plt.gca().set_facecolor('#2d2d2d')
+    plt.gca().tick_params(colors='white')
     
-    return {
-        "return_pct": total_return_pct,
-        "cagr": cagr * 100,
-        "sharpe": sharpe,
-        "sortino": sortino,
-        "calmar": calmar,
-        "max_drawdown_pct": max_drawdown_pct,
-        "max_dd_duration_steps": max_duration,
-        "max_dd_duration_days": max_duration / steps_per_day
-    }
+    plt.savefig(chart_dest, facecolor='#1e1e1e')
+    plt.close()
 
-def run_backtest(asset_name="BTC", model_path=None, data_path=None, chart_name=None):
+def run_backtest(asset_name="BTC", model_path=None, data_path=None, chart_name=None, use_cache=True,
+                 incremental=False):
+    """
+    use_cache: reuse the stored result when model, data and env_params are unchanged.
+    incremental: resume from the last snapshot and only simulate candles appended since.
+    """
     asset_name = asset_name.upper()
     
     # Default paths if not provided
@@ -82,104 +191,78 @@ def run_backtest(asset_name="BTC", model_path=None, data_path=None, chart_name=N
 
     print(f"📊 Running Backtest for {asset_name} using {model_path}...")
     
-    # Load Data
     if not os.path.exists(data_path):
         print(f"❌ Data file not found: {data_path}")
         return
-    df = pd.read_csv(data_path)
+    if not os.path.exists(model_path):
+        print(f"❌ Could not load model: {model_path} not found")
+        return
 
     # Load Config (Professional Refactor)
-    config = get_asset_config(asset_name)
-    if config:
-        print(f"🎯 Config loaded for {asset_name}: {config.env_params}")
-        env_params = config.env_params
-    else:
-         # Fallback for BTC or Testing
-         env_params = {"commission": 0.0005} 
-         print(f"⚠️ No specialist config found. Using default params.")
-    
-    env = TradingEnv(df, **env_params)
-    
-    # Load Model
+    env_params = resolve_env_params(asset_name)
+
+    def simulate():
+        df = load_features(data_path) # Cached indicators + observation features
+        env = TradingEnv(df, **env_params)
+        try:
+            model = PPO.load(model_path)
+        except Exception as e:
+            raise ModelLoadError(e) from e
+        if incremental:
+            net_worths, real_trades, _, resumed_step = run_incremental(model, env, model_path, data_path, env_params)
+            if resumed_step is not None:
+                print(f"⏩ Reanudado desde la vela {resumed_step} (solo velas nuevas)")
+        else:
+            net_worths, real_trades = run_episode(env, model)
+        # Full Metric Analysis
+        return net_worths, {"initial_balance": env.initial_balance, "total_trades": real_trades,
+                            "metrics": calculate_metrics(net_worths)}
+
+    # Same model zip + data file + env_params -> cached result (and chart), no simulation
+    key = backtest_cache_key(model_path, data_path, env_params) if use_cache else None
     try:
-        model = PPO.load(model_path)
-    except Exception as e:
+        net_worths, info, hit = cached_backtest(model_path, data_path, env_params, simulate, use_cache=use_cache,
+                                                key=key)
+    except ModelLoadError as e:
         print(f"❌ Could not load model: {e}")
         return
+    if hit:
+        print("⚡ Resultado en caché (modelo, datos y parámetros sin cambios)")
+    metrics = info["metrics"]
     
-    obs, info = env.reset()
-    done = False
-    truncated = False
-    
-    net_worths = []
-    real_trades = 0
-    
-    while not done and not truncated:
-        action, _states = model.predict(obs, deterministic=True)
-        if hasattr(action, 'item'): action = int(action.item())
-        
-        obs, reward, done, truncated, info = env.step(action)
-        if info.get('trade_executed', False): real_trades += 1
-        net_worths.append(info['net_worth'])
-        
-    # Full Metric Analysis
-    net_worths = np.array(net_worths)
-    metrics = calculate_metrics(net_worths)
-    
-    # Save Results Data
+    # Save Results Data (locked + atomic: safe with concurrent backtests)
     os.makedirs("reports", exist_ok=True)
-    results_file = "reports/results_summary.json"
-    
-    current_results = {}
-    if os.path.exists(results_file):
-        with open(results_file, 'r') as f:
-            try:
-                current_results = json.load(f)
-            except:
-                current_results = {}
-                
-    current_results[asset_name] = {
-        "initial_balance": env.initial_balance,
+    entry = {
+        "initial_balance": info["initial_balance"],
         "final_balance": net_worths[-1],
-        "total_trades": real_trades,
+        "total_trades": info["total_trades"],
         "chart_path": f"reports/{chart_name}",
         **metrics # Unpack all new metrics
     }
+    update_results({asset_name: entry})
     
-    with open(results_file, 'w') as f:
-        json.dump(current_results, f, indent=4)
-    
-    # Plotting
-    plt.figure(figsize=(12, 6))
-    plt.plot(net_worths, label='Equity Curve', color='#00ffcc', linewidth=2)
-    plt.axhline(y=env.initial_balance, color='white', linestyle='--', alpha=0.5)
-    
-    title_text = (f"{asset_name} | Ret: {metrics['return_pct']:.2f}% | Sharpe: {metrics['sharpe']:.2f} | "
-                  f"Sortino: {metrics['sortino']:.2f} | DD: {metrics['max_drawdown_pct']:.2f}%")
-    
-    plt.title(title_text, fontsize=12, color='white')
-    plt.xlabel('Steps', color='white')
-    plt.ylabel('Net Worth ($)', color='white')
-    plt.grid(True, alpha=0.1)
-    plt.legend()
-    
-    plt.gcf().set_facecolor('#1e1e1e')
-    plt.gca().set_facecolor('#2d2d2d')
-    plt.gca().tick_params(colors='white')
-    
+    # Plotting (a cache hit copies the chart rendered with the result)
     chart_dest = f"reports/{chart_name}"
-    plt.savefig(chart_dest, facecolor='#1e1e1e')
-    plt.close()
+    if hit and os.path.exists(chart_path(key, asset_name)):
+        shutil.copyfile(chart_path(key, asset_name), chart_dest)
+    else:
+        plot_equity(net_worths, info["initial_balance"], metrics, asset_name, chart_dest)
+        if key is not None:
+            store_chart(key, asset_name, chart_dest)
 
     print(f"✅ {asset_name} Backtest Complete.")
     print(f"   Return: {metrics['return_pct']:.2f}%")
     print(f"   Sharpe: {metrics['sharpe']:.2f} | Sortino: {metrics['sortino']:.2f}")
     print(f"   Calmar: {metrics['calmar']:.2f} | Max DD: {metrics['max_drawdown_pct']:.2f}%")
     print(f"   Deepest Drawdown Duration: {metrics['max_dd_duration_days']:.1f} days")
+    return entry
 
 if __name__ == "__main__":
     import sys
-    asset = sys.argv[1].upper() if len(sys.argv) > 1 else "BTC"
-    model = sys.argv[2] if len(sys.argv) > 2 else None
-    chart = sys.argv[3] if len(sys.argv) > 3 else None
-    run_backtest(asset, model_path=model, chart_name=chart)
+    flags = {arg for arg in sys.argv[1:] if arg.startswith("--")}  # --no-cache, --incremental
+    args = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    asset = args[0].upper() if len(args) > 0 else "BTC"
+    model = args[1] if len(args) > 1 else None
+    chart = args[2] if len(args) > 2 else None
+    run_backtest(asset, model_path=model, chart_name=chart, use_cache="--no-cache" not in flags,
+                 incremental="--incremental" in flags)
@@ -0,0 +1,88 @@
+"""
+Backtest Cache
+Content-addressed store of backtest outputs (equity curve, trades, metrics) keyed by
+the model zip, the data file and the env_params, so re-running an unchanged
+backtest loads the result instead of simulating again
+"""
+import hashlib
+import json
+import os
+import shutil
+
+import numpy as np
+
+from feature_pipeline import FEATURE_VERSION, file_sha256
+
+# Bump when TradingEnv / run_episode / calculate_metrics change so stale results are never reused
+BACKTEST_VERSION = 1
+CACHE_DIR = ".backtest_cache"
+
+
+def backtest_cache_key(model_path, data_path, env_params):
+    """sha256 of the model zip + data file bytes + env_params + code versions."""
+    digest = hashlib.sha256()
+    digest.update(file_sha256(model_path).digest())
+    digest.update(file_sha256(data_path).digest())
+    spec = json.dumps({"env_params": env_params, "backtest_version": BACKTEST_VERSION,
+                       "feature_version": FEATURE_VERSION}, sort_keys=True, default=str)
+    digest.update(spec.encode())
+    return digest.hexdigest()
+
+
+def _paths(key, cache_dir):
+    base = os.path.join(cache_dir, key)
+    return f"{base}.npy", f"{base}.json"
+
+
+def load_result(key, cache_dir=CACHE_DIR):
+    """(net_worths, info) for a cached backtest, or None. info: total_trades, metrics, initial_balance."""
+    curve_path, info_path = _paths(key, cache_dir)
+    # info is written last: its presence means the entry is complete
+    if not os.path.exists(info_path):
+        return None
+    with open(info_path, 'r') as f:
+        info = json.load(f)
+    return np.load(curve_path), info
+
+
+def store_result(key, net_worths, info, cache_dir=CACHE_DIR):
+    """Save a backtest result atomically (curve first, then the JSON that marks it complete)."""
+    os.makedirs(cache_dir, exist_ok=True)
+    curve_path, info_path = _paths(key, cache_dir)
+    suffix = f".{os.getpid()}.tmp"
+    with open(curve_path + suffix, 'wb') as f:
+        np.save(f, np.asarray(net_worths))
+    os.replace(curve_path + suffix, curve_path)
+    with open(info_path + suffix, 'w') as f:
+        json.dump(info, f, indent=4, default=float)
+    os.replace(info_path + suffix, info_path)
+
+
+def chart_path(key, title, cache_dir=CACHE_DIR):
+    """Equity chart stored with a result (per title: the chart names the asset, the key does not)."""
+    return os.path.join(cache_dir, f"{key}.{title.lower()}.png")
+
+
+def store_chart(key, title, chart_src, cache_dir=CACHE_DIR):
+    """Copy a rendered chart next to its cached result (atomically, like store_result)."""
+    os.makedirs(cache_dir, exist_ok=True)
+    dest = chart_path(key, title, cache_dir)
+    shutil.copyfile(chart_src, dest + f".{os.getpid()}.tmp")
+    os.replace(dest + f".{os.getpid()}.tmp", dest)
+
+
+def cached_backtest(model_path, data_path, env_params, simulate, cache_dir=CACHE_DIR, use_cache=True, key=None):
+    """
+    Return (net_worths, info, hit). On a miss simulate() -> (net_worths, info) is run and stored.
+    key: backtest_cache_key() when the caller already computed it.
+    """
+    if not use_cache:
+        net_worths, info = simulate()
+        return net_worths, info, False
+    key = key or backtest_cache_key(model_path, data_path, env_params)
+    cached = load_result(key, cache_dir)
+    if cached is not None:
+        return cached[0], cached[1], True
+    net_worths, info = simulate()
+    store_result(key, net_worths, info, cache_dir)
+    return net_worths, info, False
@@ -0,0 +1,138 @@
+"""
+Backtest Snapshots
+Resumable backtests: the TradingEnv state, the last observation window and the metric
+accumulator are saved before the final candle, so when new candles are appended to the
+data file the next run restores them and only simulates the new rows
+"""
+import hashlib
+import json
+import os
+
+import numpy as np
+
+from feature_pipeline import file_sha256
+from metrics import MetricsAccumulator
+
+SNAPSHOT_DIR = ".backtest_snapshots"
+SNAPSHOT_VERSION = 1
+
+
+def _prefix_sha256(path, n_bytes):
+    """sha256 of the first n_bytes of the file (None if the file is shorter)."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        remaining = n_bytes
+        while remaining:
+            chunk = f.read(min(1 << 20, remaining))
+            if not chunk:
+                return None
+            digest.update(chunk)
+            remaining -= len(chunk)
+    return digest.hexdigest()
+
+
+def snapshot_path(model_sha, data_path, env_params, snapshot_dir=SNAPSHOT_DIR):
+    """One snapshot per (model, data file, env_params)."""
+    spec = json.dumps({"model": model_sha, "data": os.path.abspath(data_path), "env_params": env_params},
+                      sort_keys=True, default=str)
+    return os.path.join(snapshot_dir, hashlib.sha256(spec.encode()).hexdigest()[:24] + ".npz")
+
+
+def save_snapshot(path, meta, net_worths, last_obs):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        np.savez(f, net_worths=np.asarray(net_worths, dtype=np.float64), last_obs=last_obs,
+                 meta=np.array(json.dumps(meta)))
+    os.replace(tmp_path, path)
+
+
+def load_snapshot(path):
+    """(meta, net_worths, last_obs) or None."""
+    if not os.path.exists(path):
+        return None
+    with np.load(path) as data:
+        return json.loads(str(data['meta'])), data['net_worths'], data['last_obs']
+
+
+def _resume_point(snapshot, env, model_sha, data_path, env_params):
+    """The snapshot if it belongs to this model/params and the data file only grew since; else None."""
+    if snapshot is None:
+        return None
+    meta, net_worths, last_obs = snapshot
+    if (meta['version'] != SNAPSHOT_VERSION or meta['model_sha'] != model_sha
+            or json.dumps(meta['env_params'], sort_keys=True) != json.dumps(env_params, sort_keys=True, default=str)
+            or _prefix_sha256(data_path, meta['data_bytes']) != meta['data_sha']):
+        return None
+    if not meta['terminated'] and meta['env_state']['current_step'] > env.end_step:
+        return None
+    return snapshot
+
+
+def run_incremental(model, env, model_path, data_path, env_params, snapshot_dir=SNAPSHOT_DIR):
+    """
+    run_episode() that resumes from the saved snapshot when the data file was only appended to.
+
+    The last candle's step is always re-simulated: its net worth uses the next close, which
+    did not exist yet. A resumed run is identical to a full replay (the restored observation
+    window is checked against the saved one; any mismatch falls back to a full replay).
+    Returns (net_worths array, executed trades, MetricsAccumulator, resumed step or None).
+    """
+    model_sha = file_sha256(model_path).hexdigest()
+    path = snapshot_path(model_sha, data_path, env_params, snapshot_dir)
+    snapshot = _resume_point(load_snapshot(path), env, model_sha, data_path, env_params)
+
+    resumed_step = None
+    if snapshot is not None:
+        meta, saved_curve, last_obs = snapshot
+        if meta['terminated']:
+            # Account blown before the end of the data: appended candles change nothing
+            return (saved_curve, meta['real_trades'], MetricsAccumulator.from_state(meta['accumulator']),
+                    meta['env_state']['current_step'])
+        obs = env.set_state(meta['env_state'])
+        if np.array_equal(obs, last_obs):
+            resumed_step = env.current_step
+            net_worths = list(saved_curve)
+            real_trades = meta['real_trades']
+            acc = MetricsAccumulator.from_state(meta['accumulator'])
+    if resumed_step is None:
+        obs, info = env.reset()
+        net_worths = []
+        real_trades = 0
+        acc = MetricsAccumulator()
+
+    pending = None
+    done = truncated = False
+    while not done and not truncated:
+        if env.current_step == env.end_step:
+            # Snapshot before the last candle's step (its outcome depends on the next candle)
+            pending = (env.get_state(), obs.copy(), len(net_worths), real_trades, acc.get_state())
+
+        action, _states = model.predict(obs, deterministic=True)
+        if hasattr(action, 'item'): action = int(action.item())
+
+        obs, reward, done, truncated, info = env.step(action)
+        if info.get('trade_executed', False): real_trades += 1
+        net_worths.append(info['net_worth'])
+        acc.update(info['net_worth'])
+
+    terminated = pending is None
+    if terminated:
+        # Ended before the last candle: this is the final result
+        pending = (env.get_state(), obs.copy(), len(net_worths), real_trades, acc.get_state())
+    env_state, last_obs, n_saved, saved_trades, acc_state = pending
+
+    data_bytes = os.path.getsize(data_path)
+    meta = {
+        "version": SNAPSHOT_VERSION,
+        "model_sha": model_sha,
+        "env_params": env_params,
+        "data_bytes": data_bytes,
+        "data_sha": _prefix_sha256(data_path, data_bytes),
+        "env_state": env_state,
+        "real_trades": saved_trades,
+        "accumulator": acc_state,
+        "terminated": terminated,
+    }
+    save_snapshot(path, meta, net_worths[:n_saved], last_obs)
+    return np.array(net_worths), real_trades, acc, resumed_step
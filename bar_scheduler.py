@@ -0,0 +1,86 @@
+"""
+Bar Scheduler
+Wakes the live loops right after each 15m candle closes (plus the data provider's
+publication delay) instead of sleeping a fixed interval that drifts against the bar
+boundaries; polls quickly until the new candle shows up, then goes idle again
+"""
+import math
+import time
+from datetime import datetime, timezone
+
+import pandas as pd
+
+CANDLE_SECONDS = 15 * 60
+# Seconds after the close until a provider serves the closed candle
+PUBLISH_DELAY = {"binance": 2.0, "yfinance": 20.0}
+
+
+class SystemClock:
+    """Wall clock; the replay harness (live_replay.py) swaps in a simulated one."""
+
+    def now(self):
+        return datetime.now()
+
+    def time(self):
+        return time.time()
+
+    def sleep(self, seconds):
+        time.sleep(seconds)
+
+
+def epoch_seconds(timestamp):
+    """Epoch seconds of a candle timestamp (naive values are UTC, as served by the providers)."""
+    timestamp = pd.Timestamp(timestamp)
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.tz_localize(timezone.utc)
+    return timestamp.timestamp()
+
+
+class BarScheduler:
+    """
+    sleep(last_closed_ts) after every cycle, with the open time of the newest closed
+    candle the cycle saw (None if it got no data):
+    - the candle that closed last is missing: retry every retry_seconds, for up to
+      max_retry_seconds after the close
+    - otherwise: idle until the next close + publish_delay (or tick_seconds, if set,
+      for loops that also act on intra-candle prices)
+    """
+
+    def __init__(self, clock=None, bar_seconds=CANDLE_SECONDS, publish_delay=PUBLISH_DELAY["binance"],
+                 retry_seconds=3.0, max_retry_seconds=120.0, tick_seconds=None):
+        self.clock = clock or SystemClock()
+        self.bar_seconds = bar_seconds
+        self.publish_delay = publish_delay
+        self.retry_seconds = retry_seconds
+        self.max_retry_seconds = max_retry_seconds
+        self.tick_seconds = tick_seconds
+
+    def last_close(self, now):
+        """Epoch seconds of the latest bar boundary at or before now."""
+        return math.floor(now / self.bar_seconds) * self.bar_seconds
+
+    def bar_ready(self, now, last_closed_ts):
+        """True if the candle that closed at last_close(now) has been seen."""
+        if last_closed_ts is None:
+            return False
+        return epoch_seconds(last_closed_ts) >= self.last_close(now) - self.bar_seconds
+
+    def delay(self, now, last_closed_ts):
+        """Seconds to sleep from now."""
+        close = self.last_close(now)
+        if not self.bar_ready(now, last_closed_ts):
+            if now < close + self.publish_delay:
+                return close + self.publish_delay - now
+            if now < close + self.publish_delay + self.max_retry_seconds:
+                return self.retry_seconds
+
+        wake = close + self.bar_seconds + self.publish_delay
+        if self.tick_seconds:
+            wake = min(wake, now + self.tick_seconds)
+        return max(wake - now, 0.0)
+
+    def sleep(self, last_closed_ts):
+        """Sleep on the clock until the next cycle is due; returns the seconds slept."""
+        seconds = self.delay(self.clock.time(), last_closed_ts)
+        self.clock.sleep(seconds)
+        return seconds
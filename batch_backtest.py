@@ -0,0 +1,222 @@
+"""
+Batch Backtest
+Runs every combination of assets x model checkpoints x env_params on a pool of worker
+processes and merges each result into one JSON as soon as it finishes (locked, atomic
+writes), e.g. to rank every CheckpointCallback checkpoint across BTC/ETH/SOL:
+
+    python batch_backtest.py --assets BTC ETH SOL --workers 3
+    python batch_backtest.py --assets SOL --models "models/PRODUCTION/{asset}/*ckpt*.zip" \
+        --env-params '{"stop_loss": 0.02}' --env-params '{"stop_loss": 0.04}'
+
+--lockstep groups the jobs that share a checkpoint and steps their envs together with
+one batched forward pass per candle (same results, far fewer torch calls).
+"""
+import argparse
+import glob
+import json
+import multiprocessing as mp
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+from backtest import (calculate_metrics, plot_equity, resolve_env_params, run_episode, run_episodes_lockstep,
+                      update_results)
+from backtest_cache import backtest_cache_key, load_result, store_result
+
+BATCH_RESULTS_FILE = "reports/batch_results.json"
+DEFAULT_MODELS = "models/PRODUCTION/{asset}/**/*.zip"
+DEFAULT_DATA = "datos_{asset}_15m_binance.csv"
+
+
+@dataclass
+class BacktestJob:
+    asset: str
+    model_path: str
+    data_path: str
+    env_params: Optional[Dict[str, Any]] = None  # None: the asset's config (resolve_env_params)
+    label: str = ""                              # Names the env_params variant in the result key
+    chart_dir: Optional[str] = None
+    use_cache: bool = True                       # Reuse backtest_cache results for unchanged inputs
+
+    @property
+    def key(self):
+        key = f"{self.asset}/{os.path.splitext(os.path.normpath(self.model_path))[0]}"
+        return f"{key}/{self.label}" if self.label else key
+
+
+def build_jobs(assets, models=DEFAULT_MODELS, env_param_sets=(None,), data_path=DEFAULT_DATA, chart_dir=None,
+               use_cache=True):
+    """
+    Cartesian product of assets x checkpoints x env_params. {asset} is the symbol in the
+    models glob and the lower-case symbol in data_path. Assets without checkpoints are skipped.
+    """
+    jobs = []
+    for asset in assets:
+        asset = asset.upper()
+        pattern = models.format(asset=asset)
+        model_paths = sorted(glob.glob(pattern, recursive=True))
+        if not model_paths:
+            print(f"⚠️ {asset}: no hay checkpoints en {pattern}")
+        for model_path in model_paths:
+            for idx, env_params in enumerate(env_param_sets):
+                label = f"params{idx}" if len(env_param_sets) > 1 else ""
+                jobs.append(BacktestJob(asset, model_path, data_path.format(asset=asset.lower()),
+                                        env_params, label, chart_dir, use_cache))
+    return jobs
+
+
+# Per-process cache: jobs of the same asset reuse the loaded candles
+_frames = {}
+
+
+def _init_worker():
+    import torch
+    torch.set_num_threads(1)  # One core per worker process
+
+
+def _make_env(job, env_params):
+    from feature_pipeline import load_features
+    from trading_env import TradingEnv
+
+    if job.data_path not in _frames:
+        _frames[job.data_path] = load_features(job.data_path)
+    return TradingEnv(_frames[job.data_path], **env_params)
+
+
+def _result_entry(job, env_params, net_worths, info):
+    metrics = info["metrics"]
+    entry = {
+        "asset": job.asset,
+        "model_path": job.model_path,
+        "env_params": env_params,
+        "initial_balance": info["initial_balance"],
+        "final_balance": float(net_worths[-1]),
+        "total_trades": info["total_trades"],
+        **metrics
+    }
+    if job.chart_dir:
+        os.makedirs(job.chart_dir, exist_ok=True)
+        chart_path = os.path.join(job.chart_dir, job.key.replace("/", "_") + ".png")
+        plot_equity(net_worths, info["initial_balance"], metrics, job.key, chart_path)
+        entry["chart_path"] = chart_path
+    return job.key, entry
+
+
+def run_group(jobs):
+    """
+    Backtest jobs that share one checkpoint; returns [(key, result entry)].
+    Cached results are reused; the rest are simulated (several at once in lockstep with
+    batched inference, same results as one by one) and stored in the cache.
+    """
+    from stable_baselines3 import PPO
+
+    env_params = [job.env_params if job.env_params is not None else resolve_env_params(job.asset)
+                  for job in jobs]
+    keys = [backtest_cache_key(job.model_path, job.data_path, params) for job, params in zip(jobs, env_params)]
+    outcomes = [load_result(key) if job.use_cache else None for job, key in zip(jobs, keys)]
+
+    misses = [idx for idx, outcome in enumerate(outcomes) if outcome is None]
+    if misses:
+        model = PPO.load(jobs[0].model_path, device="cpu")
+        envs = [_make_env(jobs[idx], env_params[idx]) for idx in misses]
+        if len(envs) == 1:
+            episodes = [run_episode(envs[0], model)]
+        else:
+            episodes = run_episodes_lockstep(envs, model)
+        for idx, env, (net_worths, real_trades) in zip(misses, envs, episodes):
+            info = {"initial_balance": env.initial_balance, "total_trades": real_trades,
+                    "metrics": calculate_metrics(net_worths)}
+            store_result(keys[idx], net_worths, info)
+            outcomes[idx] = (net_worths, info)
+
+    return [_result_entry(job, params, *outcome) for job, params, outcome in zip(jobs, env_params, outcomes)]
+
+
+def group_by_model(jobs):
+    groups = {}
+    for job in jobs:
+        groups.setdefault(job.model_path, []).append(job)
+    return list(groups.values())
+
+
+def run_batch(jobs, n_workers=1, results_file=BATCH_RESULTS_FILE, lockstep=False):
+    """
+    Run the jobs (in-process when n_workers <= 1) and merge each result into results_file
+    as it completes. lockstep=True runs each checkpoint's jobs as one batched-inference
+    group. Failed jobs are reported and skipped. Returns {key: entry}.
+    """
+    results = {}
+    groups = group_by_model(jobs) if lockstep else [[job] for job in jobs]
+
+    def record(outcome):
+        for key, entry in outcome:
+            update_results({key: entry}, results_file)
+            results[key] = entry
+            print(f"✅ {key}: Ret {entry['return_pct']:.2f}% | Sharpe {entry['sharpe']:.2f} | "
+                  f"DD {entry['max_drawdown_pct']:.2f}% | Trades {entry['total_trades']}")
+
+    def failed(group, error):
+        print(f"❌ {', '.join(job.key for job in group)}: {error}")
+
+    if n_workers <= 1:
+        for group in groups:
+            try:
+                record(run_group(group))
+            except Exception as e:
+                failed(group, e)
+        return results
+
+    # spawn: torch is not fork-safe once initialized
+    with ProcessPoolExecutor(max_workers=n_workers, mp_context=mp.get_context("spawn"),
+                             initializer=_init_worker) as pool:
+        futures = {pool.submit(run_group, group): group for group in groups}
+        for future in as_completed(futures):
+            try:
+                record(future.result())
+            except Exception as e:
+                failed(futures[future], e)
+    return results
+
+
+def print_ranking(results, metric="sharpe", top=20):
+    ranked = sorted(results.items(), key=lambda kv: kv[1][metric], reverse=True)
+    print(f"\n🏆 RANKING ({metric}):")
+    for key, entry in ranked[:top]:
+        print(f"   {entry[metric]:8.2f} | Ret {entry['return_pct']:7.2f}% | DD {entry['max_drawdown_pct']:6.2f}% | {key}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Batch backtest: assets x checkpoints x env_params")
+    parser.add_argument("--assets", nargs="+", default=["BTC", "ETH", "SOL"])
+    parser.add_argument("--models", default=DEFAULT_MODELS, help="Checkpoint glob; {asset} = symbol")
+    parser.add_argument("--data", default=DEFAULT_DATA, help="Candle CSV; {asset} = lower-case symbol")
+    parser.add_argument("--env-params", action="append", type=json.loads, default=None,
+                        help="JSON dict of TradingEnv params (repeatable; default: the asset config)")
+    parser.add_argument("--workers", type=int, default=max(1, (os.cpu_count() or 1) - 1))
+    parser.add_argument("--results", default=BATCH_RESULTS_FILE)
+    parser.add_argument("--charts", default=None, help="Directory for equity charts (none by default)")
+    parser.add_argument("--rank-by", default="sharpe")
+    parser.add_argument("--no-cache", action="store_true", help="Simulate even when a cached result exists")
+    parser.add_argument("--lockstep", action="store_true",
+                        help="Step each checkpoint's envs together with batched inference")
+    args = parser.parse_args()
+
+    jobs = build_jobs(args.assets, args.models, args.env_params or [None], args.data, args.charts,
+                      use_cache=not args.no_cache)
+    missing = sorted({job.data_path for job in jobs if not os.path.exists(job.data_path)})
+    for path in missing:
+        print(f"❌ Data file not found: {path}")
+    jobs = [job for job in jobs if job.data_path not in missing]
+    if not jobs:
+        print("❌ Nada que evaluar.")
+        return
+
+    print(f"📊 Batch backtest: {len(jobs)} combinaciones en {args.workers} workers -> {args.results}")
+    results = run_batch(jobs, args.workers, args.results, lockstep=args.lockstep)
+    if results:
+        print_ranking(results, args.rank_by)
+
+
+if __name__ == "__main__":
+    main()
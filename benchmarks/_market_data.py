@@ -0,0 +1,15 @@
+"""
+Synthetic market data shared by the benchmark scripts.
+"""
+import os
+import sys
+
+# Benchmarks are run from the repo root: python benchmarks/<script>.py
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import synthetic_market_data  # noqa: E402
+
+
+def make_market_df(n_rows=35000, seed=7):
+    """Random-walk 15m OHLCV frame with the indicator columns TradingEnv expects."""
+    return synthetic_market_data.make_market_df(n_rows, seed)
@@ -0,0 +1,71 @@
+"""
+Breakout backtest benchmark
+Bar-by-bar backtest_loop vs the event-driven simulate_breakout on parameter sets drawn
+from the optimize_heuristic_sol search space (the simulator timed without the shared
+indicator computation, then the full backtest() call with and without an IndicatorBank),
+plus sweep_breakout advancing every parameter set at once.
+
+Usage: python benchmarks/bench_breakout_backtest.py [n_rows] [n_params]
+"""
+import sys
+import time
+
+import numpy as np
+
+from _market_data import make_market_df
+from indicator_bank import IndicatorBank
+from optimize_heuristic_sol import (backtest, backtest_loop, breakout_indicators, sample_params, simulate_breakout,
+                                    sweep_breakout)
+
+
+def main():
+    n_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 35000
+    n_params = int(sys.argv[2]) if len(sys.argv) > 2 else 30
+    df = make_market_df(n_rows=n_rows)
+    closes = df['Close'].values
+    rng = np.random.default_rng(0)
+    param_sets = [sample_params(rng) for _ in range(n_params)]
+
+    bank = IndicatorBank(df).precompute()
+
+    loop_time = sim_time = full_time = bank_time = 0.0
+    trades = 0
+    for params in param_sets:
+        roll_max, ema = breakout_indicators(df, params['breakout_period'], params['ema_period'])
+        start_idx = max(params['breakout_period'], params['ema_period']) + 10
+
+        t0 = time.perf_counter()
+        expected = backtest_loop(df, params)
+        t1 = time.perf_counter()
+        result = simulate_breakout(closes, roll_max, ema, start_idx,
+                                   params['stop_loss'], params['ts_trigger'], params['ts_dist'])
+        t2 = time.perf_counter()
+        backtest(df, params)
+        t3 = time.perf_counter()
+        assert backtest(df, params, bank) == expected
+        t4 = time.perf_counter()
+
+        assert result == expected, (params, result, expected)
+        loop_time += t1 - t0
+        sim_time += t2 - t1
+        full_time += t3 - t2
+        bank_time += t4 - t3
+        trades += result[2]
+
+    t0 = time.perf_counter()
+    swept = sweep_breakout(df, param_sets, bank)
+    sweep_time = time.perf_counter() - t0
+    for k, params in enumerate(param_sets):
+        assert tuple(a[k] for a in swept) == backtest(df, params, bank), params
+
+    print(f"Rows: {len(df)} | parameter sets: {n_params} | avg trades: {trades / n_params:.0f}")
+    print(f"backtest_loop      : {loop_time / n_params * 1e3:8.2f} ms")
+    print(f"simulate_breakout  : {sim_time / n_params * 1e3:8.2f} ms  ({loop_time / sim_time:.1f}x)")
+    print(f"backtest (w/ ind.) : {full_time / n_params * 1e3:8.2f} ms  ({loop_time / full_time:.1f}x)")
+    print(f"backtest (bank)    : {bank_time / n_params * 1e3:8.2f} ms  ({loop_time / bank_time:.1f}x)")
+    print(f"sweep (bank)       : {sweep_time / n_params * 1e3:8.2f} ms  ({loop_time / sweep_time:.1f}x)")
+    print("Results identical: yes")
+
+
+if __name__ == "__main__":
+    main()
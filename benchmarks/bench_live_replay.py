@@ -0,0 +1,40 @@
+"""
+Live replay benchmark
+A year of 15m candles through LiveTrader (one decision cycle per candle) with a simulated
+clock and an untrained PPO policy (SB3 predict and the exported NumpyPolicy), vs the
+60 s of wall-clock sleep per cycle live.
+
+Usage: python benchmarks/bench_live_replay.py [n_days]
+"""
+import sys
+
+import numpy as np
+import pandas as pd
+
+from _market_data import make_market_df
+from stable_baselines3 import PPO
+from live_replay import HistoricalCandles, replay
+from policy_export import NumpyPolicy
+from trading_env import TradingEnv
+
+
+def main():
+    n_days = float(sys.argv[1]) if len(sys.argv) > 1 else 365
+    df = make_market_df(n_rows=int(n_days * 96) + 5 * 96 + 250)
+    times = (pd.Timestamp("2025-01-01") + pd.to_timedelta(np.arange(len(df)) * 15, unit="min")).to_numpy()
+    ohlcv = df[HistoricalCandles.COLUMNS].to_numpy(dtype=np.float64)
+    model = PPO("MlpPolicy", TradingEnv(df.iloc[:1000]), seed=0, device="cpu")
+
+    result = replay("SOL", times, ohlcv, model)
+    exported = replay("SOL", times, ohlcv, NumpyPolicy.from_model(model))
+    assert exported.trades == result.trades
+
+    simulated_days = result.cycles / 96
+    print(f"Cycles: {result.cycles} ({simulated_days:.0f} simulated days) | trades: {len(result.trades)}")
+    print(f"replay (SB3)   : {result.seconds:7.2f} s  ({result.seconds / result.cycles * 1e3:.2f} ms/cycle)")
+    print(f"replay (NumPy) : {exported.seconds:7.2f} s  ({exported.seconds / exported.cycles * 1e3:.2f} ms/cycle)")
+    print(f"live           : {result.cycles * 60 / 86400:7.1f} days of sleep(60) at one poll per candle")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""
+Lockstep backtest benchmark
+K backtests of one PPO checkpoint (different date ranges / env_params) run one at a
+time with a batch-of-one model.predict per candle vs run_episodes_lockstep with one
+batched forward pass per candle. Results are asserted identical.
+
+Usage: python benchmarks/bench_lockstep_backtest.py [n_envs] [n_rows]
+"""
+import sys
+import time
+
+import numpy as np
+
+from _market_data import make_market_df
+from stable_baselines3 import PPO
+from backtest import run_episode, run_episodes_lockstep
+from trading_env import TradingEnv
+
+
+def make_envs(df, n_envs):
+    offsets = np.linspace(0, len(df) // 4, n_envs).astype(int)
+    return [TradingEnv(df.iloc[offset:].reset_index(drop=True), stop_loss=0.02 + 0.005 * k)
+            for k, offset in enumerate(offsets)]
+
+
+def main():
+    n_envs = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    n_rows = int(sys.argv[2]) if len(sys.argv) > 2 else 4000
+    df = make_market_df(n_rows=n_rows)
+    model = PPO("MlpPolicy", TradingEnv(df), seed=0, device="cpu")
+
+    t0 = time.perf_counter()
+    single = [run_episode(env, model) for env in make_envs(df, n_envs)]
+    t1 = time.perf_counter()
+    lockstep = run_episodes_lockstep(make_envs(df, n_envs), model)
+    t2 = time.perf_counter()
+
+    for (nw_a, trades_a), (nw_b, trades_b) in zip(single, lockstep):
+        assert trades_a == trades_b and np.array_equal(nw_a, nw_b)
+    steps = sum(len(nw) for nw, _ in single)
+    print(f"Envs: {n_envs} | total steps: {steps}")
+    print(f"one at a time : {t1 - t0:7.2f} s  ({(t1 - t0) / steps * 1e6:6.1f} us/step)")
+    print(f"lockstep      : {t2 - t1:7.2f} s  ({(t2 - t1) / steps * 1e6:6.1f} us/step, {(t1 - t0) / (t2 - t1):.1f}x)")
+    print("Results identical: yes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+Metrics benchmark
+calculate_metrics with the old per-step drawdown-duration loop vs the vectorized
+run-length version, and the streaming MetricsAccumulator (per update).
+
+Usage: python benchmarks/bench_metrics.py [n_steps]
+"""
+import sys
+import time
+
+import numpy as np
+
+import _market_data  # noqa: F401  (puts the repo root on sys.path)
+from metrics import MetricsAccumulator, calculate_metrics
+
+
+def loop_dd_duration(net_worths):
+    running_max = np.maximum.accumulate(net_worths)
+    is_drawdown = (running_max - net_worths) / running_max > 0
+    current_duration = 0
+    max_duration = 0
+    for in_dd in is_drawdown:
+        if in_dd:
+            current_duration += 1
+        else:
+            max_duration = max(max_duration, current_duration)
+            current_duration = 0
+    return max(max_duration, current_duration)
+
+
+def main():
+    n_steps = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    rng = np.random.default_rng(0)
+    net_worths = 10000 * np.cumprod(1 + rng.normal(0.00005, 0.002, n_steps))
+
+    t0 = time.perf_counter()
+    metrics = calculate_metrics(net_worths)
+    t1 = time.perf_counter()
+    duration = loop_dd_duration(net_worths)
+    t2 = time.perf_counter()
+    acc = MetricsAccumulator()
+    for net_worth in net_worths.tolist():
+        acc.update(net_worth)
+    t3 = time.perf_counter()
+
+    assert metrics["max_dd_duration_steps"] == duration == acc.metrics()["max_dd_duration_steps"]
+    print(f"Steps: {n_steps}")
+    print(f"calculate_metrics (vectorized) : {(t1 - t0) * 1e3:8.1f} ms")
+    print(f"drawdown duration loop only    : {(t2 - t1) * 1e3:8.1f} ms")
+    print(f"MetricsAccumulator.update      : {(t3 - t2) / n_steps * 1e6:8.2f} us/step")
+
+
+if __name__ == "__main__":
+    main()
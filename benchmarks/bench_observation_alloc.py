@@ -0,0 +1,67 @@
+"""
+Observation allocation benchmark
+Counts the _next_observation() calls that allocate array buffers and the transient
+bytes allocated per 100k steps, for the default path and the reused-buffer builder.
+The reused path still creates a few hundred bytes of Python/NumPy scalar and view
+headers per call; it allocates no array data.
+
+Usage: python benchmarks/bench_observation_alloc.py [n_steps]
+"""
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+from _market_data import make_market_df
+from trading_env import TradingEnv
+
+
+# An observation window is 60 x 8 float32 = 1920 bytes; anything this large is array data
+ARRAY_ALLOC_BYTES = 1024
+
+
+def measure(env, n_steps):
+    """Return (array_allocating_calls, transient_bytes, seconds) for n_steps observations."""
+    env.reset()
+    span = env.end_step - env.window_size
+    allocating_calls = 0
+    transient_bytes = 0
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    for i in range(n_steps):
+        env.current_step = env.window_size + (i % span)
+        before, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        env._next_observation()
+        _, peak = tracemalloc.get_traced_memory()
+        transient_bytes += peak - before
+        if peak - before >= ARRAY_ALLOC_BYTES:
+            allocating_calls += 1
+    elapsed = time.perf_counter() - start
+    tracemalloc.stop()
+    return allocating_calls, transient_bytes, elapsed
+
+
+def main():
+    n_steps = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    df = make_market_df(n_rows=20000)
+
+    default_env = TradingEnv(df)
+    reuse_env = TradingEnv(df, reuse_obs_buffer=True)
+
+    # Same observations on both paths
+    for step in (default_env.window_size, len(df) // 2, default_env.end_step):
+        default_env.current_step = reuse_env.current_step = step
+        assert np.array_equal(default_env._next_observation(), reuse_env._next_observation())
+
+    scale = 100000 / n_steps
+    for name, env in (("default (hstack + nan_to_num)", default_env), ("reused buffer", reuse_env)):
+        calls, nbytes, elapsed = measure(env, n_steps)
+        print(f"{name:30s} array-allocating calls/100k: {calls * scale:>9,.0f} | "
+              f"transient MB/100k: {nbytes * scale / 1e6:>8.1f} | {elapsed:.2f}s (traced)")
+
+
+if __name__ == "__main__":
+    main()
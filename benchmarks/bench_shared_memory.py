@@ -0,0 +1,53 @@
+"""
+SubprocVecEnv worker memory benchmark (Linux)
+Per-worker RSS/PSS with DataFrame env factories vs SharedMarketData attachments.
+
+Usage: python benchmarks/bench_shared_memory.py [n_rows]
+"""
+import sys
+
+from stable_baselines3.common.vec_env import SubprocVecEnv
+
+from _market_data import make_market_df
+from shared_market_data import SharedMarketData
+from trading_env import TradingEnv
+
+
+def worker_memory_mb(vec_env):
+    """Sum of (RSS, PSS) in MB over the worker processes, from /proc/<pid>/smaps_rollup."""
+    rss = pss = 0
+    for process in vec_env.processes:
+        with open(f"/proc/{process.pid}/smaps_rollup") as f:
+            for line in f:
+                if line.startswith("Rss:"):
+                    rss += int(line.split()[1])
+                elif line.startswith("Pss:"):
+                    pss += int(line.split()[1])
+    return rss / 1024, pss / 1024
+
+
+def measure(env_fns):
+    vec_env = SubprocVecEnv(env_fns)
+    try:
+        vec_env.reset()
+        for _ in range(100):
+            vec_env.step([0] * vec_env.num_envs)
+        return worker_memory_mb(vec_env)
+    finally:
+        vec_env.close()
+
+
+def main():
+    n_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 300000
+    df = make_market_df(n_rows=n_rows)
+    print(f"{n_rows:,} candles")
+    for n_workers in (2, 4, 8):
+        rss_df, pss_df = measure([lambda: TradingEnv(df) for _ in range(n_workers)])
+        with SharedMarketData(df) as shared:
+            rss_shm, pss_shm = measure(shared.make_env_fns(n_workers))
+        print(f"   {n_workers} workers | DataFrame copies: RSS {rss_df:7.0f} MB, PSS {pss_df:7.0f} MB"
+              f" | shared memory: RSS {rss_shm:7.0f} MB, PSS {pss_shm:7.0f} MB")
+
+
+if __name__ == "__main__":
+    main()
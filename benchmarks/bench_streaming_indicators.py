@@ -0,0 +1,50 @@
+"""
+Streaming indicator benchmark
+Per-cycle cost of building the live observation window: batch feature_pipeline over
+five days of 15m candles (what LiveTrader used to do every 60s) vs one StreamingFeatures
+update + preview of the forming candle.
+
+Usage: python benchmarks/bench_streaming_indicators.py [n_cycles]
+"""
+import sys
+import time
+
+import numpy as np
+
+from _market_data import make_market_df
+from feature_pipeline import OBS_COLS, build_features
+from streaming_indicators import StreamingFeatures
+
+HISTORY = 480  # 5 days of 15m candles
+WINDOW = 60
+
+
+def main():
+    n_cycles = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    df = make_market_df(n_rows=HISTORY + n_cycles + 500)[['Open', 'High', 'Low', 'Close', 'Volume']]
+    closes = df['Close'].tolist()
+
+    start = time.perf_counter()
+    for i in range(n_cycles):
+        frame = build_features(df.iloc[i:i + HISTORY + 1], overwrite_indicators=True)
+        np.nan_to_num(frame[OBS_COLS].iloc[-WINDOW:].values.astype(np.float32))
+    batch_time = time.perf_counter() - start
+
+    features = StreamingFeatures(WINDOW)
+    for close in closes[:HISTORY]:
+        features.update(close)
+    start = time.perf_counter()
+    for i in range(n_cycles):
+        if i > 0:
+            features.update(closes[HISTORY + i - 1])
+        features.window(closes[HISTORY + i])
+    stream_time = time.perf_counter() - start
+
+    print(f"Cycles: {n_cycles} | history {HISTORY} candles | window {WINDOW}")
+    print(f"Batch pipeline : {batch_time / n_cycles * 1e3:8.3f} ms/cycle")
+    print(f"Streaming      : {stream_time / n_cycles * 1e3:8.3f} ms/cycle")
+    print(f"Speedup        : {batch_time / stream_time:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+TradingDatabase benchmark
+1M trades over 3 symbols: dashboard queries (get_recent_trades, get_performance_summary,
+get_statistics) on the legacy file (no indexes, rollback journal) vs after the schema
+migration (covering indexes, WAL), plus how long a write waits behind an open reader.
+
+Usage: python benchmarks/bench_trading_database.py [n_trades]
+"""
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+from trading_database import TradingDatabase
+
+SYMBOLS = ["BTC", "ETH", "SOL"]
+
+
+def build_legacy(db_path, n_trades):
+    db = TradingDatabase(db_path)
+    rng = np.random.default_rng(0)
+    now = time.time()
+    stamps = now - np.sort(rng.uniform(0, 365 * 86400, n_trades))[::-1]
+    pnl = rng.normal(0.1, 2.0, n_trades)
+    rows = (
+        (time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime(ts)), SYMBOLS[idx % 3], "SELL" if idx % 2 else "BUY",
+         float(p), float(p * 2), 200.0 + float(p), int(p > 0))
+        for idx, (ts, p) in enumerate(zip(stamps, pnl))
+    )
+    with db.conn:
+        db.conn.executemany("INSERT INTO trades (timestamp, symbol, action, pnl_pct, pnl_usd, balance_after, win) "
+                            "VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+        db.conn.execute("DROP INDEX idx_trades_symbol_timestamp")
+        db.conn.execute("DROP INDEX idx_trades_symbol_action")
+        db.conn.execute("PRAGMA user_version=0")
+    db.conn.execute("PRAGMA journal_mode=DELETE")
+    db.close()
+
+
+def time_queries(db, repeat=5):
+    queries = {
+        "get_recent_trades(SOL, 50)": lambda: db.get_recent_trades("SOL", limit=50),
+        "get_performance_summary(SOL, 30d)": lambda: db.get_performance_summary("SOL", days=30),
+        "get_statistics(SOL)": lambda: db.get_statistics("SOL"),
+    }
+    timings = {}
+    for name, query in queries.items():
+        t0 = time.perf_counter()
+        for _ in range(repeat):
+            query()
+        timings[name] = (time.perf_counter() - t0) / repeat
+    return timings
+
+
+def writer_wait(db_path):
+    """Seconds a log_trade waits while a dashboard connection is mid-read."""
+    reader = sqlite3.connect(db_path, check_same_thread=False)
+    reader.execute("BEGIN")
+    reader.execute("SELECT COUNT(*) FROM trades").fetchone()  # read lock / snapshot held open
+    threading.Timer(0.5, reader.rollback).start()  # a slow dashboard query finishing
+    writer = sqlite3.connect(db_path, timeout=5)
+    t0 = time.perf_counter()
+    with writer:
+        writer.execute("INSERT INTO trades (symbol, action) VALUES ('SOL', 'BUY')")
+    wait = time.perf_counter() - t0
+    writer.close()
+    time.sleep(0.6)
+    reader.close()
+    return wait
+
+
+def main():
+    n_trades = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "bench.db")
+        t0 = time.perf_counter()
+        build_legacy(db_path, n_trades)
+        print(f"Trades: {n_trades:,} ({time.perf_counter() - t0:.1f} s to build)")
+
+        legacy = TradingDatabase.__new__(TradingDatabase)  # same queries, file left as is (no migration)
+        legacy.conn = sqlite3.connect(db_path)
+        before = time_queries(legacy)
+        legacy_wait = writer_wait(db_path)
+        legacy.close()
+
+        t0 = time.perf_counter()
+        db = TradingDatabase(db_path)
+        print(f"Migration: {time.perf_counter() - t0:.2f} s")
+        after = time_queries(db)
+        wal_wait = writer_wait(db_path)
+        db.close()
+
+    for name in before:
+        print(f"{name:36s}: {before[name] * 1e3:9.2f} ms -> {after[name] * 1e3:7.2f} ms "
+              f"({before[name] / after[name]:.0f}x)")
+    print(f"{'write behind an open reader':36s}: {legacy_wait * 1e3:9.2f} ms -> {wal_wait * 1e3:7.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""
+Vectorized environment throughput benchmark
+DummyVecEnv of N scalar TradingEnv vs the NumPy-batched VecTradingEnv.
+
+Usage: python benchmarks/bench_vec_env.py [n_envs] [n_steps]
+"""
+import sys
+import time
+
+import numpy as np
+from stable_baselines3.common.vec_env import DummyVecEnv
+
+from _market_data import make_market_df
+from trading_env import TradingEnv
+from vec_trading_env import VecTradingEnv
+
+
+def throughput(vec_env, n_steps):
+    """Environment transitions per second over n_steps vectorized steps."""
+    rng = np.random.default_rng(0)
+    vec_env.reset()
+    start = time.perf_counter()
+    for _ in range(n_steps):
+        vec_env.step(rng.integers(0, 3, vec_env.num_envs))
+    return n_steps * vec_env.num_envs / (time.perf_counter() - start)
+
+
+def main():
+    n_envs = int(sys.argv[1]) if len(sys.argv) > 1 else 16
+    n_steps = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+    df = make_market_df()
+    params = {"commission": 0.0005}
+
+    dummy = DummyVecEnv([lambda: TradingEnv(df, **params) for _ in range(n_envs)])
+    batched = VecTradingEnv(df, n_envs=n_envs, **params)
+
+    dummy_tps = throughput(dummy, n_steps)
+    batched_tps = throughput(batched, n_steps)
+    print(f"n_envs={n_envs}")
+    print(f"   DummyVecEnv:   {dummy_tps:>10,.0f} env-steps/sec")
+    print(f"   VecTradingEnv: {batched_tps:>10,.0f} env-steps/sec ({batched_tps / dummy_tps:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Candle Store
+Durable per-symbol 15m candle store (SQLite) for the live bots: the first sync backfills
+a few days, after that only candles from the last stored one onwards are downloaded, and
+a restart resumes from the file instead of re-downloading everything
+"""
+import sqlite3
+import time
+
+import numpy as np
+import pandas as pd
+
+CANDLE_SECONDS = 15 * 60
+PERIOD_CANDLES = {"5d": 5 * 96, "2d": 2 * 96}  # Periods LiveTrader.fetch_market_data asks for
+BACKFILL_PERIOD = "5d"
+KEEP_CANDLES = 10 * 96  # Older rows are pruned
+
+
+def normalize_candles(df):
+    """(open times as epoch seconds, OHLCV array) from a yfinance-style frame; rows without a Close are dropped."""
+    if isinstance(df.columns, pd.MultiIndex):
+        df = df.copy()
+        df.columns = df.columns.get_level_values(0)
+    index = pd.DatetimeIndex(df.index)
+    if index.tz is not None:
+        index = index.tz_convert("UTC").tz_localize(None)
+    ohlcv = df[CandleStore.COLUMNS].to_numpy(dtype=np.float64)
+    valid = ~np.isnan(ohlcv[:, 3])
+    return index.as_unit("s").asi8[valid], ohlcv[valid]
+
+
+class CandleStore:
+    """
+    Callable data source for LiveTrader: store(period) syncs and returns the latest
+    candles (last row = forming candle) in yfinance layout with a naive-UTC index.
+
+    fetch(period=None, start=None) downloads candles: the last `period` (backfill) or
+    every candle opened at or after `start` (a tz-aware UTC datetime). The last stored
+    candle is always re-downloaded, since it was still forming when it was stored.
+    """
+
+    COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+    def __init__(self, db_path, fetch, backfill_period=BACKFILL_PERIOD, keep=KEEP_CANDLES, time_fn=time.time):
+        self.db_path = db_path
+        self.fetch = fetch
+        self.backfill_period = backfill_period
+        self.keep = keep
+        self.time_fn = time_fn
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS candles (
+                ts INTEGER PRIMARY KEY,
+                open REAL,
+                high REAL,
+                low REAL,
+                close REAL,
+                volume REAL
+            )
+        ''')
+        self.conn.commit()
+
+    def last_timestamp(self):
+        """Open time (epoch seconds) of the newest stored candle, or None."""
+        return self.conn.execute("SELECT MAX(ts) FROM candles").fetchone()[0]
+
+    def sync(self):
+        """Download what is missing and upsert it. Returns the number of candles written."""
+        last = self.last_timestamp()
+        backfill_seconds = PERIOD_CANDLES[self.backfill_period] * CANDLE_SECONDS
+        if last is None or self.time_fn() - last > backfill_seconds:
+            # Empty store or a gap longer than the backfill: start over
+            df = self.fetch(period=self.backfill_period)
+            self.conn.execute("DELETE FROM candles")
+        else:
+            df = self.fetch(start=pd.Timestamp(last, unit="s", tz="UTC").to_pydatetime())
+
+        timestamps, ohlcv = normalize_candles(df)
+        self.conn.executemany("INSERT OR REPLACE INTO candles VALUES (?, ?, ?, ?, ?, ?)",
+                              zip(timestamps.tolist(), *ohlcv.T.tolist()))
+        if len(timestamps):
+            self.conn.execute("DELETE FROM candles WHERE ts <= ?",
+                              (int(timestamps[-1]) - self.keep * CANDLE_SECONDS,))
+        self.conn.commit()
+        return len(timestamps)
+
+    def candles(self, n):
+        """The newest n stored candles, oldest first."""
+        rows = self.conn.execute(
+            "SELECT ts, open, high, low, close, volume FROM candles ORDER BY ts DESC LIMIT ?", (n,)).fetchall()
+        data = np.array(rows[::-1], dtype=np.float64).reshape(-1, 6)
+        index = pd.DatetimeIndex(pd.to_datetime(data[:, 0].astype(np.int64), unit="s"), name="Datetime")
+        return pd.DataFrame(data[:, 1:], index=index, columns=self.COLUMNS)
+
+    def __call__(self, period):
+        self.sync()
+        return self.candles(PERIOD_CANDLES[period])
+
+    def close(self):
+        self.conn.close()
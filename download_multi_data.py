@@ -1,8 +1,8 @@
 import ccxt
 import pandas as pd
-import ta
 import time
 from datetime import datetime, timedelta
+from feature_pipeline import add_indicators
 
 def download_asset_data(symbol, days=365):
     filename = f"datos_{symbol.replace('/', '_').split('_')[0].lower()}_15m_binance.csv"
@@ -31,14 +31,7 @@ def download_asset_data(symbol, days=365):
     
     # Feature Engineering
     print(f"🛠️ Calculating indicators for {symbol}...")
-    df['RSI'] = ta.momentum.RSIIndicator(close=df['Close']).rsi()
-    bb = ta.volatility.BollingerBands(close=df['Close'])
-    df['BBL_20_2.0'] = bb.bollinger_lband()
-    df['BBM_20_2.0'] = bb.bollinger_mavg()
-    df['BBU_20_2.0'] = bb.bollinger_hband()
-    df['EMA_20'] = ta.trend.EMAIndicator(close=df['Close'], window=20).ema_indicator()
-    df['EMA_50'] = ta.trend.EMAIndicator(close=df['Close'], window=50).ema_indicator()
-    df['EMA_200'] = ta.trend.EMAIndicator(close=df['Close'], window=200).ema_indicator()
+    add_indicators(df, overwrite=True) # RSI, Bollinger, EMA 20/50/200 (feature_pipeline)
     
     df.dropna(inplace=True)
     df.to_csv(filename)
@@ -0,0 +1,148 @@
+"""
+Feature Pipeline
+Single source of the indicator and observation columns used by training, backtest and
+live trading, with an on-disk cache keyed by data hash + feature parameters
+"""
+import hashlib
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+# Bump when any formula below changes so stale cache entries are never reused
+FEATURE_VERSION = 1
+CACHE_DIR = ".feature_cache"
+
+DEFAULT_PARAMS = {
+    "rsi_period": 14,
+    "bb_period": 20,
+    "bb_std": 2.0,
+    "ema_periods": [20, 50, 200],
+}
+
+# TradingEnv observation columns (MOMENTUM FOCUSED)
+OBS_COLS = ['Log_Ret', 'RSI_Norm', 'MACD_Hist', 'EMA_20_Dist', 'EMA_50_Dist', 'EMA_200_Dist']
+
+
+def _resolve_params(params):
+    resolved = dict(DEFAULT_PARAMS)
+    if params:
+        resolved.update(params)
+    return resolved
+
+
+def bollinger_columns(params=None):
+    """Names of the (lower, middle, upper) band columns, e.g. BBL_20_2.0."""
+    p = _resolve_params(params)
+    suffix = f"{p['bb_period']}_{float(p['bb_std'])}"
+    return f"BBL_{suffix}", f"BBM_{suffix}", f"BBU_{suffix}"
+
+
+def add_indicators(df, params=None, overwrite=False):
+    """
+    Add RSI, Bollinger Bands and EMA columns in place.
+    Formulas match the `ta` package, which produced the training CSVs.
+    Existing columns are kept unless overwrite=True (their history may predate the file).
+    """
+    p = _resolve_params(params)
+    close = df['Close']
+
+    def missing(col):
+        return overwrite or col not in df.columns
+
+    # 1. RSI (Wilder smoothing)
+    if missing('RSI'):
+        period = p['rsi_period']
+        delta = close.diff(1)
+        up = delta.where(delta > 0, 0.0)
+        down = -delta.where(delta < 0, 0.0)
+        ema_up = up.ewm(alpha=1 / period, min_periods=period, adjust=False).mean()
+        ema_down = down.ewm(alpha=1 / period, min_periods=period, adjust=False).mean()
+        rs = ema_up / ema_down
+        df['RSI'] = pd.Series(np.where(ema_down == 0, 100, 100 - (100 / (1 + rs))), index=df.index)
+
+    # 2. Bollinger Bands (population std)
+    lower_col, mid_col, upper_col = bollinger_columns(p)
+    if missing(lower_col) or missing(mid_col) or missing(upper_col):
+        mavg = close.rolling(p['bb_period'], min_periods=p['bb_period']).mean()
+        mstd = close.rolling(p['bb_period'], min_periods=p['bb_period']).std(ddof=0)
+        df[lower_col] = mavg - p['bb_std'] * mstd
+        df[mid_col] = mavg
+        df[upper_col] = mavg + p['bb_std'] * mstd
+
+    # 3. EMAs
+    for span in p['ema_periods']:
+        if missing(f'EMA_{span}'):
+            df[f'EMA_{span}'] = close.ewm(span=span, min_periods=span, adjust=False).mean()
+
+    return df
+
+
+def add_observation_features(df):
+    """Add the normalized observation columns (OBS_COLS) in place."""
+    # 1. Log Returns
+    df['Log_Ret'] = np.log(df['Close'] / df['Close'].shift(1)).fillna(0)
+
+    # 2. RSI (Normalized 0-1)
+    df['RSI_Norm'] = df['RSI'] / 100.0
+
+    # 3. MACD (Momentum Architecture) - REPLACES BOLINGER
+    ema_12 = df['Close'].ewm(span=12, adjust=False).mean()
+    ema_26 = df['Close'].ewm(span=26, adjust=False).mean()
+    macd = ema_12 - ema_26
+    signal = macd.ewm(span=9, adjust=False).mean()
+    df['MACD_Hist'] = (macd - signal) / df['Close'] # Normalized
+    df['MACD_Hist'] = df['MACD_Hist'].fillna(0)
+
+    # 4. EMA Distances (Short & Long Term)
+    df['EMA_20_Dist'] = (df['Close'] / df['EMA_20']) - 1
+    df['EMA_50_Dist'] = (df['Close'] / df['EMA_50']) - 1
+    df['EMA_200_Dist'] = (df['Close'] / df['EMA_200']) - 1 # MARKET REGIME
+
+    return df
+
+
+def has_observation_features(df):
+    return all(col in df.columns for col in OBS_COLS)
+
+
+def build_features(df, params=None, overwrite_indicators=False):
+    """OHLCV frame -> copy with indicator and observation columns."""
+    df = df.copy()
+    add_indicators(df, params, overwrite=overwrite_indicators)
+    add_observation_features(df)
+    return df
+
+
+def file_sha256(path, digest=None):
+    """Stream the file bytes into a sha256 (or the given hashlib object) and return it."""
+    digest = digest or hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest
+
+
+def feature_cache_key(data_path, params=None):
+    """sha256 of the data file bytes + resolved feature params + FEATURE_VERSION."""
+    digest = file_sha256(data_path)
+    spec = json.dumps({"params": _resolve_params(params), "version": FEATURE_VERSION}, sort_keys=True)
+    digest.update(spec.encode())
+    return digest.hexdigest()
+
+
+def load_features(data_path, params=None, cache_dir=CACHE_DIR):
+    """Read a candle CSV with all features, from the disk cache when the file and params are unchanged."""
+    key = feature_cache_key(data_path, params)
+    cache_path = os.path.join(cache_dir, f"{key}.pkl")
+    if os.path.exists(cache_path):
+        return pd.read_pickle(cache_path)
+
+    df = build_features(pd.read_csv(data_path), params)
+
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+    df.to_pickle(tmp_path)
+    os.replace(tmp_path, cache_path)
+    return df
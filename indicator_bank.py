@@ -0,0 +1,93 @@
+"""
+Indicator Bank
+Per-study cache of indicator variants so optimization trials index precomputed
+rows instead of recomputing rolling windows / EMAs on every trial
+"""
+from types import SimpleNamespace
+
+import numpy as np
+
+from trading_env import TradingEnv
+
+
+class IndicatorBank:
+    """
+    One row per period in a 2D array (rows filled on first use, or eagerly with precompute()).
+
+    breakout_periods / ema_periods are the inclusive (low, high) ranges of the search space;
+    periods outside them are computed on the fly without caching. float64 (default) keeps
+    the values bit-identical to the pandas calls; float32 halves the memory but can flip
+    close-vs-indicator comparisons right at the boundary.
+    """
+
+    def __init__(self, df, breakout_periods=(4, 48), ema_periods=(20, 100), dtype=np.float64):
+        self.df = df
+        self.dtype = np.dtype(dtype)
+        self.closes = df['Close'].values
+        self.breakout_periods = breakout_periods
+        self.ema_periods = ema_periods
+        # name -> (2D table, filled-row mask), allocated on first use
+        self._tables = {}
+        self._market_data = None
+
+    # --- Indicator Variants ---
+    def _compute_roll_max(self, period):
+        # shift(1) allows us to see the max of Previous N candles
+        return self.df['High'].rolling(window=period).max().shift(1).fillna(0).values
+
+    def _compute_ema(self, span):
+        return self.df['Close'].ewm(span=span, adjust=False).mean().values
+
+    def _lookup(self, name, bounds, period, compute):
+        row = period - bounds[0]
+        if not bounds[0] <= period <= bounds[1]:
+            return compute(period).astype(self.dtype, copy=False)
+        if name not in self._tables:
+            n_rows = bounds[1] - bounds[0] + 1
+            self._tables[name] = (np.empty((n_rows, len(self.df)), dtype=self.dtype), np.zeros(n_rows, dtype=bool))
+        table, ready = self._tables[name]
+        if not ready[row]:
+            table[row] = compute(period)
+            ready[row] = True
+        return table[row]
+
+    def roll_max(self, period):
+        """High.rolling(period).max().shift(1).fillna(0) (the breakout level)."""
+        return self._lookup('roll_max', self.breakout_periods, period, self._compute_roll_max)
+
+    def ema(self, span):
+        """Close.ewm(span=span, adjust=False).mean()"""
+        return self._lookup('ema', self.ema_periods, span, self._compute_ema)
+
+    def roll_max_table(self):
+        """Every breakout_periods row as one (n_periods, n_candles) array (row = period - low)."""
+        for period in range(self.breakout_periods[0], self.breakout_periods[1] + 1):
+            self.roll_max(period)
+        return self._tables['roll_max'][0]
+
+    def ema_table(self):
+        """Every ema_periods row as one (n_periods, n_candles) array (row = span - low)."""
+        for span in range(self.ema_periods[0], self.ema_periods[1] + 1):
+            self.ema(span)
+        return self._tables['ema'][0]
+
+    def precompute(self):
+        """Fill every row up front (e.g. before forking optimization workers)."""
+        self.roll_max_table()
+        self.ema_table()
+        return self
+
+    @property
+    def nbytes(self):
+        return sum(table.nbytes for table, _ in self._tables.values())
+
+    # --- TradingEnv Features ---
+    def market_data(self):
+        """TradingEnv arrays for this frame, computed once; pass as TradingEnv(market_data=...)."""
+        if self._market_data is None:
+            template = TradingEnv(self.df)
+            arrays = {name: getattr(template, name) for name in TradingEnv.MARKET_ARRAYS}
+            for array in arrays.values():
+                array.flags.writeable = False  # shared by every trial's envs
+            self._market_data = SimpleNamespace(**arrays)
+        return self._market_data
@@ -0,0 +1,218 @@
+"""
+Live Replay
+Accelerated historical replay of the LiveTrader decision logic (take profit, stop loss,
+wall-clock cooldown, prop-firm daily drawdown). Candles from a CSV are served by a stubbed
+data source under a simulated clock; database, Telegram and TensorBoard side effects are
+recorded in memory.
+
+Usage: python live_replay.py SOL [data_csv] [--days 365] [--model path.zip] [--poll-seconds 900]
+"""
+import argparse
+import logging
+import os
+import time
+from dataclasses import dataclass, field
+from datetime import timedelta, timezone
+from typing import Any, List
+
+import numpy as np
+import pandas as pd
+
+from policy_export import load_policy
+from run_live_trader import LiveTrader
+
+CANDLE_SECONDS = 15 * 60
+PERIOD_CANDLES = {"5d": 5 * 96, "2d": 2 * 96}  # Periods LiveTrader.fetch_market_data asks for
+
+
+class SimulatedClock:
+    """now()/time()/sleep() on simulated (naive UTC) time: sleep() advances the clock instantly."""
+
+    def __init__(self, start):
+        self.current = start
+
+    def now(self):
+        return self.current
+
+    def time(self):
+        return self.current.replace(tzinfo=timezone.utc).timestamp()
+
+    def sleep(self, seconds):
+        self.current += timedelta(seconds=seconds)
+
+
+class HistoricalCandles:
+    """
+    data_source stub: the 15m candles visible at clock.now() in yfinance layout.
+    The last row is the forming candle, reported at its open price (15m data has no
+    intra-candle path), so the trader never sees a price from the future.
+    """
+
+    COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+    def __init__(self, times, ohlcv, clock):
+        self.times = times
+        self.index = pd.DatetimeIndex(times, name="Datetime")
+        self.ohlcv = ohlcv
+        self.clock = clock
+
+    def __call__(self, period):
+        forming = np.searchsorted(self.times, np.datetime64(self.clock.now()), side='right') - 1
+        start = max(0, forming - PERIOD_CANDLES[period] + 1)
+        rows = self.ohlcv[start:forming + 1].copy()
+        if len(rows):
+            rows[-1, 1:4] = rows[-1, 0]  # High / Low / Close = Open
+            rows[-1, 4] = 0.0
+        return pd.DataFrame(rows, index=self.index[start:forming + 1], columns=self.COLUMNS)
+
+
+class RecordingDatabase:
+    """In-memory TradingDatabase stand-in (trades and bot state)."""
+
+    def __init__(self, clock):
+        self.clock = clock
+        self.trades = []
+        self.states = {}
+
+    def log_trade(self, symbol, action, **fields):
+        self.trades.append({"time": self.clock.now(), "symbol": symbol, "action": action, **fields})
+        return len(self.trades)
+
+    def update_bot_state(self, symbol, balance, position, entry_price, wins, losses):
+        self.states[symbol] = {'symbol': symbol, 'balance': balance, 'position': position,
+                               'entry_price': entry_price, 'last_update': self.clock.now(),
+                               'wins': wins, 'losses': losses}
+
+    def get_bot_state(self, symbol):
+        return self.states.get(symbol)
+
+
+class RecordingNotifier:
+    """TelegramNotifier stand-in: every notify_* / send_message call is kept as (time, name, args)."""
+
+    enabled = False
+
+    def __init__(self, clock):
+        self.clock = clock
+        self.messages = []
+
+    def __getattr__(self, name):
+        if not (name.startswith("notify_") or name == "send_message"):
+            raise AttributeError(name)
+
+        def record(*args, **kwargs):
+            self.messages.append((self.clock.now(), name, args, kwargs))
+            return True
+        return record
+
+
+class RecordingWriter:
+    """SummaryWriter stand-in: add_scalar calls kept as (tag, value, step)."""
+
+    def __init__(self):
+        self.scalars = []
+
+    def add_scalar(self, tag, value, step):
+        self.scalars.append((tag, value, step))
+
+    def flush(self):
+        pass
+
+    def close(self):
+        pass
+
+
+@dataclass
+class ReplayResult:
+    trader: Any
+    cycles: int
+    seconds: float
+    trades: List[dict] = field(default_factory=list)
+    notifications: List[tuple] = field(default_factory=list)
+    scalars: List[tuple] = field(default_factory=list)
+
+
+def load_candles(data_path):
+    """(times as naive-UTC datetime64, OHLCV array) from a candle CSV."""
+    df = pd.read_csv(data_path)
+    time_col = next((c for c in ("Datetime", "timestamp", "Timestamp", "Date") if c in df.columns), None)
+    if time_col is None:
+        raise ValueError(f"{data_path}: no Datetime/timestamp column")
+    times = pd.to_datetime(df[time_col], utc=True, unit="ms" if df[time_col].dtype.kind in "iu" else None)
+    times = times.dt.tz_localize(None).to_numpy(dtype="datetime64[ns]")
+    return times, df[['Open', 'High', 'Low', 'Close', 'Volume']].to_numpy(dtype=np.float64)
+
+
+def replay(symbol, times, ohlcv, model, start=None, end=None, poll_seconds=CANDLE_SECONDS, bot_config=None,
+           quiet=True):
+    """
+    Run LiveTrader.run_once() every poll_seconds of simulated time from start to end
+    (default: from the first moment with 5 days of history to the last candle).
+    """
+    first = times[min(PERIOD_CANDLES["5d"], len(times) - 1)]
+    start = pd.Timestamp(start if start is not None else first).to_pydatetime()
+    end = pd.Timestamp(end if end is not None else times[-1]).to_pydatetime()
+
+    clock = SimulatedClock(start)
+    db = RecordingDatabase(clock)
+    notifier = RecordingNotifier(clock)
+    writer = RecordingWriter()
+
+    root = logging.getLogger()
+    level = root.level
+    if quiet:
+        root.setLevel(logging.ERROR)  # Per-cycle INFO logs would dominate the replay time
+    try:
+        trader = LiveTrader(symbol, clock=clock, data_source=HistoricalCandles(times, ohlcv, clock), model=model,
+                            db=db, notifier=notifier, writer=writer, bot_config=bot_config)
+        t0 = time.perf_counter()
+        cycles = 0
+        while clock.now() <= end:
+            trader.run_once()
+            cycles += 1
+            clock.sleep(poll_seconds)
+        elapsed = time.perf_counter() - t0
+    finally:
+        root.setLevel(level)
+    return ReplayResult(trader, cycles, elapsed, db.trades, notifier.messages, writer.scalars)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay LiveTrader decisions over historical candles")
+    parser.add_argument("symbol")
+    parser.add_argument("data", nargs="?", default=None, help="Candle CSV (default datos_<sym>_15m_binance.csv)")
+    parser.add_argument("--model", default=None)
+    parser.add_argument("--days", type=float, default=None, help="Only replay the last N days")
+    parser.add_argument("--poll-seconds", type=int, default=CANDLE_SECONDS,
+                        help="Simulated seconds between cycles (live: 60; one per candle by default)")
+    args = parser.parse_args()
+
+    symbol = args.symbol.upper()
+    data_path = args.data or f"datos_{symbol.lower()}_15m_binance.csv"
+    model_path = args.model or f"models/PRODUCTION/{symbol}/ppo_{symbol.lower()}_final.zip"
+    for path in (data_path, model_path):
+        if not os.path.exists(path):
+            print(f"❌ No encontrado: {path}")
+            return
+
+    times, ohlcv = load_candles(data_path)
+    start = times[-1] - np.timedelta64(int(args.days * 86400), 's') if args.days else None
+    print(f"⏪ Replay de {symbol}: {len(times)} velas desde {data_path}")
+    result = replay(symbol, times, ohlcv, load_policy(model_path), start=start,
+                    poll_seconds=args.poll_seconds)
+
+    trader = result.trader
+    sells = [t for t in result.trades if t["action"] == "SELL"]
+    print(f"✅ {result.cycles} ciclos en {result.seconds:.1f}s ({result.seconds / max(result.cycles, 1) * 1e3:.2f} ms/ciclo)")
+    print(f"   Trades: {len(sells)} | W/L: {trader.wins}/{trader.losses} | Balance Sim: ${trader.sim_balance:.2f}")
+    print(f"   Inferencias: {trader.inference_runs} ejecutadas | {trader.inference_hits} desde caché")
+    if trader.session_metrics.n_steps:
+        session = trader.session_metrics.metrics()
+        print(f"   Max DD: {session['max_drawdown_pct']:.2f}% | Sharpe: {session['sharpe']:.2f}")
+    reasons = pd.Series([t.get("reason", "") for t in sells]).value_counts()
+    for reason, count in reasons.items():
+        print(f"   {reason}: {count}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+"""
+Performance Metrics
+Return, CAGR, Sharpe, Sortino, Calmar and drawdown of an equity curve, either over
+the whole curve at once (calculate_metrics) or one step at a time in O(1) memory
+(MetricsAccumulator) for long backtests and live sessions.
+"""
+import math
+
+import numpy as np
+
+TRADING_DAYS = 252
+RISK_FREE_RATE = 0.0
+
+
+def _max_run_length(mask):
+    """Longest run of consecutive True values."""
+    edges = np.flatnonzero(np.diff(np.concatenate(([0], mask.view(np.int8), [0]))))
+    if len(edges) == 0:
+        return 0
+    return int((edges[1::2] - edges[::2]).max())
+
+
+def _summary(initial, final, n_steps, mean_excess, std_returns, downside_std, max_drawdown, max_duration,
+             steps_per_day):
+    # Annualized Return (Approximate)
+    days = n_steps / steps_per_day
+    years = days / TRADING_DAYS
+    if years > 0:
+        cagr = ((final / initial) ** (1 / years)) - 1
+    else:
+        cagr = 0
+
+    annualization = np.sqrt(TRADING_DAYS * steps_per_day)
+    sharpe = mean_excess / (std_returns + 1e-9) * annualization
+    sortino = mean_excess / (downside_std + 1e-9) * annualization
+
+    max_drawdown_pct = max_drawdown * 100
+    calmar = cagr / (max_drawdown_pct / 100) if max_drawdown_pct > 0 else 0
+
+    return {
+        "return_pct": ((final - initial) / initial) * 100,
+        "cagr": cagr * 100,
+        "sharpe": sharpe,
+        "sortino": sortino,
+        "calmar": calmar,
+        "max_drawdown_pct": max_drawdown_pct,
+        "max_dd_duration_steps": max_duration,
+        "max_dd_duration_days": max_duration / steps_per_day
+    }
+
+
+def calculate_metrics(net_worths, steps_per_day=96):
+    """
+    Calculate extensive financial metrics.
+    net_worths: equity after every step (array or list); steps_per_day=96 for 15m candles.
+    """
+    net_worths = np.asarray(net_worths, dtype=np.float64)
+    returns = np.diff(net_worths) / net_worths[:-1]
+    excess_returns = returns - RISK_FREE_RATE / (TRADING_DAYS * steps_per_day)
+
+    negative_returns = returns[returns < 0]
+    downside_std = np.std(negative_returns) if len(negative_returns) > 0 else 1e-9
+
+    running_max = np.maximum.accumulate(net_worths)
+    drawdowns = (running_max - net_worths) / running_max
+
+    return _summary(net_worths[0], net_worths[-1], len(net_worths), np.mean(excess_returns), np.std(returns),
+                    downside_std, drawdowns.max(), _max_run_length(drawdowns > 0), steps_per_day)
+
+
+class _RunningMoments:
+    """Welford running mean / population variance."""
+
+    __slots__ = ("count", "mean", "m2")
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def update(self, x):
+        self.count += 1
+        delta = x - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (x - self.mean)
+
+    @property
+    def std(self):
+        return math.sqrt(self.m2 / self.count) if self.count else math.nan
+
+    def get_state(self):
+        return [self.count, self.mean, self.m2]
+
+    def set_state(self, state):
+        self.count, self.mean, self.m2 = state
+
+
+class MetricsAccumulator:
+    """
+    Same metrics as calculate_metrics, updated one net worth at a time without keeping
+    the curve. Results agree with the batch version up to float rounding (Welford
+    moments vs NumPy's pairwise sums).
+    """
+
+    _SCALARS = ('steps_per_day', 'initial', 'last', 'n_steps', 'running_max', 'max_drawdown', 'dd_duration',
+                'max_dd_duration')
+
+    def __init__(self, steps_per_day=96):
+        self.steps_per_day = steps_per_day
+        self.initial = None
+        self.last = None
+        self.n_steps = 0
+        self.returns = _RunningMoments()
+        self.negative_returns = _RunningMoments()
+        self.running_max = -math.inf
+        self.max_drawdown = 0.0
+        self.dd_duration = 0
+        self.max_dd_duration = 0
+
+    def update(self, net_worth):
+        net_worth = float(net_worth)
+        if self.initial is None:
+            self.initial = net_worth
+        else:
+            ret = (net_worth - self.last) / self.last
+            self.returns.update(ret)
+            if ret < 0:
+                self.negative_returns.update(ret)
+        self.last = net_worth
+        self.n_steps += 1
+
+        # Drawdown & Duration
+        self.running_max = max(self.running_max, net_worth)
+        drawdown = (self.running_max - net_worth) / self.running_max
+        self.max_drawdown = max(self.max_drawdown, drawdown)
+        if drawdown > 0:
+            self.dd_duration += 1
+            self.max_dd_duration = max(self.max_dd_duration, self.dd_duration)
+        else:
+            self.dd_duration = 0
+
+    def get_state(self):
+        """Accumulator state as a JSON-serializable dict (e.g. to resume a backtest snapshot)."""
+        state = {name: getattr(self, name) for name in self._SCALARS}
+        state['returns'] = self.returns.get_state()
+        state['negative_returns'] = self.negative_returns.get_state()
+        return state
+
+    @classmethod
+    def from_state(cls, state):
+        acc = cls(state['steps_per_day'])
+        for name in cls._SCALARS:
+            setattr(acc, name, state[name])
+        acc.returns.set_state(state['returns'])
+        acc.negative_returns.set_state(state['negative_returns'])
+        return acc
+
+    @property
+    def current_drawdown(self):
+        return (self.running_max - self.last) / self.running_max if self.n_steps else 0.0
+
+    def metrics(self):
+        if self.n_steps == 0:
+            raise ValueError("MetricsAccumulator: no net worth recorded yet")
+        mean_excess = self.returns.mean - RISK_FREE_RATE / (TRADING_DAYS * self.steps_per_day) \
+            if self.returns.count else math.nan
+        downside_std = self.negative_returns.std if self.negative_returns.count else 1e-9
+        return _summary(self.initial, self.last, self.n_steps, mean_excess, self.returns.std, downside_std,
+                        self.max_drawdown, self.max_dd_duration, self.steps_per_day)
@@ -0,0 +1,112 @@
+"""
+Multi-Symbol Live Trader
+Hosts one LiveTrader session per symbol in a single asyncio process: market data is
+fetched concurrently in worker threads, while predictions and trade handling run on the
+event loop over one shared policy runtime (each checkpoint loaded once, as the exported
+NumPy actor when available), one TensorBoard writer and one Telegram notifier.
+
+Usage: python multi_live_trader.py BTC ETH SOL
+"""
+import asyncio
+import logging
+import sys
+
+from policy_export import load_policy
+from run_live_trader import EventWriter, LiveTrader, production_model_path
+
+logger = logging.getLogger()
+
+
+class SymbolWriter:
+    """Per-symbol view of a shared TensorBoard writer: tags are prefixed with the symbol."""
+
+    def __init__(self, writer, symbol):
+        self.writer = writer
+        self.symbol = symbol
+
+    def add_scalar(self, tag, value, step):
+        self.writer.add_scalar(f"{self.symbol}/{tag}", value, step)
+
+    def flush(self):
+        self.writer.flush()
+
+    def close(self):
+        pass  # Owned by the runner
+
+
+class PolicyPool:
+    """One loaded policy per checkpoint path, shared by every session that uses it."""
+
+    def __init__(self, load=load_policy):
+        self.load = load
+        self.models = {}
+
+    def get(self, path):
+        if path not in self.models:
+            logger.info(f"🧠 Cargando modelo compartido: {path}")
+            self.models[path] = self.load(path)
+        return self.models[path]
+
+
+def build_traders(symbols, policies=None, writer=None, data_sources=None, **trader_kwargs):
+    """
+    LiveTrader per symbol sharing the policy pool, the TensorBoard writer and the notifier.
+    data_sources: optional {symbol: data_source}; trader_kwargs go to every LiveTrader.
+    """
+    policies = policies or PolicyPool()
+    data_sources = data_sources or {}
+    if writer is None:
+        writer = EventWriter("tensorboard_logs/LIVE_MULTI_200USD")
+    traders = []
+    for symbol in (s.upper() for s in symbols):
+        kwargs = dict(trader_kwargs)
+        if traders:
+            kwargs["notifier"] = traders[0].notifier
+        traders.append(LiveTrader(symbol, model=policies.get(production_model_path(symbol)),
+                                  writer=SymbolWriter(writer, symbol), data_source=data_sources.get(symbol),
+                                  **kwargs))
+    return traders
+
+
+async def run_session(trader, cycles=None, sleep=asyncio.sleep):
+    """
+    LiveTrader.run() as a coroutine: the download runs in a worker thread so the other
+    sessions keep going; waits follow the trader's BarScheduler. cycles=None runs forever.
+    """
+    done = 0
+    while cycles is None or done < cycles:
+        market_data, current_price = await asyncio.to_thread(trader.fetch_market_data)
+        if market_data is not None:
+            trader.decide(market_data, current_price)
+        done += 1
+        if cycles is None or done < cycles:
+            await sleep(trader.scheduler.delay(trader.clock.time(), trader.last_closed_ts))
+    return done
+
+
+async def run_all(traders, cycles=None, sleep=asyncio.sleep):
+    """Run every session concurrently; a failing session is logged and the rest keep trading."""
+    results = await asyncio.gather(*(run_session(trader, cycles, sleep) for trader in traders),
+                                   return_exceptions=True)
+    for trader, result in zip(traders, results):
+        if isinstance(result, BaseException):
+            logger.error(f"❌ Sesión {trader.symbol} detenida: {result}")
+    return results
+
+
+def main():
+    symbols = [s.upper() for s in sys.argv[1:]] or ["BTC", "ETH", "SOL"]
+    logger.info(f"🚀 Iniciando Trader Multi-Activo en un solo proceso: {', '.join(symbols)}")
+    traders = build_traders(symbols)
+    try:
+        asyncio.run(run_all(traders))
+    except KeyboardInterrupt:
+        logger.info("🛑 Detenido por el usuario")
+    finally:
+        for trader in traders:
+            trader.shutdown()  # Pending database writes and alerts are delivered before exiting
+        traders[0].writer.writer.close()
+
+
+if __name__ == "__main__":
+    main()
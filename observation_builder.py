@@ -0,0 +1,40 @@
+"""
+Observation Builder
+Writes the policy observation (market window + account columns) into a reused buffer
+"""
+import numpy as np
+
+FLOAT32_MAX = float(np.finfo(np.float32).max)
+
+
+def clean_scalar(value):
+    """Scalar equivalent of np.nan_to_num after a float32 cast (NaN -> 0, +-inf -> +-float32 max)."""
+    if value != value:
+        return 0.0
+    return min(max(value, -FLOAT32_MAX), FLOAT32_MAX)
+
+
+class ObservationBuilder:
+    """
+    Zero-allocation observation assembly.
+
+    The returned array is the builder's own buffer and is overwritten on the
+    next call: callers that keep observations around must copy them.
+    """
+
+    def __init__(self, window_size, n_market_features):
+        self.window_size = window_size
+        self.n_market_features = n_market_features
+        self.buffer = np.zeros((window_size, n_market_features + 2), dtype=np.float32)
+
+        # Destination views are created once so build() only copies data
+        self._market_view = self.buffer[:, :n_market_features]
+        self._balance_view = self.buffer[:, n_market_features]
+        self._position_view = self.buffer[:, n_market_features + 1]
+
+    def build(self, market_window, balance_ratio, position_ratio):
+        """Fill the buffer in place. NaN cleanup of market_window is the caller's job (do it once, upfront)."""
+        np.copyto(self._market_view, market_window)
+        self._balance_view.fill(clean_scalar(balance_ratio))
+        self._position_view.fill(clean_scalar(position_ratio))
+        return self.buffer
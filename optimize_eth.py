@@ -1,3 +1,4 @@
+import argparse
 import optuna
 from optuna.pruners import MedianPruner
 from optuna.samplers import TPESampler
@@ -10,18 +11,48 @@ from stable_baselines3.common.env_util import make_vec_env
 from stable_baselines3.common.vec_env import DummyVecEnv
 from stable_baselines3.common.callbacks import EvalCallback
 from trading_env import TradingEnv
+from vec_trading_env import VecTradingEnv, rollout_n_steps
 from config import get_asset_config
+from feature_pipeline import load_features
+from optuna_runner import add_runner_args, load_existing_study, run_study
+from shared_market_data import SharedMarketData
+from optuna_callbacks import TrialEvalCallback
 
 # Configuración del Experimento
 N_TRIALS = 30
 N_STARTUP_TRIALS = 5
-N_EVALUATIONS = 2
+N_EVALUATIONS = 1 # Evaluaciones de calentamiento antes de poder podar (poda desde los 20k pasos)
 N_TIMESTEPS = 30000 
 EVAL_FREQ = 10000
 TIMEOUT = 60 * 60  # 1 hora máximo
+N_ENVS = 8 # Episodios paralelos en un solo paso NumPy
 
 ASSET = "ETH"
 
+_data = None
+
+def split_data():
+    """Train/val split + env params from the feature cache."""
+    data_file = f"datos_{ASSET.lower()}_15m_binance.csv"
+    if not os.path.exists(data_file):
+        raise FileNotFoundError(f"No data found for {ASSET}")
+        
+    df = load_features(data_file) # Cache en disco: sin recalcular indicadores en cada trial
+    train_size = int(len(df) * 0.7)
+
+    # Cargar Configuración de Entorno "Elite"
+    config = get_asset_config(ASSET)
+    env_params = config.env_params if config else {"commission": 0.0005}
+    return df.iloc[:train_size], df.iloc[train_size:].copy(), env_params
+
+def load_data(train_handle):
+    """Once per worker process: attach to the training arrays the parent published, load val + env params."""
+    global _data
+    if _data is None:
+        _, df_val, env_params = split_data()
+        _data = (train_handle.attach(), df_val, env_params)
+    return _data
+
 def optimize_agent(trial):
     # 1. Definir Espacio de Búsqueda (Hyperparameters Search Space)
     learning_rate = trial.suggest_float("learning_rate", 1e-5, 1e-3, log=True)
@@ -45,21 +76,10 @@ def optimize_agent(trial):
         "batch_size": batch_size,
     }
 
-    # 2. Cargar Datos y Config
-    data_file = f"datos_{ASSET.lower()}_15m_binance.csv"
-    if not os.path.exists(data_file):
-        raise FileNotFoundError(f"No data found for {ASSET}")
-        
-    df = pd.read_csv(data_file)
-    train_size = int(len(df) * 0.7)
-    df_train = df.iloc[:train_size]
-    df_val = df.iloc[train_size:]
+    # 2. Datos y Config (cargados una vez por worker, features de train en memoria compartida)
+    train_data, df_val, env_params = _data
 
-    # Cargar Configuración de Entorno "Elite"
-    config = get_asset_config(ASSET)
-    env_params = config.env_params if config else {"commission": 0.0005}
-
-    env_train = DummyVecEnv([lambda: TradingEnv(df_train, **env_params)])
+    env_train = VecTradingEnv(market_data=train_data, n_envs=N_ENVS, **env_params)
     env_val = DummyVecEnv([lambda: TradingEnv(df_val, **env_params)])
 
     # 3. Crear Modelo
@@ -67,19 +87,24 @@ def optimize_agent(trial):
         "MlpPolicy",
         env_train,
         verbose=0,
-        **hyperparams
+        # n_steps stays the rollout size per update (as saved in best_hyperparams_eth.json)
+        **{**hyperparams, "n_steps": rollout_n_steps(n_steps, N_ENVS)}
     )
 
     # 4. Entrenar con Pruning (Early Stopping si va mal)
-    # Custom evaluation for Optuna
+    # Validación cada EVAL_FREQ pasos: el episodio es determinista, basta con uno
+    eval_callback = TrialEvalCallback(trial, lambda m: optuna_eval(m, env_val, n_eval_episodes=1)[0], eval_freq=EVAL_FREQ)
     mean_reward = -np.inf
     
     try:
-        model.learn(total_timesteps=N_TIMESTEPS)
+        model.learn(total_timesteps=N_TIMESTEPS, callback=eval_callback)
+        eval_callback.raise_if_pruned()
         
         # Evaluar
         mean_reward, std_reward = optuna_eval(model, env_val, n_eval_episodes=5)
         
+    except optuna.TrialPruned:
+        raise
     except Exception as e:
         print(f"Trial failed: {e}")
         return -np.inf
@@ -101,17 +126,24 @@ def optuna_eval(model, env, n_eval_episodes=5):
     return np.mean(episode_rewards), np.std(episode_rewards)
 
 if __name__ == "__main__":
+    parser = add_runner_args(argparse.ArgumentParser(description=f"{ASSET} PPO hyperparameter search"), f"{ASSET.lower()}_ppo")
+    args = parser.parse_args()
+
     print(f"🧬 Iniciando Optimización Evolutiva (Optuna) para {ASSET}...")
     
     sampler = TPESampler(n_startup_trials=N_STARTUP_TRIALS, seed=42)
     pruner = MedianPruner(n_startup_trials=N_STARTUP_TRIALS, n_warmup_steps=N_EVALUATIONS)
 
-    study = optuna.create_study(sampler=sampler, pruner=pruner, direction="maximize")
-    
+    # Features de train calculadas una vez y publicadas en memoria compartida para todos los workers
+    df_train, _, _ = split_data()
     try:
-        study.optimize(optimize_agent, n_trials=N_TRIALS, timeout=TIMEOUT)
+        with SharedMarketData(df_train) as shared:
+            study = run_study(optimize_agent, N_TRIALS, args.study_name, args.storage, args.workers,
+                              sampler=sampler, pruner=pruner, worker_init=load_data,
+                              worker_init_args=(shared.handle,), timeout=TIMEOUT)
     except KeyboardInterrupt:
         print("Interrumpido por el usuario. Guardando mejores resultados hasta ahora...")
+        study = load_existing_study(args.study_name, args.storage)
 
     print("✅ Optimización completada.")
     print("🏆 Mejores Hiperparámetros:")
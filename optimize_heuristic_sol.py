@@ -1,16 +1,132 @@
+import argparse
 import optuna
 import pandas as pd
 import numpy as np
 import json
 import os
+from feature_pipeline import load_features
+from indicator_bank import IndicatorBank
+from optuna_runner import add_runner_args, run_study
 
 # --- CONFIG ---
 DATA_FILE = "datos_sol_15m_binance.csv"
 INITIAL_CAPITAL = 200.0
 POSITION_SIZE_PCT = 0.60  # 60% tactic
 COMMISSION = 0.0005      # 0.05%
+N_TRIALS = 1000
+SWEEP_SAMPLES = 1000
+SWEEP_BATCH = 1000  # Parameter sets advanced together per pass over the candles (per-bar overhead amortized)
 
-def backtest(df, params):
+# HYPER-ACTIVE SCALPING PARAMETERS: name -> (type, low, high), shared by the Optuna objective and the sweep
+SEARCH_SPACE = {
+    "breakout_period": (int, 4, 48),     # 1h to 12h breakouts
+    "ema_period": (int, 20, 100),        # Fast trend filter
+    "stop_loss": (float, 0.01, 0.04),    # Tighter risk
+    "ts_trigger": (float, 0.005, 0.03),  # Fast Profits (Scalping): secure profit quickly (0.5% - 3%)
+    "ts_dist": (float, 0.005, 0.02),     # Tight follow
+}
+
+# Loaded once per process by init_worker()
+df = None
+bank = None
+
+EXIT_CHUNK = 128  # Held bars checked per vectorized exit scan; doubles while the position stays open
+
+def breakout_indicators(df, breakout_period, ema_period):
+    """(roll_max, ema) arrays used by the breakout strategy."""
+    # shift(1) allows us to see the max of Previous N candles
+    roll_max = df['High'].rolling(window=breakout_period).max().shift(1).fillna(0).values
+    ema = df['Close'].ewm(span=ema_period, adjust=False).mean().values
+    return roll_max, ema
+
+def find_exit(closes, entry, stop_loss_pct, trailing_trigger, trailing_dist):
+    """
+    Bar where a position bought at closes[entry] is sold by SL / TS (same formulas as
+    backtest_loop), scanning the held bars in chunks; len(closes) if it is never sold.
+    """
+    n = len(closes)
+    entry_price = max_price = closes[entry]
+    first, chunk = entry + 1, EXIT_CHUNK
+    while first < n:
+        prices = closes[first:first + chunk]
+        highest = np.maximum(np.maximum.accumulate(prices), max_price)
+        sell = (prices - entry_price) / entry_price < -stop_loss_pct
+        sell |= ((highest - entry_price) / entry_price >= trailing_trigger) & \
+                ((highest - prices) / highest >= trailing_dist)
+        if sell.any():
+            return first + int(np.argmax(sell))
+        max_price = highest[-1]
+        first += chunk
+        chunk *= 2
+    return n
+
+def simulate_breakout(closes, roll_max, ema, start_idx, stop_loss_pct, trailing_trigger, trailing_dist):
+    """
+    Event-driven version of backtest_loop: jumps from entry signal to exit signal
+    instead of visiting every candle, then rebuilds the equity curve for the drawdown
+    from the trades. Same float operations -> same results.
+    Returns (final_equity, max_dd, trades).
+    """
+    n = len(closes)
+    if start_idx >= n:
+        return INITIAL_CAPITAL + (0 * closes[-1]), 0, 0
+
+    # Every bar where a flat account would buy (cash permitting)
+    signal = (closes[start_idx:] > roll_max[start_idx:]) & (closes[start_idx:] > ema[start_idx:])
+    entries = start_idx + np.flatnonzero(signal)
+
+    # Account state per bar: cash and shares only change on entry / exit bars
+    balance_at = np.empty(n)
+    shares_at = np.zeros(n)
+    balance = INITIAL_CAPITAL
+    shares = 0
+    trades = 0
+    flat_from = start_idx
+    k = 0
+    while k < len(entries):
+        entry = int(entries[k])
+        invest_amount = balance * POSITION_SIZE_PCT
+        if invest_amount < 10: invest_amount = balance
+        if balance < invest_amount * (1 + COMMISSION):
+            break  # Cash never changes while flat: no further entries
+
+        entry_price = closes[entry]
+        balance_at[flat_from:entry + 1] = balance  # Equity is read before the buy on the entry bar
+        shares = (invest_amount / entry_price) * (1 - COMMISSION)
+        balance -= invest_amount
+        exit_bar = find_exit(closes, entry, stop_loss_pct, trailing_trigger, trailing_dist)
+        balance_at[entry + 1:exit_bar + 1] = balance
+        shares_at[entry + 1:exit_bar + 1] = shares
+        flat_from = exit_bar + 1
+        if exit_bar == n:
+            break  # Still open at the end of the data
+
+        balance += shares * closes[exit_bar] * (1 - COMMISSION)
+        shares = 0
+        trades += 1
+        k = int(np.searchsorted(entries, flat_from))  # The sell bar itself never re-enters
+    balance_at[flat_from:] = balance  # Flat stretch after the last sell (empty if still holding)
+
+    final_equity = balance + (shares * closes[-1])
+    equity = balance_at[start_idx:] + (shares_at[start_idx:] * closes[start_idx:])
+    peak = np.maximum.accumulate(equity)
+    max_dd = ((peak - equity) / peak).max()
+    return final_equity, max_dd, trades
+
+def backtest(df, params, bank=None):
+    """bank: optional IndicatorBank over df, shared by all trials of a study."""
+    if bank is not None:
+        roll_max, ema = bank.roll_max(params['breakout_period']), bank.ema(params['ema_period'])
+    else:
+        roll_max, ema = breakout_indicators(df, params['breakout_period'], params['ema_period'])
+    # Start after enough data
+    start_idx = max(params['breakout_period'], params['ema_period']) + 10
+    return simulate_breakout(
+        df['Close'].values, roll_max, ema, start_idx,
+        params['stop_loss'], params['ts_trigger'], params['ts_dist'])
+
+def backtest_loop(df, params):
+    """Reference bar-by-bar simulation (kept for parity checks; backtest() is the fast path)."""
     # Unpack params
     breakout_period = params['breakout_period']
     ema_period = params['ema_period']
@@ -110,69 +226,181 @@ def backtest(df, params):
     
     return final_equity, max_dd, trades
 
-def objective(trial):
-    # HYPER-ACTIVE SCALPING PARAMETERS
-    breakout_period = trial.suggest_int("breakout_period", 4, 48) # 1h to 12h breakouts
-    ema_period = trial.suggest_int("ema_period", 20, 100) # Fast trend filter
-    
-    stop_loss = trial.suggest_float("stop_loss", 0.01, 0.04) # Tighter risk
-    
-    # Fast Profits (Scalping)
-    ts_trigger = trial.suggest_float("ts_trigger", 0.005, 0.03) # Secure profit quickly (0.5% - 3%)
-    ts_dist = trial.suggest_float("ts_dist", 0.005, 0.02) # Tight follow
+def sweep_breakout(df, param_sets, bank=None):
+    """
+    Evaluate many parameter sets in one pass over the candles: the account state of
+    every set (balance, shares, entry, peak, ...) is a NumPy array and each bar
+    advances all of them at once, with the same float operations as backtest_loop.
+    Returns (final_equity, max_dd, trades) arrays, one entry per parameter set.
+    """
+    breakout = np.array([p['breakout_period'] for p in param_sets])
+    ema_period = np.array([p['ema_period'] for p in param_sets])
+    stop_loss_pct = np.array([p['stop_loss'] for p in param_sets], dtype=np.float64)
+    trailing_trigger = np.array([p['ts_trigger'] for p in param_sets], dtype=np.float64)
+    trailing_dist = np.array([p['ts_dist'] for p in param_sets], dtype=np.float64)
+
+    if bank is None or not (bank.breakout_periods[0] <= breakout.min() and breakout.max() <= bank.breakout_periods[1]
+                            and bank.ema_periods[0] <= ema_period.min() and ema_period.max() <= bank.ema_periods[1]):
+        bank = IndicatorBank(df, breakout_periods=(breakout.min(), breakout.max()),
+                             ema_periods=(ema_period.min(), ema_period.max()))
+    closes = bank.closes
+    n_sets = len(param_sets)
+    start_idx = np.maximum(breakout, ema_period) + 10
+
+    # Breakout + trend signal of every set on every bar, time-major (n_candles, n_sets).
+    # Bars before a set's start_idx are masked out: with no entries its equity stays at
+    # INITIAL_CAPITAL, which leaves peak and drawdown exactly as the per-set loop sees them.
+    entry_signal = np.empty((len(closes), n_sets), dtype=bool)
+    for lo in range(0, n_sets, 128):  # gather indicator rows in chunks to bound memory
+        cols = slice(lo, lo + 128)
+        roll_max = bank.roll_max_table()[breakout[cols] - bank.breakout_periods[0]]
+        ema = bank.ema_table()[ema_period[cols] - bank.ema_periods[0]]
+        entry_signal[:, cols] = ((closes > roll_max) & (closes > ema)).T
+    entry_signal[np.arange(len(closes))[:, None] < start_idx] = False
+
+    balance = np.full(n_sets, INITIAL_CAPITAL)
+    shares = np.zeros(n_sets)
+    max_price_since_entry = np.zeros(n_sets)
+    entry_price = np.zeros(n_sets)
+    trades = np.zeros(n_sets, dtype=np.int64)
+    peak = np.full(n_sets, INITIAL_CAPITAL)
+    max_dd = np.zeros(n_sets)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for i in range(min(start_idx.min(), len(closes)), len(closes)):
+            current_price = closes[i]
+
+            # Equity curve / drawdown
+            equity = balance + (shares * current_price)
+            np.maximum(peak, equity, out=peak)
+            np.maximum(max_dd, (peak - equity) / peak, out=max_dd)
+
+            # 1. EXIT LOGIC
+            holding = shares > 0
+            np.copyto(max_price_since_entry, current_price, where=holding & (current_price > max_price_since_entry))
+            pnl_pct = (current_price - entry_price) / entry_price
+            sell = holding & (
+                (pnl_pct < -stop_loss_pct)
+                | (((max_price_since_entry - entry_price) / entry_price >= trailing_trigger)
+                   & ((max_price_since_entry - current_price) / max_price_since_entry >= trailing_dist)))
+            if sell.any():
+                revenue = shares * current_price * (1 - COMMISSION)
+                np.copyto(balance, balance + revenue, where=sell)
+                for state in (shares, max_price_since_entry, entry_price):
+                    state[sell] = 0
+                trades += sell
+
+            # 2. ENTRY LOGIC (not on the bar that just sold)
+            buy = entry_signal[i] & ~holding
+            if buy.any():
+                invest_amount = balance * POSITION_SIZE_PCT
+                invest_amount = np.where(invest_amount < 10, balance, invest_amount)
+                buy &= balance >= invest_amount * (1 + COMMISSION)
+                np.copyto(shares, (invest_amount / current_price) * (1 - COMMISSION), where=buy)
+                np.copyto(balance, balance - invest_amount, where=buy)
+                np.copyto(entry_price, current_price, where=buy)
+                np.copyto(max_price_since_entry, current_price, where=buy)
+
+    final_equity = balance + (shares * closes[-1])
+    return final_equity, max_dd, trades
+
+def score_result(final_equity, max_dd, trades):
+    """Optimization score of one backtest result (shared by the Optuna objective and the sweep)."""
+    roi = (final_equity - INITIAL_CAPITAL) / INITIAL_CAPITAL
     
-    params = {
-        "breakout_period": breakout_period,
-        "ema_period": ema_period,
-        "stop_loss": stop_loss,
-        "ts_trigger": ts_trigger,
-        "ts_dist": ts_dist
-    }
+    # --- SCORING FOR SPEED ---
     
-    try:
-        final_equity, max_dd, trades = backtest(df, params)
+    # 1. Survival Penalty
+    if final_equity < INITIAL_CAPITAL: 
+        return -100 + roi 
         
-        roi = (final_equity - INITIAL_CAPITAL) / INITIAL_CAPITAL
+    # 2. Activity Filter (Need ACTION!)
+    if trades < 300: # Approx 1 trade per day
+        return -50
         
-        # --- SCORING FOR SPEED ---
+    # 3. Drawdown Limit (Still need to survive)
+    if max_dd > 0.35: # Looser limit for aggressive growth
+        return roi * 0.5 
         
-        # 1. Survival Penalty
-        if final_equity < INITIAL_CAPITAL: 
-            return -100 + roi 
-            
-        # 2. Activity Filter (Need ACTION!)
-        if trades < 300: # Approx 1 trade per day
-            return -50
-            
-        # 3. Drawdown Limit (Still need to survive)
-        if max_dd > 0.35: # Looser limit for aggressive growth
-            return roi * 0.5 
-            
-        # Score heavily weighted on ROI
-        score = roi * 10 - (max_dd * 2)
-        return score
+    # Score heavily weighted on ROI
+    score = roi * 10 - (max_dd * 2)
+    return score
+
+def init_worker():
+    """Load the candles and the indicator bank (once per worker process)."""
+    global df, bank
+    if df is not None:
+        return
+    df = load_features(DATA_FILE)
+    print(f"Data loaded: {len(df)} candles")
+    # Rolling max / EMA variants computed once per period, shared by all trials
+    bank = IndicatorBank(df, breakout_periods=SEARCH_SPACE["breakout_period"][1:],
+                         ema_periods=SEARCH_SPACE["ema_period"][1:])
+
+def objective(trial):
+    params = {name: (trial.suggest_int if kind is int else trial.suggest_float)(name, low, high)
+              for name, (kind, low, high) in SEARCH_SPACE.items()}
+    
+    try:
+        final_equity, max_dd, trades = backtest(df, params, bank)
+        return score_result(final_equity, max_dd, trades)
         
     except Exception as e:
         print(e)
         return -100
 
+def sample_params(rng):
+    """Random point of SEARCH_SPACE, the objective's search space (for the vectorized sweep)."""
+    return {name: int(rng.integers(low, high + 1)) if kind is int else float(rng.uniform(low, high))
+            for name, (kind, low, high) in SEARCH_SPACE.items()}
+
+def run_sweep(n_samples=SWEEP_SAMPLES, seed=42, batch_size=SWEEP_BATCH):
+    """Score n_samples random parameter sets with sweep_breakout; returns a DataFrame sorted by score."""
+    init_worker()
+    rng = np.random.default_rng(seed)
+    param_sets = [sample_params(rng) for _ in range(n_samples)]
+    rows = []
+    for start in range(0, n_samples, batch_size):
+        batch = param_sets[start:start + batch_size]
+        final_equity, max_dd, trades = sweep_breakout(df, batch, bank)
+        for params, eq, dd, n in zip(batch, final_equity, max_dd, trades):
+            rows.append({**params, "final_equity": eq, "max_dd": dd, "trades": int(n),
+                         "score": score_result(eq, dd, n)})
+        print(f"⚡ Sweep: {min(start + batch_size, n_samples)}/{n_samples} combinaciones")
+    return pd.DataFrame(rows).sort_values("score", ascending=False, ignore_index=True)
+
 if __name__ == "__main__":
+    parser = add_runner_args(argparse.ArgumentParser(description="Breakout heuristic optimizer (SOL)"), "breakout_sol")
+    parser.add_argument("--sweep", action="store_true",
+                        help="Random vectorized sweep of the search space instead of the Optuna study")
+    parser.add_argument("--sweep-samples", type=int, default=SWEEP_SAMPLES)
+    args = parser.parse_args()
+
     if not os.path.exists(DATA_FILE):
         print(f"File {DATA_FILE} not found")
         exit()
-        
-    df = pd.read_csv(DATA_FILE)
-    print(f"Data loaded: {len(df)} candles")
 
-    study = optuna.create_study(direction="maximize")
+    if args.sweep:
+        print(f"🚀 Running vectorized breakout sweep ({args.sweep_samples} combinations)...")
+        results = run_sweep(args.sweep_samples)
+        results.to_csv("sweep_breakout_sol.csv", index=False)
+        print("\n🏆 TOP 10 SWEEP:")
+        print(results.head(10).to_string())
+        best = {k: results.loc[0, k] for k in ("breakout_period", "ema_period", "stop_loss", "ts_trigger", "ts_dist")}
+        best = {k: (int(v) if k.endswith("period") else float(v)) for k, v in best.items()}
+        with open("best_breakout_sol_sweep.json", "w") as f:
+            json.dump(best, f, indent=4)
+        exit()
+
     print("🚀 Running HYPER-ACTIVE Scalping Optimization (DEEP SEARCH - 1000 TRIALS)...")
-    study.optimize(objective, n_trials=1000) 
+    study = run_study(objective, N_TRIALS, args.study_name, args.storage, args.workers, worker_init=init_worker)
+    init_worker()
     
     print("\n🏆 BEST BREAKOUT PARAMS (1000 TRIALS):")
     best = study.best_params
     print(best)
     
-    final_eq, max_dd, trades = backtest(df, best)
+    final_eq, max_dd, trades = backtest(df, best, bank)
     roi = (final_eq - INITIAL_CAPITAL) / INITIAL_CAPITAL * 100
     
     print(f"\nSimulation Result:")
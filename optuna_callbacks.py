@@ -0,0 +1,49 @@
+"""
+Optuna Callbacks
+SB3 callback that scores the model on validation data during training, reports
+the score to the Optuna trial and stops the run as soon as the pruner gives up on it
+"""
+import optuna
+from stable_baselines3.common.callbacks import BaseCallback
+
+
+class TrialEvalCallback(BaseCallback):
+    """
+    Every eval_freq timesteps: score = eval_fn(model), trial.report(score, eval_idx).
+
+    Steps are reported as the evaluation index (1, 2, ...), so pruner settings such as
+    n_warmup_steps or Hyperband's min/max_resource are expressed in evaluations.
+    When the pruner says so, training stops and is_pruned is set; call
+    raise_if_pruned() after model.learn().
+    """
+
+    def __init__(self, trial, eval_fn, eval_freq=10000, verbose=0):
+        super().__init__(verbose)
+        self.trial = trial
+        self.eval_fn = eval_fn
+        self.eval_freq = eval_freq
+        self.eval_idx = 0
+        self.last_score = None
+        self.is_pruned = False
+        self._next_eval = eval_freq
+
+    def _on_step(self):
+        # num_timesteps grows by n_envs per call with vectorized envs
+        if self.num_timesteps < self._next_eval:
+            return True
+        self._next_eval += self.eval_freq
+        self.eval_idx += 1
+
+        self.last_score = float(self.eval_fn(self.model))
+        self.trial.report(self.last_score, self.eval_idx)
+        if self.verbose > 0:
+            print(f"📏 Trial {self.trial.number} | {self.num_timesteps} steps | score={self.last_score:.4f}")
+
+        if self.trial.should_prune():
+            self.is_pruned = True
+            return False
+        return True
+
+    def raise_if_pruned(self):
+        if self.is_pruned:
+            raise optuna.TrialPruned(f"Pruned at evaluation {self.eval_idx} ({self.num_timesteps} steps)")
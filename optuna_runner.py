@@ -0,0 +1,142 @@
+"""
+Optuna Runner
+Runs one study on N worker processes against persistent local storage, so searches
+use every core and an interrupted study resumes where it stopped.
+
+Storage: a journal file (default, safe for concurrent processes) or a SQLite
+database when the path ends in .db / .sqlite3.
+"""
+import multiprocessing as mp
+import os
+import sys
+
+import optuna
+from optuna.study import MaxTrialsCallback
+from optuna.trial import TrialState
+
+try:  # optuna >= 4.0
+    from optuna.storages import JournalStorage
+    from optuna.storages.journal import JournalFileBackend
+except ImportError:  # optuna 3.x
+    from optuna.storages import JournalStorage, JournalFileStorage as JournalFileBackend
+
+STORAGE_DIR = "optuna_studies"
+FINISHED_STATES = (TrialState.COMPLETE, TrialState.PRUNED)
+
+
+def default_storage_path(study_name):
+    return os.path.join(STORAGE_DIR, f"{study_name}.log")
+
+
+def make_storage(path):
+    """Journal file storage, or SQLite for *.db / *.sqlite3 paths."""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    if path.endswith((".db", ".sqlite3")):
+        return f"sqlite:///{path}"
+    return JournalStorage(JournalFileBackend(path))
+
+
+def add_runner_args(parser, study_name):
+    """--workers / --storage / --study-name flags shared by the optimization scripts."""
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Worker processes running trials of the same study in parallel")
+    parser.add_argument("--storage", default=None,
+                        help=f"Study storage file (default: {STORAGE_DIR}/<study-name>.log; *.db for SQLite)")
+    parser.add_argument("--study-name", default=study_name,
+                        help="Study name inside the storage (reuse it to resume)")
+    return parser
+
+
+def load_existing_study(study_name, storage_path=None):
+    """Reopen a study from storage (e.g. to report results after an interrupted run)."""
+    storage_path = storage_path or default_storage_path(study_name)
+    return optuna.load_study(study_name=study_name, storage=make_storage(storage_path))
+
+
+def _count_finished(study):
+    return len(study.get_trials(deepcopy=False, states=FINISHED_STATES))
+
+
+def _recover_interrupted(study):
+    """Trials left RUNNING by a crashed session are marked FAIL and queued again with the same params."""
+    for trial in study.get_trials(deepcopy=False, states=(TrialState.RUNNING,)):
+        study.tell(trial.number, state=TrialState.FAIL)
+        if trial.params:
+            study.enqueue_trial(trial.params, skip_if_exists=False)
+        print(f"♻️ Trial {trial.number} interrumpido en la sesión anterior: re-encolado")
+
+
+def _worker(study_name, storage_path, objective, n_trials, timeout, worker_init, worker_init_args, sampler, pruner,
+            n_threads):
+    """Process entry point: load data once (worker_init), then pull trials until the study is full."""
+    # This worker's share of the cores, so BLAS / torch threads don't oversubscribe the machine
+    os.environ.setdefault("OMP_NUM_THREADS", str(n_threads))
+    if "torch" in sys.modules:  # Already imported with the calling script: resize its pool directly
+        sys.modules["torch"].set_num_threads(int(os.environ["OMP_NUM_THREADS"]))
+    if sampler is not None:
+        sampler.reseed_rng()  # Seeded samplers would otherwise propose the same params in every worker
+    if worker_init is not None:
+        worker_init(*worker_init_args)
+    study = optuna.load_study(study_name=study_name, storage=make_storage(storage_path),
+                              sampler=sampler, pruner=pruner)
+    if _count_finished(study) >= n_trials:
+        return
+    study.optimize(objective, timeout=timeout, gc_after_trial=True,
+                   callbacks=[MaxTrialsCallback(n_trials, states=FINISHED_STATES)])
+
+
+def run_study(objective, n_trials, study_name, storage_path=None, n_workers=1, direction="maximize",
+              sampler=None, pruner=None, worker_init=None, worker_init_args=(), timeout=None):
+    """
+    Create (or resume) the study and run it until n_trials trials have finished.
+
+    objective / worker_init must be module-level functions: workers are spawned,
+    import the calling script and call worker_init(*worker_init_args) once before their
+    first trial (e.g. with a SharedMarketData handle, so they attach to one copy of the data).
+    Only one runner should use a storage file at a time (trials still RUNNING when it
+    starts are treated as leftovers of a crash). Returns the study.
+    """
+    storage_path = storage_path or default_storage_path(study_name)
+    storage = make_storage(storage_path)
+    study = optuna.create_study(study_name=study_name, storage=storage, direction=direction,
+                                sampler=sampler, pruner=pruner, load_if_exists=True)
+    _recover_interrupted(study)
+
+    done = _count_finished(study)
+    if done:
+        print(f"📂 Reanudando estudio '{study_name}': {done}/{n_trials} trials completados ({storage_path})")
+    if done >= n_trials:
+        return study
+
+    if n_workers <= 1:
+        if worker_init is not None:
+            worker_init(*worker_init_args)
+        study.optimize(objective, timeout=timeout,
+                       callbacks=[MaxTrialsCallback(n_trials, states=FINISHED_STATES)])
+        return study
+
+    print(f"⚙️ Lanzando {n_workers} workers sobre '{study_name}'")
+    n_threads = max(1, (os.cpu_count() or 1) // n_workers)
+    ctx = mp.get_context("spawn")
+    workers = [
+        ctx.Process(target=_worker, args=(study_name, storage_path, objective, n_trials, timeout,
+                                           worker_init, worker_init_args, sampler, pruner, n_threads))
+        for _ in range(n_workers)
+    ]
+    for worker in workers:
+        worker.start()
+    try:
+        for worker in workers:
+            worker.join()
+    except KeyboardInterrupt:
+        print("Interrumpido: los trials terminados ya están guardados, vuelve a lanzar para reanudar.")
+        for worker in workers:
+            worker.terminate()
+        for worker in workers:
+            worker.join()
+        raise
+
+    # Reload to see every worker's trials
+    return optuna.load_study(study_name=study_name, storage=storage)
@@ -1,3 +1,4 @@
+import argparse
 import optuna
 import pandas as pd
 import numpy as np
@@ -5,13 +6,20 @@ import os
 from stable_baselines3 import PPO
 from stable_baselines3.common.vec_env import DummyVecEnv
 from trading_env import TradingEnv
+from feature_pipeline import load_features
+from indicator_bank import IndicatorBank
+from optuna_runner import add_runner_args, run_study
 
 # Load Solana Data
-df = pd.read_csv("datos_sol_15m_binance.csv")
+df = load_features("datos_sol_15m_binance.csv") # Indicators + observation features from disk cache
 split_idx = int(len(df) * 0.8)
 df_train = df.iloc[:split_idx]
 df_val = df.iloc[split_idx:]
 
+# Env feature arrays built once per study; every trial's envs index into them
+train_bank = IndicatorBank(df_train)
+val_bank = IndicatorBank(df_val)
+
 def objective(trial):
     # 1. Suggest Hyperparameters for SOL Volatility
     # Solana needs more "reflexes", so we allow slightly higher LR
@@ -22,8 +30,8 @@ def objective(trial):
     batch_size = trial.suggest_categorical("batch_size", [32, 64, 128])
     
     # Env with realistic commission
-    env_train = DummyVecEnv([lambda: TradingEnv(df_train, commission=0.0005)])
-    env_val = DummyVecEnv([lambda: TradingEnv(df_val, commission=0.0005)])
+    env_train = DummyVecEnv([lambda: TradingEnv(market_data=train_bank.market_data(), commission=0.0005)])
+    env_val = DummyVecEnv([lambda: TradingEnv(market_data=val_bank.market_data(), commission=0.0005)])
 
     # 2. Base Model (The 9.37% winner + New Ph7 Logic)
     base_model = "models/ARCHIVE/SOL/ppo_sol_pro_final.zip"
@@ -73,11 +81,12 @@ def objective(trial):
         return -10000
 
 if __name__ == "__main__":
+    parser = add_runner_args(argparse.ArgumentParser(description="SOL PPO hyperparameter search"), "sol_alpha")
+    args = parser.parse_args()
+
     print("🚀 Iniciando SOLANA ALPHA OPTIMIZER (Versión Turbo)...")
-    study = optuna.create_study(direction="maximize")
-    
-    # 8 trials for professional speed/quality balance
-    study.optimize(objective, n_trials=8)
+    # 8 trials for professional speed/quality balance (data is loaded at import: once per worker)
+    study = run_study(objective, 8, args.study_name, args.storage, args.workers)
 
     print("\n🏆 SOLANA OPTUNA COMPLETADO")
     print(f"Mejor Alpha Score: {study.best_value}")
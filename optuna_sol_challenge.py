@@ -1,3 +1,4 @@
+import argparse
 import optuna
 import pandas as pd
 import numpy as np
@@ -6,6 +7,12 @@ import json
 from stable_baselines3 import PPO
 from stable_baselines3.common.vec_env import DummyVecEnv
 from trading_env import TradingEnv
+from feature_pipeline import load_features
+from vec_trading_env import VecTradingEnv, rollout_n_steps
+from optuna_runner import add_runner_args, run_study
+from shared_market_data import SharedMarketData
+from optuna_callbacks import TrialEvalCallback
+from optuna.pruners import HyperbandPruner
 
 # --- SETTINGS FOR THE 200 USD CHALLENGE ---
 INITIAL_BALANCE = 200
@@ -13,17 +20,28 @@ POSITION_SIZE_PCT = 0.60 # Tactical Mode (Balanced Aggression)
 COMMISSION = 0.0005     
 N_TRIALS = 5            
 TOTAL_TIMESTEPS = 150000 
+EVAL_FREQ = 10000 # Validation (and pruning decision) every 10k steps
+MIN_RESOURCE_STEPS = 20000 # Hyperband: every trial gets at least 20k steps
+N_ENVS = 8 # Parallel training episodes (one batched NumPy step)
 
-# Load Solana Data
-if os.path.exists("datos_sol_15m_binance.csv"):
-    df = pd.read_csv("datos_sol_15m_binance.csv")
-else:
-    print("Error: SOL Data not found!")
-    exit()
+train_data = None # Training arrays, attached from the parent's shared memory in each worker
+df_val = None
 
-split_idx = int(len(df) * 0.8)
-df_train = df.iloc[:split_idx]
-df_val = df.iloc[split_idx:]
+def split_data():
+    """Solana train/val split (indicators + observation features from disk cache)."""
+    if not os.path.exists("datos_sol_15m_binance.csv"):
+        print("Error: SOL Data not found!")
+        exit()
+    df = load_features("datos_sol_15m_binance.csv")
+    split_idx = int(len(df) * 0.8)
+    return df.iloc[:split_idx], df.iloc[split_idx:].copy()
+
+def load_data(train_handle):
+    """Once per worker process: attach to the published training arrays, load the validation split."""
+    global train_data, df_val
+    if train_data is None:
+        _, df_val = split_data()
+        train_data = train_handle.attach()
 
 def objective(trial):
     # 1. Hyperparameters customized for "Disciplined Sniper Phase"
@@ -40,8 +58,9 @@ def objective(trial):
     risk_aversion = trial.suggest_float("risk_aversion", 0.1, 0.5) # Healthy respect for loss
     
     # Create Env with Challenge Params - DISCIPLINED MODE
-    env_train = DummyVecEnv([lambda: TradingEnv(
-        df_train, 
+    env_train = VecTradingEnv(
+        market_data=train_data, 
+        n_envs=N_ENVS,
         initial_balance=INITIAL_BALANCE,
         commission=COMMISSION,
         position_size_pct=POSITION_SIZE_PCT,
@@ -51,7 +70,7 @@ def objective(trial):
         risk_aversion=risk_aversion,
         ema_penalty=0.01, # Gentle nudge to follow trend
         vol_penalty=0.01 
-    )])
+    )
     
     env_val = DummyVecEnv([lambda: TradingEnv(
         df_val, 
@@ -71,64 +90,84 @@ def objective(trial):
                 learning_rate=lr, 
                 ent_coef=ent_coef, 
                 gamma=gamma, 
-                n_steps=n_steps, 
+                n_steps=rollout_n_steps(n_steps, N_ENVS), 
                 batch_size=batch_size,
                 verbose=0, 
                 device="cuda")
 
-    # 3. Train
+    # 3. Train (validated every EVAL_FREQ steps; hopeless trials are pruned early)
+    eval_callback = TrialEvalCallback(trial, lambda m: evaluate_challenge(m, env_val)[0], eval_freq=EVAL_FREQ)
     try:
-        model.learn(total_timesteps=TOTAL_TIMESTEPS)
+        model.learn(total_timesteps=TOTAL_TIMESTEPS, callback=eval_callback)
+        eval_callback.raise_if_pruned()
         
         # 4. Challenge Evaluation
-        obs = env_val.reset()
-        net_worths = []
-        total_trades = 0
-        
-        for _ in range(len(df_val) - 61):
-            action, _ = model.predict(obs, deterministic=True)
-            obs, reward, done, info = env_val.step(action)
-            net_worths.append(info[0]['net_worth'])
-            total_trades = info[0]['total_trades'] # Track trades
-            if done: break
-            
-        final_nw = net_worths[-1]
-        max_nw = max(net_worths)
-        min_nw = min(net_worths)
-        
-        # Challenge Metrics
-        roi_pct = (final_nw - INITIAL_BALANCE) / INITIAL_BALANCE
-        drawdown = (max_nw - min_nw) / max_nw if max_nw > 0 else 1.0
-        
-        # --- FILTERS ---
-        # 1. Must Trade! (Lowered threshold)
-        if total_trades < 2:
-            return -20 # Soft penalty
-            
-        # 2. Must Survive!
-        if final_nw < INITIAL_BALANCE:
-            return -100 + roi_pct 
-            
-        # 3. Must not Blow Up!
-        if drawdown > 0.25: # Looser limit for 95% position size High Volatility
-             return roi_pct * 0.2 # Heavily penalized
-            
-        # SCORE:
-        score = roi_pct * (1 - drawdown)
-        
+        score, final_nw, roi_pct, drawdown, total_trades = evaluate_challenge(model, env_val)
         print(f"Trial Result: NW=${final_nw:.2f} | ROI={roi_pct*100:.1f}% | DD={drawdown*100:.1f}% | Trades={total_trades} | Score={score:.4f}")
         return score
 
+    except optuna.TrialPruned:
+        print(f"✂️ Trial {trial.number} podado en la evaluación {eval_callback.eval_idx} (score={eval_callback.last_score:.4f})")
+        raise
     except Exception as e:
         print(f"Trial failed: {e}")
         return -100
 
+def evaluate_challenge(model, env_val):
+    """Run the validation period; returns (score, final_nw, roi_pct, drawdown, total_trades)."""
+    obs = env_val.reset()
+    net_worths = []
+    total_trades = 0
+    
+    for _ in range(len(df_val) - 61):
+        action, _ = model.predict(obs, deterministic=True)
+        obs, reward, done, info = env_val.step(action)
+        net_worths.append(info[0]['net_worth'])
+        total_trades = info[0]['total_trades'] # Track trades
+        if done: break
+        
+    final_nw = net_worths[-1]
+    max_nw = max(net_worths)
+    min_nw = min(net_worths)
+    
+    # Challenge Metrics
+    roi_pct = (final_nw - INITIAL_BALANCE) / INITIAL_BALANCE
+    drawdown = (max_nw - min_nw) / max_nw if max_nw > 0 else 1.0
+    stats = (final_nw, roi_pct, drawdown, total_trades)
+    
+    # --- FILTERS ---
+    # 1. Must Trade! (Lowered threshold)
+    if total_trades < 2:
+        return (-20,) + stats # Soft penalty
+        
+    # 2. Must Survive!
+    if final_nw < INITIAL_BALANCE:
+        return (-100 + roi_pct,) + stats
+        
+    # 3. Must not Blow Up!
+    if drawdown > 0.25: # Looser limit for 95% position size High Volatility
+         return (roi_pct * 0.2,) + stats # Heavily penalized
+        
+    # SCORE:
+    score = roi_pct * (1 - drawdown)
+    return (score,) + stats
+
 if __name__ == "__main__":
+    parser = add_runner_args(argparse.ArgumentParser(description="SOL 200 USD challenge search"), "sol_challenge")
+    args = parser.parse_args()
+
     print(f"🚀 INICIANDO RETO 200 USD: SOLANA SPEED RUN")
     print(f"Settings: Equity=${INITIAL_BALANCE} | Position={POSITION_SIZE_PCT*100}% | Comm={COMMISSION*100}%")
     
-    study = optuna.create_study(direction="maximize")
-    study.optimize(objective, n_trials=N_TRIALS)
+    # Multi-fidelity budget: brackets of 20k..150k steps, resource counted in evaluations
+    pruner = HyperbandPruner(min_resource=MIN_RESOURCE_STEPS // EVAL_FREQ,
+                             max_resource=TOTAL_TIMESTEPS // EVAL_FREQ,
+                             reduction_factor=3)
+    # Training features computed once and shared by every worker
+    df_train, _ = split_data()
+    with SharedMarketData(df_train) as shared:
+        study = run_study(objective, N_TRIALS, args.study_name, args.storage, args.workers, pruner=pruner,
+                          worker_init=load_data, worker_init_args=(shared.handle,))
 
     print("\n🏆 RETO - CONFIGURACIÓN GANADORA ENCONTRADA")
     print(f"Mejor Score: {study.best_value}")
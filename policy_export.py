@@ -0,0 +1,189 @@
+"""
+Policy Export
+Writes the actor of a trained PPO MlpPolicy (Discrete actions) as plain NumPy weight
+arrays, and NumpyPolicy runs it without torch or stable_baselines3: the live bots start
+in a fraction of the time and memory and take the same deterministic actions.
+
+Usage: python policy_export.py models/PRODUCTION/SOL/ppo_sol_final.zip [more.zip ...]
+"""
+import logging
+import os
+import sys
+
+import numpy as np
+
+from feature_pipeline import file_sha256
+
+logger = logging.getLogger(__name__)
+
+EXPORT_VERSION = 1
+
+
+def _leaky_relu(x, slope):
+    return np.where(x >= 0, x, x * slope)
+
+
+def _elu(x, alpha):
+    return np.where(x > 0, x, alpha * np.expm1(np.minimum(x, 0)))
+
+
+# torch activation class name -> NumPy version f(x, param)
+ACTIVATIONS = {
+    "Tanh": lambda x, _: np.tanh(x),
+    "ReLU": lambda x, _: np.maximum(x, 0),
+    "LeakyReLU": _leaky_relu,
+    "ELU": _elu,
+    "Sigmoid": lambda x, _: 1 / (1 + np.exp(-x)),
+    "Identity": lambda x, _: x,
+}
+_ACTIVATION_PARAM = {"LeakyReLU": "negative_slope", "ELU": "alpha"}
+
+
+def exported_policy_path(model_path):
+    """models/.../ppo_sol_final.zip -> models/.../ppo_sol_final.policy.npz"""
+    root = model_path[:-4] if model_path.endswith(".zip") else model_path
+    return root + ".policy.npz"
+
+
+def policy_arrays(model):
+    """{name: array} describing the actor of an SB3 PPO model (raises ValueError if unsupported)."""
+    from gymnasium import spaces
+    from torch import nn
+    from stable_baselines3.common.torch_layers import FlattenExtractor
+
+    policy = model.policy
+    if not isinstance(model.action_space, spaces.Discrete):
+        raise ValueError(f"Only Discrete action spaces can be exported, got {model.action_space}")
+    if not isinstance(policy.pi_features_extractor, FlattenExtractor):
+        raise ValueError(f"Unsupported features extractor: {type(policy.pi_features_extractor).__name__}")
+
+    arrays = {"version": np.array(EXPORT_VERSION),
+              "obs_shape": np.array(model.observation_space.shape, dtype=np.int64)}
+    activations = []
+    weights = []
+    for module in policy.mlp_extractor.policy_net:
+        name = type(module).__name__
+        if isinstance(module, nn.Linear):
+            weights.append(module)
+            activations.append(("Identity", 0.0))
+        elif name in ACTIVATIONS and weights:
+            param = float(getattr(module, _ACTIVATION_PARAM.get(name, ""), 0.0))
+            activations[-1] = (name, param)
+        else:
+            raise ValueError(f"Unsupported layer in policy_net: {module}")
+    weights.append(policy.action_net)
+    activations.append(("Identity", 0.0))
+
+    for idx, linear in enumerate(weights):
+        arrays[f"w{idx}"] = linear.weight.detach().cpu().numpy().astype(np.float32)
+        arrays[f"b{idx}"] = linear.bias.detach().cpu().numpy().astype(np.float32)
+    arrays["activations"] = np.array([name for name, _ in activations])
+    arrays["activation_params"] = np.array([param for _, param in activations], dtype=np.float32)
+    return arrays
+
+
+def export_policy(model, path, source_path=None):
+    """
+    Write the actor of a trained PPO model to path (.npz); returns the path.
+    source_path: the saved .zip it was loaded from, so load_policy() can tell the export is current.
+    """
+    arrays = policy_arrays(model)
+    if source_path is not None:
+        arrays["source_sha256"] = np.array(file_sha256(source_path).hexdigest())
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        np.savez(f, **arrays)
+    os.replace(tmp_path, path)
+    return path
+
+
+class NumpyPolicy:
+    """
+    Forward pass of an exported actor in float32, like torch. predict() mirrors
+    PPO.predict: one observation -> 0-d action array, a batch -> (n,) actions.
+    """
+
+    def __init__(self, arrays):
+        if int(arrays["version"]) != EXPORT_VERSION:
+            raise ValueError(f"Unsupported export version {int(arrays['version'])}")
+        self.source_sha256 = str(arrays["source_sha256"]) if "source_sha256" in arrays else None
+        self.obs_shape = tuple(int(n) for n in arrays["obs_shape"])
+        n_layers = len(arrays["activations"])
+        # (in, out) weights so a row batch is x @ w + b
+        self.layers = [(np.ascontiguousarray(arrays[f"w{idx}"].T), arrays[f"b{idx}"].copy(),
+                        ACTIVATIONS[str(arrays["activations"][idx])], np.float32(arrays["activation_params"][idx]))
+                       for idx in range(n_layers)]
+        self.n_actions = len(self.layers[-1][1])
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            return cls({name: data[name] for name in data.files})
+
+    @classmethod
+    def from_model(cls, model):
+        return cls(policy_arrays(model))
+
+    def logits(self, obs):
+        """Action logits for a batch of observations, shape (n, n_actions)."""
+        x = np.asarray(obs, dtype=np.float32).reshape(-1, int(np.prod(self.obs_shape)))
+        for weight, bias, activation, param in self.layers:
+            x = activation(x @ weight + bias, param)
+        return x
+
+    def probs(self, obs):
+        """
+        Action probabilities as torch's Categorical computes them (logits - logsumexp, exp).
+        The deterministic action is their argmax like SB3's: logits one ulp apart can round
+        to equal probabilities, and then the first action wins.
+        """
+        logits = self.logits(obs)
+        peak = logits.max(axis=1, keepdims=True)
+        logsumexp = peak + np.log(np.exp(logits - peak).sum(axis=1, keepdims=True))
+        return np.exp(logits - logsumexp)
+
+    def predict(self, obs, state=None, episode_start=None, deterministic=True, rng=None):
+        obs = np.asarray(obs)
+        single = obs.shape == self.obs_shape
+        probs = self.probs(obs)
+        if deterministic:
+            actions = probs.argmax(axis=1)
+        else:
+            rng = rng or np.random.default_rng()
+            actions = (probs.cumsum(axis=1) > rng.random((len(probs), 1))).argmax(axis=1)
+        return (actions.squeeze(axis=0) if single else actions), state
+
+
+def load_policy(model_path):
+    """
+    The exported NumpyPolicy next to model_path when it was exported from this exact .zip,
+    else the SB3 model (torch is only imported in that case).
+    """
+    exported = exported_policy_path(model_path)
+    if os.path.exists(exported):
+        policy = NumpyPolicy.load(exported)
+        if not os.path.exists(model_path) or policy.source_sha256 == file_sha256(model_path).hexdigest():
+            return policy
+    if not os.path.exists(model_path):
+        raise FileNotFoundError(f"No se encuentra el modelo entrenado: {model_path}")
+    logger.warning(f"⚠️ Sin política exportada para {model_path}: se carga torch. "
+                   f"Ejecuta: python policy_export.py {model_path}")
+    from stable_baselines3 import PPO
+    return PPO.load(model_path, device="cpu")
+
+
+def main():
+    from stable_baselines3 import PPO
+
+    paths = sys.argv[1:]
+    if not paths:
+        print(__doc__)
+        return
+    for model_path in paths:
+        path = export_policy(PPO.load(model_path, device="cpu"), exported_policy_path(model_path), model_path)
+        print(f"📦 {model_path} -> {path} ({os.path.getsize(path) / 1024:.1f} KB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,17 +1,22 @@
-import time
 import os
 import json
 import pandas as pd
 import numpy as np
-import yfinance as yf
 import logging
+import threading
+import time
 from datetime import datetime
-from stable_baselines3 import PPO
 from config import get_asset_config
-from torch.utils.tensorboard import SummaryWriter
 from telegram_notifier import TelegramNotifier
-from trading_database import TradingDatabase
+from write_behind_db import WriteBehindDatabase
 from config_loader import load_bot_config
+from observation_builder import ObservationBuilder
+from feature_pipeline import OBS_COLS
+from streaming_indicators import StreamingFeatures
+from metrics import MetricsAccumulator
+from candle_store import CandleStore
+from bar_scheduler import CANDLE_SECONDS, PUBLISH_DELAY, BarScheduler, SystemClock
+from policy_export import load_policy
 
 # Configuración de Logging
 logging.basicConfig(
@@ -24,40 +29,123 @@ logging.basicConfig(
 )
 logger = logging.getLogger()
 
+
+# yf.download() collects its results in module globals (shared._DFS / _ERRORS) that every call
+# resets, so concurrent downloads (one session per symbol) can drop or swap frames
+_YAHOO_DOWNLOAD_LOCK = threading.Lock()
+
+def download_yahoo_candles(ticker, period=None, start=None):
+    """
+    15m candles from Yahoo Finance (yfinance layout; the last row is the forming candle):
+    the last `period`, or every candle opened since `start`. Downloads run one at a time.
+    """
+    import yfinance as yf  # Live-only dependency: replays feed candles from disk
+    # interval='15m' is supported by yfinance for last 60 days
+    with _YAHOO_DOWNLOAD_LOCK:
+        if start is not None:
+            return yf.download(ticker, interval="15m", start=start, progress=False)
+        return yf.download(ticker, interval="15m", period=period, progress=False)
+
+def production_model_path(symbol):
+    return f"models/PRODUCTION/{symbol.upper()}/ppo_{symbol.lower()}_final.zip"
+
+class NullWriter:
+    """Writer stand-in when TensorBoard is disabled in bot_config.yaml."""
+
+    def add_scalar(self, tag, value, step):
+        pass
+
+    def flush(self):
+        pass
+
+    def close(self):
+        pass
+
+class EventWriter:
+    """
+    TensorBoard scalars (add_scalar / flush / close) written with the tensorboard package
+    alone: torch.utils.tensorboard would import torch just to log a few numbers per candle.
+    """
+
+    def __init__(self, log_dir):
+        from tensorboard.summary.writer.event_file_writer import EventFileWriter
+        self.log_dir = log_dir
+        self._writer = EventFileWriter(log_dir)
+
+    def add_scalar(self, tag, value, step):
+        from tensorboard.compat.proto.event_pb2 import Event
+        from tensorboard.compat.proto.summary_pb2 import Summary
+        summary = Summary(value=[Summary.Value(tag=tag, simple_value=float(value))])
+        self._writer.add_event(Event(summary=summary, wall_time=time.time(), step=int(step)))
+
+    def flush(self):
+        self._writer.flush()
+
+    def close(self):
+        self._writer.close()
+
 class LiveTrader:
-    def __init__(self, asset_symbol):
+    def __init__(self, asset_symbol, clock=None, data_source=None, model=None, db=None, notifier=None,
+                 writer=None, bot_config=None):
+        """
+        Every side effect can be injected (live_replay.py replays history through this class):
+        clock (now/sleep), data_source(period) -> yfinance-style candles, model, db,
+        notifier and writer (TensorBoard). Defaults are the live ones.
+        """
         self.symbol = asset_symbol.upper()
+        self.clock = clock or SystemClock()
         # Mapping symbol to Yahoo Ticker
         self.yahoo_ticker = f"{self.symbol}-USD"
         
         # Load YAML Configuration
-        self.bot_config = load_bot_config()
+        self.bot_config = bot_config or load_bot_config()
         logger.info(f"⚙️ Configuration loaded from YAML")
         
         # Old config (for compatibility)
         self.config = get_asset_config(self.symbol)
         
-        # Database for persistent storage
-        self.db = TradingDatabase(f"trading_bot_{self.symbol.lower()}.db")
+        # Database for persistent storage (writes group-committed by a background thread)
+        self.db = db or WriteBehindDatabase(f"trading_bot_{self.symbol.lower()}.db")
         logger.info(f"💾 Database connected")
         
         # TensorBoard Logger (Gráficas estilo FTMO)
-        log_dir = f"tensorboard_logs/LIVE_{self.symbol}_200USD"
-        self.writer = SummaryWriter(log_dir)
-        logger.info(f"📊 TensorBoard activo en: {log_dir}")
+        if writer is None and not self.bot_config.get('monitoring', 'tensorboard', 'enabled', default=True):
+            writer = NullWriter()
+        if writer is None:
+            log_dir = f"tensorboard_logs/LIVE_{self.symbol}_200USD"
+            writer = EventWriter(log_dir)
+            logger.info(f"📊 TensorBoard activo en: {log_dir}")
+        self.writer = writer
 
-        logger.info(f"🌍 Conectando a Yahoo Finance ({self.yahoo_ticker}) para evitar bloqueo Geo-IP...")
+        if data_source is None:
+            logger.info(f"🌍 Conectando a Yahoo Finance ({self.yahoo_ticker}) para evitar bloqueo Geo-IP...")
+            # Local candle store: one backfill, then only the candles newer than the last stored one
+            candle_db = f"candles_{self.symbol.lower()}.db"
+            data_source = CandleStore(candle_db, lambda period=None, start=None: download_yahoo_candles(
+                self.yahoo_ticker, period, start))
+            logger.info(f"🕯️ Velas en caché local: {candle_db}")
+        self.data_source = data_source
             
         # Cargar Modelo
-        model_path = f"models/PRODUCTION/{self.symbol}/ppo_{self.symbol.lower()}_final.zip"
-        if not os.path.exists(model_path):
-            raise FileNotFoundError(f"No se encuentra el modelo entrenado: {model_path}")
-            
-        logger.info(f"🧠 Cargando cerebro IA para {self.symbol}...")
-        self.model = PPO.load(model_path)
+        if model is None:
+            # Exported NumPy actor (policy_export.py) when available: no torch / SB3 in the bot
+            logger.info(f"🧠 Cargando cerebro IA para {self.symbol}...")
+            model = load_policy(production_model_path(self.symbol))
+            logger.info(f"   Runtime: {type(model).__name__}")
+        self.model = model
         
         # Estado Interno
         self.window_size = 60
+        self.obs_builder = ObservationBuilder(self.window_size, len(OBS_COLS))
+        self.features = None # Indicadores incrementales (se siembran en la primera descarga)
+        self.last_closed_ts = None
+        # Inference cache: the window only changes when a candle closes, so the action is
+        # reused until then (TP/SL still checked on every tick in execute_trade)
+        self.cache_inference = self.bot_config.get('advanced', 'inference_once_per_candle', default=True)
+        self.inference_key = None # (last_closed_ts, current_position) of the cached action
+        self.cached_action = None
+        self.inference_runs = 0
+        self.inference_hits = 0
         self.current_position = 0 # 0: Nada, 1: Long
         self.entry_price = 0.0
         self.trade_start_time = None
@@ -68,10 +156,14 @@ class LiveTrader:
         # Prop Firm Tracking (From YAML Config)
         self.sim_balance = float(initial_capital)
         self.daily_start_balance = float(initial_capital)
-        self.last_day_checked = datetime.now().day
+        self.last_day_checked = self.clock.now().day
         self.max_daily_loss = 0.0
         self.wins = 0
         self.losses = 0
+        # Session metrics (Sharpe, Max DD...) without keeping the equity curve; one step per closed
+        # candle, since polling cycles run at irregular times (scheduler retries, ticks, replays)
+        self.session_metrics = MetricsAccumulator(steps_per_day=86400 // CANDLE_SECONDS)
+        self.metrics_candle_ts = None # Closed candle of the last session_metrics step
         
         # Risk Config (From YAML - Asset-specific or global)
         self.stop_loss_pct = self.bot_config.get_stop_loss(self.symbol)
@@ -82,11 +174,17 @@ class LiveTrader:
         
         logger.info(f"🎯 Risk Config: SL={self.stop_loss_pct*100:.1f}%, TP={self.take_profit_pct*100:.1f}%")
         
+        # Wake right after each candle closes (+ Yahoo's publication delay); TP/SL ticks in between
+        self.scheduler = BarScheduler(
+            self.clock,
+            publish_delay=self.bot_config.get('advanced', 'publish_delay_seconds', default=PUBLISH_DELAY["yfinance"]),
+            tick_seconds=self.bot_config.get('advanced', 'update_interval_seconds', default=60))
+        
         # Try to recover previous state from database
         self._recover_state()
         
         # Telegram Notifications
-        self.notifier = self._init_telegram()
+        self.notifier = notifier or self._init_telegram()
         
     def _init_telegram(self):
         """Initialize Telegram notifier from config file"""
@@ -140,7 +238,7 @@ class LiveTrader:
 
     def check_prop_firm_rules(self, current_equity):
         # Reset Daily Drawdown Logic
-        today = datetime.now().day
+        today = self.clock.now().day
         if today != self.last_day_checked:
             self.daily_start_balance = self.sim_balance
             self.last_day_checked = today
@@ -165,9 +263,9 @@ class LiveTrader:
     def fetch_market_data(self):
         """Descarga las últimas velas para alimentar al modelo usando Yahoo Finance."""
         try:
-            # Download recent data (enough for window_size + indicators)
-            # interval='15m' is supported by yfinance for last 60 days
-            df = yf.download(self.yahoo_ticker, interval="15m", period="5d", progress=False)
+            # Download recent data: 5 days to seed the indicators, then a short overlap window
+            period = "5d" if self.features is None else "2d"
+            df = self.data_source(period)
             
             if len(df) == 0:
                 logger.error("❌ Yahoo Finance devolvió DataFrame vacío.")
@@ -177,49 +275,34 @@ class LiveTrader:
             if isinstance(df.columns, pd.MultiIndex):
                 df.columns = df.columns.get_level_values(0)
 
-            # Reset index to get columns clean
-            df = df.reset_index()
-            
-            # YFinance columns: Date, Open, High, Low, Close, Adj Close, Volume
-            # Ensure proper naming
-            df = df.rename(columns={"Date": "timestamp", "Datetime": "timestamp"})
+            # Candle open times come as the index (Date / Datetime); plain arrays from here on
+            timestamps = df.index.to_numpy()
+            closes = df['Close'].to_numpy(dtype=np.float64)
             
             # Feature Engineering (TIENE QUE SER IDÉNTICO AL ENTRENAMIENTO)
-            # 1. Indicadores Técnicos
-            df['RSI'] = self.calculate_rsi(df['Close'], 14)
-            df['EMA_20'] = df['Close'].ewm(span=20, adjust=False).mean()
-            df['EMA_50'] = df['Close'].ewm(span=50, adjust=False).mean()
-            df['EMA_200'] = df['Close'].ewm(span=200, adjust=False).mean()
-            
-            # Bollinger Bands
-            rolling_mean = df['Close'].rolling(window=20).mean()
-            rolling_std = df['Close'].rolling(window=20).std()
-            df['BBU_20_2.0'] = rolling_mean + (rolling_std * 2.0)
-            df['BBL_20_2.0'] = rolling_mean - (rolling_std * 2.0)
-
-            # Features Normalizados para la IA
-            df['Log_Ret'] = np.log(df['Close'] / df['Close'].shift(1)).fillna(0)
-            df['RSI_Norm'] = df['RSI'] / 100.0
-            df['BB_Pct'] = (df['Close'] - df['BBL_20_2.0']) / (df['BBU_20_2.0'] - df['BBL_20_2.0'])
-            df['BB_Pct'] = df['BB_Pct'].fillna(0.5)
-            df['EMA_20_Dist'] = (df['Close'] / df['EMA_20']) - 1
-            df['EMA_50_Dist'] = (df['Close'] / df['EMA_50']) - 1
-            df['EMA_200_Dist'] = (df['Close'] / df['EMA_200']) - 1
+            # Mismas fórmulas que feature_pipeline, pero O(1) por vela cerrada.
+            # La última fila es la vela en formación: solo se previsualiza.
+            closed_ts = timestamps[:-1]
+            if self.features is None or not (closed_ts == self.last_closed_ts).any():
+                # Primera ejecución o hueco en los datos: sembrar desde cero
+                self.features = StreamingFeatures(self.window_size)
+                new_rows = np.ones(len(closed_ts), dtype=bool)
+            else:
+                new_rows = closed_ts > self.last_closed_ts
             
-            # Seleccionar últimas 60 velas
-            obs_cols = ['Log_Ret', 'RSI_Norm', 'BB_Pct', 'EMA_20_Dist', 'EMA_50_Dist', 'EMA_200_Dist']
+            for close in closes[:-1][new_rows]:
+                self.features.update(close)
+            if new_rows.any():
+                self.last_closed_ts = closed_ts[new_rows][-1]
             
-            if len(df) < self.window_size:
-                logger.error(f"❌ Datos insuficientes ({len(df)} velas). Esperando más historia...")
+            if self.features.count + 1 < self.window_size:
+                logger.error(f"❌ Datos insuficientes ({self.features.count + 1} velas). Esperando más historia...")
+                self.features = None
                 return None, None
                 
-            recent_data = df[obs_cols].iloc[-self.window_size:].values.astype(np.float32)
-            current_close = df['Close'].iloc[-1]
-            
-            # Clean scalar if it's a Series (yfinance quirk)
-            if hasattr(current_close, 'item'): 
-                current_close = current_close.item()
+            current_close = float(closes[-1])
             
+            recent_data = self.features.window(float(current_close))
             return recent_data, current_close
             
         except Exception as e:
@@ -233,18 +316,15 @@ class LiveTrader:
         balance_ratio = 0.0 # Asumimos balance neutral estable
         position_ratio = 1.0 if self.current_position > 0 else 0.0
         
-        account_obs = np.full((self.window_size, 2), [balance_ratio, position_ratio], dtype=np.float32)
-        
-        # Combinar
-        obs = np.hstack((market_data, account_obs))
-        return obs
+        # Combinar (buffer reutilizado, sin asignaciones por ciclo)
+        return self.obs_builder.build(market_data, balance_ratio, position_ratio)
 
     def execute_trade(self, action, price):
         """Simula la ejecución de la orden (Modo Señales) con Gestión de Riesgo."""
         # 0: Hold, 1: Buy, 2: Sell
         
         # Timestamp actual
-        now_dt = datetime.now()
+        now_dt = self.clock.now()
         now_str = now_dt.strftime("%Y-%m-%d %H:%M:%S")
         now_ts = now_dt.timestamp()
         step = int(now_ts)
@@ -257,6 +337,9 @@ class LiveTrader:
             
         # Check Prop Firm Rules
         self.check_prop_firm_rules(current_equity)
+        if self.last_closed_ts is None or self.last_closed_ts != self.metrics_candle_ts:
+            self.session_metrics.update(current_equity)
+            self.metrics_candle_ts = self.last_closed_ts
 
         # 1. MECHANICAL TAKE PROFIT CHECK (NEW - Secure Profits!)
         if self.current_position == 1:
@@ -365,6 +448,9 @@ class LiveTrader:
                 self.writer.add_scalar("FTMO_Sim/Balance", self.sim_balance, step)
                 self.writer.add_scalar("FTMO_Sim/WinRate", win_rate, step)
                 self.writer.add_scalar("FTMO_Risk/DailyDrawdown", self.max_daily_loss, step)
+                session = self.session_metrics.metrics()
+                self.writer.add_scalar("FTMO_Risk/SessionMaxDrawdown", session['max_drawdown_pct'], step)
+                self.writer.add_scalar("FTMO_Sim/SessionSharpe", session['sharpe'], step)
                 self.writer.flush()
             except Exception as e:
                 logger.error(f"Error escribiendo a TensorBoard: {e}")
@@ -376,33 +462,61 @@ class LiveTrader:
             # Reducir ruido: Solo loggear Hold ocasionalmente o si cambia algo
             pass
 
+    def run_once(self):
+        """One polling cycle: fetch candles, predict, execute. Returns the action (None without data)."""
+        market_data, current_price = self.fetch_market_data()
+        if market_data is None:
+            return None
+        return self.decide(market_data, current_price)
+
+    def decide(self, market_data, current_price):
+        """
+        Predict and execute on freshly fetched data. The model only runs when a candle
+        closed (or the position changed) since the last prediction.
+        """
+        key = (self.last_closed_ts, self.current_position)
+        cached = self.cache_inference and self.inference_key is not None and key == self.inference_key
+        if cached:
+            action = self.cached_action
+            self.inference_hits += 1
+        else:
+            obs = self.construct_observation(market_data)
+            
+            # Predecir
+            action, _ = self.model.predict(obs, deterministic=True)
+            action = action.item()
+            self.inference_key = key
+            self.cached_action = action
+            self.inference_runs += 1
+        logger.info(f"🔁 {self.symbol} | Vela {self.last_closed_ts} | ${current_price:.2f} | Acción {action} | "
+                    f"Inferencia: {'caché' if cached else 'ejecutada'}")
+        
+        # Ejecutar
+        self.execute_trade(action, current_price)
+        return action
+
     def run(self):
         logger.info(f"🚀 Iniciando Trader en Vivo (Señales) para {self.symbol}...")
         
-        while True:
-            # logger.info("⏳ Analizando mercado (Yahoo Finance)...")
-            
-            market_data, current_price = self.fetch_market_data()
-            if market_data is not None:
-                obs = self.construct_observation(market_data)
-                
-                # Predecir
-                action, _ = self.model.predict(obs, deterministic=True)
+        try:
+            while True:
+                # logger.info("⏳ Analizando mercado (Yahoo Finance)...")
+                self.run_once()
                 
-                # Ejecutar
-                self.execute_trade(action.item(), current_price)
-            
-            # Esperar 60 segundos antes de volver a chequear
-            # Yahoo tiene retraso, no necesitamos consultar cada milisegundo
-            time.sleep(60) 
-
-    # Utilidades
-    def calculate_rsi(self, series, period):
-        delta = series.diff()
-        gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
-        rs = gain / loss
-        return 100 - (100 / (1 + rs))
+                # Esperar al siguiente tick (60s) o al cierre de vela; reintentos rápidos hasta que Yahoo publique la vela cerrada
+                self.scheduler.sleep(self.last_closed_ts)
+        finally:
+            self.shutdown()
+
+    def shutdown(self):
+        """Commit the queued database writes, deliver the queued Telegram alerts and close the TensorBoard writer."""
+        close_db = getattr(self.db, "close", None)
+        if close_db is not None and close_db() is False:
+            logger.error("❌ No se pudieron guardar todas las operaciones pendientes en la base de datos")
+        close_notifier = getattr(self.notifier, "close", None)
+        if close_notifier is not None and not close_notifier():
+            logger.warning("⚠️ Algunos mensajes de Telegram no se entregaron antes de cerrar")
+        self.writer.close()
 
 if __name__ == "__main__":
     import sys
@@ -0,0 +1,103 @@
+"""
+Shared Market Data
+Publishes TradingEnv's feature matrix and price arrays once in shared memory so
+SubprocVecEnv workers attach read-only instead of each pickling a DataFrame copy
+"""
+import sys
+from dataclasses import dataclass
+from functools import partial
+from multiprocessing import shared_memory
+from typing import Dict, Tuple
+
+import numpy as np
+
+from trading_env import TradingEnv
+
+
+@dataclass(frozen=True)
+class ArraySpec:
+    shm_name: str
+    shape: Tuple[int, ...]
+    dtype: str
+
+
+@dataclass(frozen=True)
+class MarketDataHandle:
+    """Small picklable description of a SharedMarketData block (block names, shapes, dtypes)."""
+    specs: Dict[str, ArraySpec]
+
+    def attach(self):
+        """Map the shared blocks into this process as read-only arrays."""
+        return AttachedMarketData(self)
+
+
+def _open_shared_memory(name):
+    """Attach to an existing block; the owner (SharedMarketData.close) unlinks it, not the attaching process."""
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    # Before 3.13 attaching registers the block with the resource tracker. Workers started by the
+    # owner share its tracker, which keeps registered names in a set: the registration is a no-op
+    # duplicate of the owner's and is dropped by the owner's unlink(). (Unregistering here would
+    # remove the owner's entry instead.)
+    return shared_memory.SharedMemory(name=name)
+
+
+class AttachedMarketData:
+    """Read-only NumPy views over the shared blocks; pass as TradingEnv(market_data=...)."""
+
+    def __init__(self, handle):
+        self._blocks = []
+        for name, spec in handle.specs.items():
+            shm = _open_shared_memory(spec.shm_name)
+            array = np.ndarray(spec.shape, dtype=np.dtype(spec.dtype), buffer=shm.buf)
+            array.flags.writeable = False
+            self._blocks.append(shm)
+            setattr(self, name, array)
+
+    def close(self):
+        for shm in self._blocks:
+            shm.close()
+        self._blocks = []
+
+
+class SharedMarketData:
+    """
+    Owner of the shared blocks. Create it once in the parent process before
+    starting the workers, hand handle (or make_env_fns) to them, and close()
+    when training ends.
+    """
+
+    def __init__(self, df):
+        # A template env computes the features exactly as TradingEnv does
+        template = TradingEnv(df)
+        self._blocks = []
+        specs = {}
+        for name in TradingEnv.MARKET_ARRAYS:
+            source = np.ascontiguousarray(getattr(template, name))
+            shm = shared_memory.SharedMemory(create=True, size=max(source.nbytes, 1))
+            np.ndarray(source.shape, dtype=source.dtype, buffer=shm.buf)[...] = source
+            self._blocks.append(shm)
+            specs[name] = ArraySpec(shm.name, source.shape, source.dtype.str)
+        self.handle = MarketDataHandle(specs)
+
+    def make_env_fns(self, n_envs, **env_params):
+        """Picklable env factories for SubprocVecEnv; each worker attaches to the shared arrays."""
+        return [partial(make_shared_env, self.handle, env_params) for _ in range(n_envs)]
+
+    def close(self):
+        """Release and unlink the shared blocks (workers must be closed first)."""
+        for shm in self._blocks:
+            shm.close()
+            shm.unlink()
+        self._blocks = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def make_shared_env(handle, env_params):
+    """Worker-side factory: TradingEnv over the shared arrays instead of a DataFrame."""
+    return TradingEnv(market_data=handle.attach(), **env_params)
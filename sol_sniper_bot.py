@@ -6,6 +6,9 @@ import json
 import os
 from datetime import datetime
 
+from bar_scheduler import PUBLISH_DELAY, BarScheduler
+from streaming_indicators import EMA, RollingMax
+
 # --- CONFIGURATION (OPTION A: SAFE SNIPER) ---
 SYMBOL = 'SOL/USDT'
 TIMEFRAME = '15m'
@@ -64,6 +67,46 @@ def calculate_signals(df, params):
     
     return current_price, prev_breakout_level, ema_value
 
+class BreakoutSignals:
+    """
+    Incremental calculate_signals: O(1) per closed candle instead of recomputing
+    the rolling max and EMA over the whole fetch every cycle.
+    """
+    SEED_LIMIT = 500   # Candles fetched to seed the indicators
+    UPDATE_LIMIT = 10  # Candles fetched per cycle once seeded (overlap with the last one processed)
+
+    def __init__(self, params):
+        self.params = params
+        self.reset()
+
+    def reset(self):
+        self.roll_max = RollingMax(self.params['breakout_period'])
+        self.ema = EMA(span=self.params['ema_period'])
+        self.last_closed_ts = None
+
+    @property
+    def fetch_limit(self):
+        return self.SEED_LIMIT if self.last_closed_ts is None else self.UPDATE_LIMIT
+
+    def overlaps(self, df):
+        """True if df continues the candles already processed (or nothing was processed yet)."""
+        return self.last_closed_ts is None or self.last_closed_ts in set(df['timestamp'].iloc[:-1])
+
+    def calculate(self, df):
+        """Same outputs as calculate_signals(df, params); the last row is the forming candle."""
+        closed = df.iloc[:-1]
+        if self.last_closed_ts is not None:
+            closed = closed[closed['timestamp'] > self.last_closed_ts]
+        for high, close in zip(closed['high'].tolist(), closed['close'].tolist()):
+            self.roll_max.update(high)
+            self.ema.update(close)
+        if len(closed) > 0:
+            self.last_closed_ts = closed['timestamp'].iloc[-1]
+
+        current_price = df['close'].iloc[-1]
+        # Breakout level only uses closed candles (shift(1)); the EMA includes the forming one
+        return current_price, self.roll_max.value, self.ema.preview(current_price)
+
 def run_bot():
     print(f"🚀 SOL SNIPER BOT STARTED [Option A Config]")
     print(f"Strategy: Volatility Breakout")
@@ -72,11 +115,18 @@ def run_bot():
     # Mock State
     position = None # None or {'entry': float, 'shares': float, 'stop_loss': float, 'highest': float}
     balance = 200.0 # Simulation Balance
+    signals = BreakoutSignals(PARAMS)
+    # Wake right after each candle closes instead of a drifting 15 minute sleep
+    scheduler = BarScheduler(publish_delay=PUBLISH_DELAY["binance"])
     
     while True:
-        df = fetch_data(SYMBOL, TIMEFRAME)
+        df = fetch_data(SYMBOL, TIMEFRAME, limit=signals.fetch_limit)
+        if df is not None and not signals.overlaps(df):
+            # Gap since the last cycle: seed again from full history
+            signals.reset()
+            df = fetch_data(SYMBOL, TIMEFRAME, limit=signals.fetch_limit)
         if df is not None:
-            current_price, breakout_level, ema = calculate_signals(df, PARAMS)
+            current_price, breakout_level, ema = signals.calculate(df)
             
             timestamp = df['timestamp'].iloc[-1]
             print(f"\n[{timestamp}] Price: {current_price:.4f} | Breakout Lvl: {breakout_level:.4f} | EMA: {ema:.4f}")
@@ -147,7 +197,7 @@ def run_bot():
                     print(f"💵 NEW BALANCE: ${balance:.2f}")
                     position = None
 
-        time.sleep(15 * 60) # Wait 15 minutes for next candle (Simplified)
+        scheduler.sleep(signals.last_closed_ts) # Next candle close (quick retries until Binance serves it)
 
 if __name__ == "__main__":
     run_bot()
@@ -0,0 +1,232 @@
+"""
+Streaming Indicators
+O(1) incremental versions of the batch pandas indicators used by the live bots.
+update() consumes a closed candle; preview() evaluates the in-progress candle
+without changing state, so a bot can poll the forming candle every cycle.
+"""
+import math
+import operator
+from collections import deque
+
+import numpy as np
+
+from feature_pipeline import DEFAULT_PARAMS
+
+
+class EMA:
+    """Series.ewm(span=..., adjust=False, min_periods=...).mean()"""
+
+    def __init__(self, span=None, alpha=None, min_periods=0):
+        if alpha is None:
+            alpha = 2.0 / (span + 1.0)
+        self.alpha = alpha
+        self.min_periods = min_periods
+        self.count = 0
+        self.mean = math.nan
+
+    def _next(self, x):
+        if self.count == 0:
+            return x
+        return (1.0 - self.alpha) * self.mean + self.alpha * x
+
+    def _output(self, mean, count):
+        return mean if count >= self.min_periods else math.nan
+
+    def update(self, x):
+        self.mean = self._next(x)
+        self.count += 1
+        return self.value
+
+    def preview(self, x):
+        return self._output(self._next(x), self.count + 1)
+
+    @property
+    def value(self):
+        return self._output(self.mean, self.count)
+
+
+class RSI:
+    """Wilder RSI, same as feature_pipeline.add_indicators (and ta.momentum.RSIIndicator)."""
+
+    def __init__(self, period=14):
+        self.prev_close = None
+        self.ema_up = EMA(alpha=1.0 / period, min_periods=period)
+        self.ema_down = EMA(alpha=1.0 / period, min_periods=period)
+
+    def _moves(self, close):
+        # First candle has no delta; the batch version treats it as a 0.0 move
+        delta = 0.0 if self.prev_close is None else close - self.prev_close
+        return max(delta, 0.0), max(-delta, 0.0)
+
+    @staticmethod
+    def _rsi(up, down):
+        if down == 0:
+            return 100.0
+        return 100.0 - (100.0 / (1.0 + up / down))
+
+    def update(self, close):
+        up, down = self._moves(close)
+        self.prev_close = close
+        return self._rsi(self.ema_up.update(up), self.ema_down.update(down))
+
+    def preview(self, close):
+        up, down = self._moves(close)
+        return self._rsi(self.ema_up.preview(up), self.ema_down.preview(down))
+
+
+class RollingMeanStd:
+    """Rolling mean and population std (ddof=0, as in Bollinger Bands) via add/remove Welford updates."""
+
+    def __init__(self, window):
+        self.window = window
+        self.values = deque()
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def _next(self, x):
+        n, mean, m2 = len(self.values), self.mean, self.m2
+        # Add the new value
+        n += 1
+        delta = x - mean
+        mean += delta / n
+        m2 += delta * (x - mean)
+        # Drop the oldest value once the window is full
+        if n > self.window:
+            old = self.values[0]
+            n -= 1
+            delta = old - mean
+            mean -= delta / n
+            m2 -= delta * (old - mean)
+        return n, mean, max(m2, 0.0)
+
+    def _output(self, n, mean, m2):
+        if n < self.window:
+            return math.nan, math.nan
+        return mean, math.sqrt(m2 / n)
+
+    def update(self, x):
+        n, self.mean, self.m2 = self._next(x)
+        self.values.append(x)
+        if len(self.values) > self.window:
+            self.values.popleft()
+        return self._output(n, self.mean, self.m2)
+
+    def preview(self, x):
+        return self._output(*self._next(x))
+
+
+class _RollingExtreme:
+    """
+    Monotonic deque of (index, value); the front is always the window extreme.
+    dominates(a, b): whether an older candidate a stays ahead of a newer value b (operator.gt for a max).
+    """
+
+    def __init__(self, window, dominates):
+        self.window = window
+        self.dominates = dominates
+        self.count = 0
+        self.candidates = deque()
+
+    def _front(self, first_index):
+        # Extreme over indices >= first_index, skipping at most one expiring candidate
+        for index, value in self.candidates:
+            if index >= first_index:
+                return value
+        return math.nan
+
+    def update(self, x):
+        while self.candidates and not self.dominates(self.candidates[-1][1], x):
+            self.candidates.pop()
+        self.candidates.append((self.count, x))
+        self.count += 1
+        while self.candidates[0][0] <= self.count - 1 - self.window:
+            self.candidates.popleft()
+        return self.value
+
+    def preview(self, x):
+        if self.count + 1 < self.window:
+            return math.nan
+        best = self._front(self.count + 1 - self.window)
+        if math.isnan(best) or not self.dominates(best, x):
+            return x
+        return best
+
+    @property
+    def value(self):
+        if self.count < self.window:
+            return math.nan
+        return self.candidates[0][1]
+
+
+class RollingMax(_RollingExtreme):
+    """Series.rolling(window).max()"""
+
+    def __init__(self, window):
+        super().__init__(window, operator.gt)
+
+
+class RollingMin(_RollingExtreme):
+    """Series.rolling(window).min()"""
+
+    def __init__(self, window):
+        super().__init__(window, operator.lt)
+
+
+class StreamingFeatures:
+    """
+    Incremental TradingEnv observation columns (OBS_COLS, same order) for the live trader.
+    Matches feature_pipeline.build_features row by row; keeps the last window_size rows.
+    """
+
+    def __init__(self, window_size=60, params=None):
+        p = dict(DEFAULT_PARAMS)
+        if params:
+            p.update(params)
+        self.window_size = window_size
+        self.prev_close = None
+        self.rsi = RSI(p['rsi_period'])
+        self.ema_12 = EMA(span=12)
+        self.ema_26 = EMA(span=26)
+        self.macd_signal = EMA(span=9)
+        self.emas = [EMA(span=span, min_periods=span) for span in (20, 50, 200)]
+        self.rows = deque(maxlen=window_size)
+        self.count = 0
+
+    def _row(self, close, rsi, ema_12, ema_26, signal_fn, emas):
+        macd = ema_12 - ema_26
+        log_ret = 0.0 if self.prev_close is None else math.log(close / self.prev_close)
+        row = [
+            log_ret,
+            rsi / 100.0,
+            (macd - signal_fn(macd)) / close,
+            *[(close / ema) - 1 for ema in emas],
+        ]
+        # Same NaN cleanup as TradingEnv.data_matrix (EMAs still warming up -> 0)
+        return np.nan_to_num(np.array(row, dtype=np.float32))
+
+    def update(self, close):
+        """Consume a closed candle and return its observation row."""
+        row = self._row(
+            close, self.rsi.update(close), self.ema_12.update(close), self.ema_26.update(close),
+            self.macd_signal.update, [ema.update(close) for ema in self.emas])
+        self.prev_close = close
+        self.rows.append(row)
+        self.count += 1
+        return row
+
+    def preview(self, close):
+        """Observation row for the in-progress candle (state unchanged)."""
+        return self._row(
+            close, self.rsi.preview(close), self.ema_12.preview(close), self.ema_26.preview(close),
+            self.macd_signal.preview, [ema.preview(close) for ema in self.emas])
+
+    def window(self, preview_close=None):
+        """
+        Last window_size observation rows, shape (window_size, len(OBS_COLS)).
+        With preview_close the newest row is the in-progress candle.
+        """
+        if preview_close is None:
+            return np.stack(self.rows)
+        rows = list(self.rows)[-(self.window_size - 1):] if self.window_size > 1 else []
+        return np.stack(rows + [self.preview(preview_close)])
+
@@ -0,0 +1,36 @@
+"""
+Synthetic Market Data
+Seeded random-walk candles for the tests (tests/conftest.py) and the benchmarks
+(benchmarks/_market_data.py), each with its own default size
+"""
+import numpy as np
+import pandas as pd
+
+
+def make_market_df(n_rows, seed=7):
+    """Random-walk 15m OHLCV frame with the indicator columns TradingEnv expects (warm-up rows dropped)."""
+    rng = np.random.default_rng(seed)
+    close = 100.0 * np.exp(np.cumsum(rng.normal(0, 0.004, n_rows)))
+    high = close * (1 + np.abs(rng.normal(0, 0.002, n_rows)))
+    low = close * (1 - np.abs(rng.normal(0, 0.002, n_rows)))
+    df = pd.DataFrame({
+        'Open': np.r_[close[0], close[:-1]],
+        'High': high,
+        'Low': low,
+        'Close': close,
+        'Volume': rng.integers(100, 1000, n_rows).astype(float),
+    })
+    c = df['Close']
+    delta = c.diff()
+    gain = delta.where(delta > 0, 0.0).ewm(alpha=1 / 14, adjust=False).mean()
+    loss = (-delta.where(delta < 0, 0.0)).ewm(alpha=1 / 14, adjust=False).mean()
+    df['RSI'] = 100 - 100 / (1 + gain / loss)
+    mavg = c.rolling(20).mean()
+    mstd = c.rolling(20).std(ddof=0)
+    df['BBL_20_2.0'] = mavg - 2 * mstd
+    df['BBM_20_2.0'] = mavg
+    df['BBU_20_2.0'] = mavg + 2 * mstd
+    for span in (20, 50, 200):
+        df[f'EMA_{span}'] = c.ewm(span=span, adjust=False).mean()
+    return df.dropna().reset_index(drop=True)
+
@@ -2,24 +2,49 @@
 Telegram Notifier for Trading Bot
 Sends real-time alerts for trades, errors, and daily summaries
 """
-import requests
 import logging
+import queue
+import threading
+import time
 from datetime import datetime
 
+import requests
+
 logger = logging.getLogger(__name__)
 
+MAX_MESSAGE_LENGTH = 4096  # Telegram sendMessage limit
+DIGEST_SEPARATOR = "\n━━━━━━━━━━\n"
+
+
 class TelegramNotifier:
-    def __init__(self, bot_token, chat_id, enabled=True):
+    """
+    notify_* / send_message only enqueue (bounded queue, oldest dropped when full); a
+    background thread delivers over one keep-alive session, honors 429 retry_after,
+    retries network / 5xx errors with backoff and merges bursts into digest messages.
+    flush() / close() wait for delivery (e.g. on shutdown). async_delivery=False sends inline.
+    """
+
+    def __init__(self, bot_token, chat_id, enabled=True, async_delivery=True, max_queue=100,
+                 coalesce_seconds=1.0, max_retries=5, session=None):
         self.bot_token = bot_token
         self.chat_id = chat_id
         self.enabled = enabled
         self.base_url = f"https://api.telegram.org/bot{bot_token}"
+        self.async_delivery = async_delivery
+        self.coalesce_seconds = coalesce_seconds
+        self.max_retries = max_retries
+        self.session = session or requests.Session()
+        self.queue = queue.Queue(maxsize=max_queue)
+        self.dropped = 0
+        self.delivered = 0
+        self._stop = threading.Event()
+        self._worker = None
         
         if self.enabled:
             self._test_connection()
     
     def _test_connection(self):
-        """Test Telegram connection on initialization"""
+        """Test Telegram connection on initialization (queued: never blocks the constructor)"""
         try:
             self.send_message("🤖 Bot de Trading Iniciado\n\nConexión a Telegram establecida correctamente.")
             logger.info("✅ Telegram notifier initialized successfully")
@@ -28,23 +53,123 @@ class TelegramNotifier:
             self.enabled = False
     
     def send_message(self, message, parse_mode="HTML"):
-        """Send a message to Telegram"""
+        """Queue a message for Telegram (sent inline with async_delivery=False)"""
         if not self.enabled:
             return False
+        if not self.async_delivery:
+            return self._deliver(message, parse_mode)
         
-        try:
-            url = f"{self.base_url}/sendMessage"
-            data = {
-                "chat_id": self.chat_id,
-                "text": message,
-                "parse_mode": parse_mode
-            }
-            response = requests.post(url, data=data, timeout=10)
-            response.raise_for_status()
-            return True
-        except Exception as e:
-            logger.error(f"Failed to send Telegram message: {e}")
-            return False
+        self._ensure_worker()
+        while True:
+            try:
+                self.queue.put_nowait((message, parse_mode))
+                return True
+            except queue.Full:
+                # Keep the newest alerts: drop the oldest queued one
+                try:
+                    self.queue.get_nowait()
+                    self.queue.task_done()
+                    self.dropped += 1
+                except queue.Empty:
+                    pass
+    
+    def flush(self, timeout=30.0):
+        """Wait until every queued message was delivered (or given up). Returns True if the queue drained."""
+        deadline = time.monotonic() + timeout
+        while self.queue.unfinished_tasks:
+            if self._worker is None or not self._worker.is_alive() or time.monotonic() > deadline:
+                return False
+            time.sleep(0.01)
+        return True
+    
+    def close(self, timeout=30.0):
+        """Flush, then stop the delivery thread and the HTTP session"""
+        drained = self.flush(timeout)
+        self._stop.set()
+        if self._worker is not None:
+            self._worker.join(timeout=5)
+        self.session.close()
+        return drained
+    
+    # --- Delivery (background thread) ---
+    def _ensure_worker(self):
+        if self._worker is None or not self._worker.is_alive():
+            self._stop.clear()
+            self._worker = threading.Thread(target=self._run, name="telegram-sender", daemon=True)
+            self._worker.start()
+    
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                batch = [self.queue.get(timeout=0.5)]
+            except queue.Empty:
+                continue
+            # Burst: whatever else arrives within coalesce_seconds goes into one digest
+            deadline = time.monotonic() + self.coalesce_seconds
+            while True:
+                try:
+                    batch.append(self.queue.get(timeout=max(deadline - time.monotonic(), 0)))
+                except queue.Empty:
+                    break
+            try:
+                for text, parse_mode in self._digests(batch):
+                    self._deliver(text, parse_mode)
+            finally:
+                for _ in batch:
+                    self.queue.task_done()
+    
+    def _digests(self, batch):
+        """Merge queued messages into as few sendMessage texts as the length limit allows"""
+        if self.dropped:
+            notice = f"⚠️ {self.dropped} mensajes descartados (cola llena)"
+            self.dropped = 0
+            batch = [(notice, batch[0][1])] + batch
+        digests = []
+        for text, parse_mode in batch:
+            last = digests[-1] if digests else None
+            if (last and last[1] == parse_mode
+                    and len(last[0]) + len(DIGEST_SEPARATOR) + len(text) <= MAX_MESSAGE_LENGTH):
+                digests[-1] = (last[0] + DIGEST_SEPARATOR + text, parse_mode)
+            else:
+                digests.append((text, parse_mode))
+        return digests
+    
+    def _deliver(self, message, parse_mode="HTML"):
+        """POST one message with rate-limit-aware retries; returns True if Telegram accepted it"""
+        url = f"{self.base_url}/sendMessage"
+        data = {
+            "chat_id": self.chat_id,
+            "text": message,
+            "parse_mode": parse_mode
+        }
+        for attempt in range(self.max_retries + 1):
+            delay = min(2 ** attempt, 30)
+            try:
+                response = self.session.post(url, data=data, timeout=10)
+                if response.status_code == 429:
+                    # Rate limited: Telegram says how long to wait
+                    try:
+                        delay = float(response.json().get("parameters", {}).get("retry_after", delay))
+                    except ValueError:
+                        delay = float(response.headers.get("Retry-After", delay))
+                    logger.warning(f"Telegram rate limit: reintento en {delay:.0f}s")
+                elif response.status_code >= 500:
+                    logger.warning(f"Telegram HTTP {response.status_code}: reintento en {delay:.0f}s")
+                else:
+                    response.raise_for_status()
+                    self.delivered += 1
+                    return True
+            except requests.HTTPError as e:
+                logger.error(f"Failed to send Telegram message: {e}")
+                if e.response is not None and e.response.status_code in (401, 404):
+                    self.enabled = False  # Bad token / chat: stop queueing alerts nobody receives
+                return False  # 4xx other than 429: retrying will not help
+            except Exception as e:
+                logger.warning(f"Telegram no disponible ({e}): reintento en {delay:.0f}s")
+            if attempt < self.max_retries and self._stop.wait(delay):
+                break
+        logger.error("Failed to send Telegram message: retries exhausted")
+        return False
     
     def notify_buy(self, symbol, price, balance):
         """Notify when a BUY signal is detected"""
@@ -64,6 +64,10 @@ def test_telegram():
         notifier.notify_error("ETH", "Connection timeout to exchange")
         print("   ✅ Sent")
         
+        # Messages are delivered in the background: wait for the queue to drain
+        if not notifier.close():
+            print("⚠️ Some messages were not delivered (see logs)")
+        
         print()
         print("=" * 50)
         print("✅ ALL TESTS PASSED!")
@@ -0,0 +1,13 @@
+import pytest
+
+import synthetic_market_data
+
+
+def make_market_df(n_rows=3000, seed=7):
+    """Synthetic 15m OHLCV frame with the indicator columns TradingEnv expects."""
+    return synthetic_market_data.make_market_df(n_rows, seed)
+
+
+@pytest.fixture
+def market_df():
+    return make_market_df()
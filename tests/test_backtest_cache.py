@@ -0,0 +1,84 @@
+import json
+import os
+import time
+
+import numpy as np
+import pytest
+
+PPO = pytest.importorskip("stable_baselines3").PPO
+
+import backtest  # noqa: E402
+from backtest_cache import backtest_cache_key, cached_backtest  # noqa: E402
+from trading_env import TradingEnv  # noqa: E402
+
+
+@pytest.fixture
+def inputs(tmp_path, market_df, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    df = market_df.iloc[:400].reset_index(drop=True)
+    df.to_csv("datos_sol.csv", index=False)
+    PPO("MlpPolicy", TradingEnv(df), n_steps=64, seed=0, device="cpu").save("model.zip")
+    return str(tmp_path / "model.zip"), str(tmp_path / "datos_sol.csv")
+
+
+def test_key_tracks_model_data_and_params(inputs, tmp_path):
+    model_path, data_path = inputs
+    key = backtest_cache_key(model_path, data_path, {"stop_loss": 0.03})
+    assert key == backtest_cache_key(model_path, data_path, {"stop_loss": 0.03})
+    assert key != backtest_cache_key(model_path, data_path, {"stop_loss": 0.04})
+
+    with open(data_path, "a") as f:
+        f.write(open(data_path).readlines()[-1])
+    assert key != backtest_cache_key(model_path, data_path, {"stop_loss": 0.03})
+
+
+def test_cached_backtest_skips_simulation(inputs):
+    model_path, data_path = inputs
+    calls = []
+
+    def simulate():
+        calls.append(1)
+        return np.array([100.0, 101.5, 99.0]), {"total_trades": 2, "metrics": {"sharpe": 1.25}}
+
+    first = cached_backtest(model_path, data_path, {}, simulate)
+    second = cached_backtest(model_path, data_path, {}, simulate)
+    assert len(calls) == 1 and (first[2], second[2]) == (False, True)
+    np.testing.assert_array_equal(first[0], second[0])
+    assert first[1] == second[1]
+
+
+def test_run_backtest_hit_skips_model_and_data(inputs, monkeypatch):
+    """A second run_backtest on unchanged inputs reproduces the results and chart without loading anything."""
+    model_path, data_path = inputs
+    first = backtest.run_backtest("SOL", model_path=model_path, data_path=data_path, chart_name="sol.png")
+    with open("reports/sol.png", "rb") as f:
+        chart = f.read()
+    os.remove("reports/sol.png")
+
+    def fail(*args, **kwargs):
+        raise AssertionError("simulation should be skipped on a cache hit")
+    monkeypatch.setattr(backtest.PPO, "load", fail)
+    monkeypatch.setattr(backtest, "load_features", fail)
+
+    t0 = time.perf_counter()
+    second = backtest.run_backtest("SOL", model_path=model_path, data_path=data_path, chart_name="sol.png")
+    assert time.perf_counter() - t0 < 1.0
+    assert second == first
+    with open("reports/sol.png", "rb") as f:
+        assert f.read() == chart  # copied from the cache, not rendered again
+    with open("reports/results_summary.json") as f:
+        assert json.load(f)["SOL"]["final_balance"] == first["final_balance"]
+
+
+def test_only_model_load_failures_are_reported_as_such(inputs, monkeypatch, capsys):
+    """A corrupt checkpoint returns None; a bug in the simulation propagates with its real cause."""
+    model_path, data_path = inputs
+    with open(model_path, "wb") as f:
+        f.write(b"not a zip")
+    assert backtest.run_backtest("SOL", model_path=model_path, data_path=data_path, use_cache=False) is None
+    assert "Could not load model" in capsys.readouterr().out
+
+    monkeypatch.setattr(backtest.PPO, "load", lambda *args, **kwargs: object())
+    monkeypatch.setattr(backtest, "run_episode", lambda env, model: 1 / 0)
+    with pytest.raises(ZeroDivisionError):
+        backtest.run_backtest("SOL", model_path=model_path, data_path=data_path, use_cache=False)
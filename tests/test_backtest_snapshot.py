@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+
+PPO = pytest.importorskip("stable_baselines3").PPO
+
+from backtest import run_episode  # noqa: E402
+from backtest_snapshot import run_incremental  # noqa: E402
+from feature_pipeline import load_features  # noqa: E402
+from trading_env import TradingEnv  # noqa: E402
+
+PARAMS = {"commission": 0.0005}
+
+
+@pytest.fixture
+def setup(tmp_path, market_df, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    model = PPO("MlpPolicy", TradingEnv(market_df.iloc[:600]), n_steps=64, seed=0, device="cpu")
+    model.save("model.zip")
+    market_df.iloc[:900].to_csv("datos.csv", index=False)
+    return model, market_df
+
+
+def _incremental(model, params=PARAMS):
+    env = TradingEnv(load_features("datos.csv"), **params)
+    return run_incremental(model, env, "model.zip", "datos.csv", params)
+
+
+def _full(model, params=PARAMS):
+    return run_episode(TradingEnv(load_features("datos.csv"), **params), model)
+
+
+def test_resume_after_append_matches_full_replay(setup):
+    """After appending candles only the new rows are simulated, with the full-replay result."""
+    model, market_df = setup
+    first = _incremental(model)
+    assert first[3] is None
+
+    market_df.iloc[900:1100].to_csv("datos.csv", mode="a", header=False, index=False)
+    net_worths, trades, acc, resumed_step = _incremental(model)
+    full_curve, full_trades = _full(model)
+    assert resumed_step is not None and resumed_step > 800
+    np.testing.assert_array_equal(net_worths, full_curve)
+    assert trades == full_trades
+    assert acc.n_steps == len(full_curve)
+
+
+def test_rewritten_data_or_new_params_replay_from_start(setup):
+    model, market_df = setup
+    _incremental(model)
+    assert _incremental(model, {"commission": 0.001})[3] is None
+
+    edited = market_df.iloc[:950].copy()
+    edited.loc[10, "Close"] *= 1.01  # history changed, not just appended
+    edited.to_csv("datos.csv", index=False)
+    net_worths, trades, _, resumed_step = _incremental(model)
+    assert resumed_step is None
+    full_curve, full_trades = _full(model)
+    np.testing.assert_array_equal(net_worths, full_curve)
+    assert trades == full_trades
@@ -0,0 +1,80 @@
+import ast
+import os
+
+import numpy as np
+import pandas as pd
+
+from bar_scheduler import CANDLE_SECONDS, BarScheduler
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CLOSE = 1735690500  # 2025-01-01 00:15 UTC, a bar boundary
+LAST_BAR = pd.Timestamp(CLOSE - CANDLE_SECONDS, unit="s")  # Open time of the candle that closed at CLOSE
+
+
+def test_delay_waits_for_publication_then_idles():
+    scheduler = BarScheduler(publish_delay=5, retry_seconds=2, max_retry_seconds=60)
+    previous_bar = LAST_BAR - pd.Timedelta(seconds=CANDLE_SECONDS)
+    assert scheduler.delay(CLOSE - 100, previous_bar) == 105  # idle until close + delay
+    assert scheduler.delay(CLOSE + 1, previous_bar) == 4
+    assert scheduler.delay(CLOSE + 6, previous_bar) == 2  # not served yet: quick retry
+    assert scheduler.delay(CLOSE + 6, LAST_BAR) == CANDLE_SECONDS - 1
+    assert scheduler.delay(CLOSE + 70, None) == CANDLE_SECONDS - 65  # retries exhausted
+    # tz-aware timestamps (yfinance) are handled the same way
+    assert scheduler.delay(CLOSE + 6, LAST_BAR.tz_localize("UTC")) == CANDLE_SECONDS - 1
+
+
+def test_ticks_never_skip_the_close():
+    scheduler = BarScheduler(publish_delay=20, tick_seconds=60)
+    assert scheduler.delay(CLOSE + 30, LAST_BAR) == 60
+    assert scheduler.delay(CLOSE + CANDLE_SECONDS - 10, LAST_BAR) == 30  # next close + delay
+
+
+class FakeClock:
+    def __init__(self, t):
+        self.t = t
+
+    def time(self):
+        return self.t
+
+    def sleep(self, seconds):
+        self.t += seconds
+
+
+def test_decisions_follow_each_close_within_seconds():
+    """Against a provider that serves a candle 7-12 s after its close, every bar is seen within seconds."""
+    rng = np.random.default_rng(0)
+    publish_lag = rng.uniform(7, 12, 200)
+    clock = FakeClock(CLOSE + 123.4)
+    scheduler = BarScheduler(clock, publish_delay=8, retry_seconds=2)
+
+    latencies = {}
+    while clock.t < CLOSE + 100 * CANDLE_SECONDS:
+        # Provider view: the newest candle whose close has been published
+        n_closed = int((clock.t - CLOSE) // CANDLE_SECONDS)
+        if clock.t - (CLOSE + n_closed * CANDLE_SECONDS) < publish_lag[n_closed]:
+            n_closed -= 1
+        last_closed = CLOSE - CANDLE_SECONDS + n_closed * CANDLE_SECONDS
+        latencies.setdefault(n_closed, clock.t - (last_closed + CANDLE_SECONDS))
+        scheduler.sleep(pd.Timestamp(last_closed, unit="s"))
+
+    lags = np.array([latencies[n] for n in range(1, 99)])
+    assert (lags >= publish_lag[1:99]).all() and (lags < publish_lag[1:99] + 2.01).all()
+
+
+def test_production_image_copies_every_local_module_the_bot_imports():
+    with open(os.path.join(REPO, "Dockerfile.production")) as f:
+        copied = {name for line in f if line.startswith("COPY") for name in line.split()[1:-1]}
+    pending, needed = ["sol_sniper_bot"], set()
+    while pending:
+        module = pending.pop()
+        needed.add(f"{module}.py")
+        with open(os.path.join(REPO, f"{module}.py")) as f:
+            tree = ast.parse(f.read())
+        for node in ast.walk(tree):
+            names = [a.name for a in node.names] if isinstance(node, ast.Import) else \
+                [node.module] if isinstance(node, ast.ImportFrom) and node.module else []
+            for name in names:
+                local = name.split(".")[0]
+                if os.path.exists(os.path.join(REPO, f"{local}.py")) and f"{local}.py" not in needed:
+                    pending.append(local)
+    assert needed <= copied
@@ -0,0 +1,84 @@
+import json
+import multiprocessing as mp
+
+import pytest
+
+from backtest import update_results
+from batch_backtest import build_jobs, run_batch
+
+
+def _hammer(results_file, worker, n_updates):
+    for i in range(n_updates):
+        update_results({f"w{worker}_{i}": {"worker": worker, "i": i}}, results_file)
+
+
+def test_concurrent_updates_keep_every_entry(tmp_path):
+    """Parallel read-modify-write updates from several processes never lose an entry."""
+    results_file = str(tmp_path / "results.json")
+    ctx = mp.get_context("spawn")
+    procs = [ctx.Process(target=_hammer, args=(results_file, w, 25)) for w in range(4)]
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join()
+    with open(results_file) as f:
+        results = json.load(f)
+    assert len(results) == 100
+    assert not list(tmp_path.glob(".results_*"))  # no leftover temp files
+
+
+def test_build_jobs_matrix(tmp_path):
+    for asset in ("btc", "sol"):
+        (tmp_path / asset.upper()).mkdir()
+        for step in (1, 2):
+            (tmp_path / asset.upper() / f"ppo_{asset}_ckpt_{step}_steps.zip").touch()
+    jobs = build_jobs(["BTC", "sol", "ETH"], str(tmp_path / "{asset}" / "*.zip"),
+                      [{"commission": 0.0}, {"commission": 0.001}], data_path="datos_{asset}.csv")
+    assert len(jobs) == 2 * 2 * 2
+    assert len({job.key for job in jobs}) == len(jobs)
+    assert {job.data_path for job in jobs} == {"datos_btc.csv", "datos_sol.csv"}
+
+
+def test_run_batch_untrained_checkpoint(tmp_path, market_df, monkeypatch):
+    """End to end on a tiny untrained PPO checkpoint: result merged with metrics and params."""
+    monkeypatch.chdir(tmp_path)  # feature / backtest caches
+    PPO = pytest.importorskip("stable_baselines3").PPO
+    from trading_env import TradingEnv
+
+    data_path = tmp_path / "datos_sol.csv"
+    market_df.iloc[:400].to_csv(data_path, index=False)
+    model_dir = tmp_path / "SOL"
+    model_dir.mkdir()
+    PPO("MlpPolicy", TradingEnv(market_df.iloc[:400].reset_index(drop=True)), n_steps=64, seed=0,
+        device="cpu").save(model_dir / "ppo_sol_ckpt_64_steps.zip")
+
+    results_file = str(tmp_path / "batch.json")
+    jobs = build_jobs(["SOL"], str(tmp_path / "{asset}" / "*.zip"), [{"commission": 0.0005}],
+                      data_path=str(data_path))
+    results = run_batch(jobs, n_workers=1, results_file=results_file)
+    with open(results_file) as f:
+        stored = json.load(f)
+    assert list(stored) == list(results) == [jobs[0].key]
+    entry = stored[jobs[0].key]
+    assert entry["env_params"] == {"commission": 0.0005}
+    assert {"sharpe", "max_drawdown_pct", "final_balance"} <= set(entry)
+
+
+def test_run_batch_lockstep_matches_sequential(tmp_path, market_df, monkeypatch):
+    """Grouping a checkpoint's jobs into one lockstep run stores the same results."""
+    monkeypatch.chdir(tmp_path)
+    PPO = pytest.importorskip("stable_baselines3").PPO
+    from trading_env import TradingEnv
+
+    data_path = tmp_path / "datos_sol.csv"
+    market_df.iloc[:400].to_csv(data_path, index=False)
+    (tmp_path / "SOL").mkdir()
+    PPO("MlpPolicy", TradingEnv(market_df.iloc[:400].reset_index(drop=True)), n_steps=64, seed=0,
+        device="cpu").save(tmp_path / "SOL" / "ppo_sol_ckpt_64_steps.zip")
+    jobs = build_jobs(["SOL"], str(tmp_path / "{asset}" / "*.zip"),
+                      [{"commission": 0.0005}, {"commission": 0.001, "stop_loss": 0.05}], data_path=str(data_path),
+                      use_cache=False)
+
+    sequential = run_batch(jobs, results_file=str(tmp_path / "seq.json"))
+    lockstep = run_batch(jobs, results_file=str(tmp_path / "lock.json"), lockstep=True)
+    assert len(lockstep) == 2 and lockstep == sequential
@@ -0,0 +1,25 @@
+import numpy as np
+import pytest
+
+from optimize_heuristic_sol import backtest, backtest_loop, sample_params
+
+
+def test_event_simulator_matches_bar_loop(market_df):
+    """Final equity, max drawdown and trade count are bit-identical to the bar-by-bar loop."""
+    rng = np.random.default_rng(11)
+    for _ in range(25):
+        params = sample_params(rng)
+        assert backtest(market_df, params) == backtest_loop(market_df, params)
+
+
+@pytest.mark.parametrize("overrides", [
+    {"stop_loss": 0.9, "ts_trigger": 5.0},           # never exits: position open at the end
+    {"stop_loss": 0.2, "ts_trigger": 0.3},           # long holds beyond the first scan chunk
+    {"breakout_period": 48, "ema_period": 100},      # sparse signals
+])
+def test_event_simulator_edge_cases(market_df, overrides):
+    """Open-at-end positions, long holds and sparse signals also match the loop."""
+    params = {**sample_params(np.random.default_rng(3)), **overrides}
+    assert backtest(market_df, params) == backtest_loop(market_df, params)
+    short = market_df.iloc[:120].reset_index(drop=True)
+    assert backtest(short, params) == backtest_loop(short, params)
@@ -0,0 +1,28 @@
+import numpy as np
+
+from indicator_bank import IndicatorBank
+from optimize_heuristic_sol import backtest_loop, sample_params, score_result, sweep_breakout
+
+
+def test_sweep_matches_bar_loop(market_df):
+    """Every parameter set of a batch gets the same equity, drawdown and trades as backtest_loop."""
+    rng = np.random.default_rng(5)
+    param_sets = [sample_params(rng) for _ in range(40)]
+    param_sets.append({**param_sets[0], "stop_loss": 0.9, "ts_trigger": 5.0})  # open at the end
+    final_equity, max_dd, trades = sweep_breakout(market_df, param_sets, IndicatorBank(market_df))
+    for k, params in enumerate(param_sets):
+        assert (final_equity[k], max_dd[k], trades[k]) == backtest_loop(market_df, params)
+
+
+def test_sweep_builds_bank_for_params_outside_range(market_df):
+    """Periods outside the given bank's ranges fall back to a bank built for the batch."""
+    params = [{"breakout_period": 60, "ema_period": 150, "stop_loss": 0.02, "ts_trigger": 0.01, "ts_dist": 0.01}]
+    bank = IndicatorBank(market_df)
+    result = sweep_breakout(market_df, params, bank)
+    assert tuple(a[0] for a in result) == backtest_loop(market_df, params[0])
+
+
+def test_score_result_penalties():
+    assert score_result(150.0, 0.1, 500) < -99
+    assert score_result(250.0, 0.1, 10) == -50
+    assert score_result(300.0, 0.4, 500) == 0.25
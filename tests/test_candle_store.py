@@ -0,0 +1,111 @@
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from candle_store import CANDLE_SECONDS, CandleStore
+from conftest import make_market_df
+from run_live_trader import download_yahoo_candles
+
+T0 = 1735689600  # 2025-01-01 UTC
+
+
+class FakeYahoo:
+    """yfinance stand-in over synthetic candles; `now` (epoch seconds) moves the forming candle."""
+
+    def __init__(self, n_rows=1500, seed=5):
+        df = make_market_df(n_rows=n_rows, seed=seed)
+        self.ohlcv = df[CandleStore.COLUMNS].to_numpy(dtype=np.float64)
+        self.times = T0 + np.arange(len(df)) * CANDLE_SECONDS
+        self.now = int(self.times[600])
+        self.calls = []
+
+    def __call__(self, period=None, start=None):
+        self.calls.append((period, start))
+        forming = np.searchsorted(self.times, self.now, side='right') - 1
+        if start is not None:
+            first = np.searchsorted(self.times, int(start.timestamp()))
+        else:
+            first = max(0, forming - int(period[:-1]) * 96 + 1)
+        rows = self.ohlcv[first:forming + 1].copy()
+        rows[-1, 1:4] = rows[-1, 0]  # Forming candle: High / Low / Close = Open
+        index = pd.DatetimeIndex(pd.to_datetime(self.times[first:forming + 1], unit="s", utc=True), name="Datetime")
+        # yfinance >= 0.2.48 layout: (Price, Ticker) columns
+        return pd.DataFrame(rows, index=index, columns=pd.MultiIndex.from_product([CandleStore.COLUMNS, ["SOL-USD"]]))
+
+
+class SharedStateYahoo:
+    """
+    yfinance module stand-in whose download(), like the real one, gathers results in a
+    module-global dict reset on every call and returns every frame it holds.
+    """
+
+    def __init__(self, feeds):
+        self.feeds = feeds
+        self._dfs = {}
+
+    def download(self, ticker, interval, period=None, start=None, progress=True):
+        self._dfs = {}
+        time.sleep(0.02)  # the HTTP request
+        self._dfs[ticker] = self.feeds[ticker](period=period, start=start)
+        time.sleep(0.02)
+        return pd.concat(list(self._dfs.values()), axis=1)
+
+
+def _store(path, yahoo):
+    return CandleStore(str(path), yahoo, time_fn=lambda: yahoo.now)
+
+
+def test_backfill_once_then_only_new_candles(tmp_path):
+    yahoo = FakeYahoo()
+    store = _store(tmp_path / "candles.db", yahoo)
+    first = store("5d")
+    assert yahoo.calls[0] == ("5d", None) and len(first) == 5 * 96
+
+    yahoo.now += 3 * CANDLE_SECONDS + 60
+    assert store.sync() == 4  # the previously forming candle (now closed) + 3 new ones
+    frame = store.candles(2 * 96)
+    assert yahoo.calls[1][1] == pd.Timestamp(yahoo.times[600], unit="s", tz="UTC")
+    # Closed candles are the final values, the last row is the new forming candle
+    np.testing.assert_array_equal(frame.to_numpy()[:-1], yahoo.ohlcv[603 - 2 * 96 + 1:603])
+    assert frame.index[-1] == pd.Timestamp(yahoo.times[603], unit="s")
+    assert frame['Close'].iloc[-1] == yahoo.ohlcv[603, 0]
+
+
+def test_restart_resumes_from_disk_and_long_gap_backfills(tmp_path):
+    yahoo = FakeYahoo()
+    _store(tmp_path / "candles.db", yahoo)("5d")
+    yahoo.now += CANDLE_SECONDS
+
+    restarted = _store(tmp_path / "candles.db", yahoo)
+    assert len(restarted("2d")) == 2 * 96
+    assert yahoo.calls[-1][0] is None  # incremental, no second backfill
+
+    yahoo.now += 6 * 96 * CANDLE_SECONDS  # offline longer than the backfill window
+    frame = restarted("5d")
+    assert yahoo.calls[-1] == ("5d", None)
+    assert len(frame) == 5 * 96
+    assert (np.diff(frame.index.to_numpy()) == np.timedelta64(CANDLE_SECONDS, 's')).all()
+
+
+def test_concurrent_yahoo_syncs_keep_each_symbol_frame(tmp_path, monkeypatch):
+    """Several sessions syncing their CandleStore at once through download_yahoo_candles each get their own candles."""
+    feeds = {ticker: FakeYahoo(seed=seed) for seed, ticker in enumerate(["BTC-USD", "ETH-USD", "SOL-USD"])}
+    monkeypatch.setitem(sys.modules, "yfinance", SharedStateYahoo(feeds))
+    stores = {ticker: CandleStore(str(tmp_path / f"{ticker}.db"),
+                                  lambda period=None, start=None, ticker=ticker: download_yahoo_candles(ticker, period, start),
+                                  time_fn=lambda ticker=ticker: feeds[ticker].now)
+              for ticker in feeds}
+
+    with ThreadPoolExecutor(len(stores)) as pool:
+        for _ in range(3):
+            frames = dict(zip(stores, pool.map(lambda store: store("5d"), stores.values())))
+            for ticker, frame in frames.items():
+                yahoo = feeds[ticker]
+                forming = int(np.searchsorted(yahoo.times, yahoo.now, side='right')) - 1
+                np.testing.assert_array_equal(frame.to_numpy()[:-1], yahoo.ohlcv[forming - 5 * 96 + 1:forming])
+                yahoo.now += CANDLE_SECONDS
+    for store in stores.values():
+        store.close()
@@ -0,0 +1,52 @@
+import os
+
+import numpy as np
+import pytest
+
+from feature_pipeline import OBS_COLS, add_indicators, build_features, feature_cache_key, load_features
+from trading_env import TradingEnv
+
+OHLCV = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+
+def test_indicators_match_ta(market_df):
+    """RSI, Bollinger and EMA columns reproduce the `ta` package used to build the training CSVs."""
+    ta = pytest.importorskip("ta")
+    df = add_indicators(market_df[OHLCV].copy())
+    close = market_df['Close']
+    np.testing.assert_allclose(df['RSI'], ta.momentum.RSIIndicator(close=close).rsi(), rtol=1e-12)
+    bb = ta.volatility.BollingerBands(close=close)
+    np.testing.assert_allclose(df['BBU_20_2.0'], bb.bollinger_hband(), rtol=1e-12)
+    np.testing.assert_allclose(df['BBL_20_2.0'], bb.bollinger_lband(), rtol=1e-12)
+    np.testing.assert_allclose(df['EMA_200'], ta.trend.EMAIndicator(close=close, window=200).ema_indicator(), rtol=1e-12)
+
+
+def test_existing_indicator_columns_are_kept(market_df):
+    """Indicators already in the CSV are not recomputed unless asked to."""
+    df = add_indicators(market_df.copy())
+    np.testing.assert_array_equal(df['EMA_200'], market_df['EMA_200'])
+
+
+def test_env_on_precomputed_features_matches(market_df):
+    """TradingEnv fed a pipeline frame builds the same observation matrix as from the raw CSV frame."""
+    env_raw = TradingEnv(market_df)
+    env_pre = TradingEnv(build_features(market_df))
+    np.testing.assert_array_equal(env_raw.data_matrix, env_pre.data_matrix)
+
+
+def test_load_features_uses_disk_cache(market_df, tmp_path):
+    """The second load is served from the cache; editing the file or params changes the key."""
+    data_path = tmp_path / "candles.csv"
+    cache_dir = tmp_path / "cache"
+    market_df.to_csv(data_path, index=False)
+
+    first = load_features(data_path, cache_dir=cache_dir)
+    assert len(os.listdir(cache_dir)) == 1
+    second = load_features(data_path, cache_dir=cache_dir)
+    assert list(second.columns) == list(first.columns)
+    np.testing.assert_array_equal(second[OBS_COLS].values, first[OBS_COLS].values)
+
+    key = feature_cache_key(data_path)
+    assert feature_cache_key(data_path, {"rsi_period": 7}) != key
+    market_df.iloc[:-1].to_csv(data_path, index=False)
+    assert feature_cache_key(data_path) != key
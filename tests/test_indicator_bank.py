@@ -0,0 +1,45 @@
+import numpy as np
+
+from indicator_bank import IndicatorBank
+from optimize_heuristic_sol import backtest, breakout_indicators
+from trading_env import TradingEnv
+
+
+def test_bank_rows_match_direct_indicators(market_df):
+    """Cached rows equal the per-trial pandas computation, and repeated lookups reuse the same row."""
+    bank = IndicatorBank(market_df)
+    for period, span in [(4, 20), (27, 63), (48, 100), (60, 150)]:  # last pair is outside the cached ranges
+        roll_max, ema = breakout_indicators(market_df, period, span)
+        np.testing.assert_array_equal(bank.roll_max(period), roll_max)
+        np.testing.assert_array_equal(bank.ema(span), ema)
+    assert np.shares_memory(bank.roll_max(27), bank.roll_max(27))
+    assert bank.nbytes == (45 + 81) * len(market_df) * 8
+
+
+def test_backtest_with_bank_is_identical(market_df):
+    """Trials served from the bank return exactly what the standalone backtest does."""
+    bank = IndicatorBank(market_df).precompute()
+    params = {"breakout_period": 12, "ema_period": 35, "stop_loss": 0.02, "ts_trigger": 0.01, "ts_dist": 0.008}
+    assert backtest(market_df, params, bank) == backtest(market_df, params)
+
+
+def test_float32_bank_halves_memory(market_df):
+    bank = IndicatorBank(market_df, dtype=np.float32).precompute()
+    assert bank.roll_max(10).dtype == np.float32
+    assert bank.nbytes == (45 + 81) * len(market_df) * 4
+
+
+def test_market_data_feeds_trading_env(market_df):
+    """Envs built on the bank's shared arrays behave like envs built from the frame."""
+    bank = IndicatorBank(market_df)
+    assert bank.market_data() is bank.market_data()
+    env_bank = TradingEnv(market_data=bank.market_data())
+    env_df = TradingEnv(market_df)
+    obs_bank, _ = env_bank.reset()
+    obs_df, _ = env_df.reset()
+    np.testing.assert_array_equal(obs_bank, obs_df)
+    for action in [1, 0, 0, 2, 1, 0]:
+        out_bank = env_bank.step(action)
+        out_df = env_df.step(action)
+        np.testing.assert_array_equal(out_bank[0], out_df[0])
+        assert out_bank[1] == out_df[1]
@@ -0,0 +1,107 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("stable_baselines3")
+
+from candle_store import CandleStore  # noqa: E402
+from config_loader import load_bot_config  # noqa: E402
+from conftest import make_market_df  # noqa: E402
+from live_replay import (HistoricalCandles, RecordingDatabase, RecordingNotifier, RecordingWriter,  # noqa: E402
+                         SimulatedClock, replay)
+from run_live_trader import LiveTrader  # noqa: E402
+
+
+class AlwaysBuy:
+    """Stub policy: BUY on every cycle, so exits come only from take profit / stop loss."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def predict(self, obs, deterministic=True):
+        self.calls += 1
+        return np.array(1), None
+
+
+def _candles(n_rows):
+    df = make_market_df(n_rows=n_rows, seed=3)
+    times = (pd.Timestamp("2025-01-01") + pd.to_timedelta(np.arange(len(df)) * 15, unit="min")).to_numpy()
+    return times, df[HistoricalCandles.COLUMNS].to_numpy(dtype=np.float64)
+
+
+def test_forming_candle_shows_no_future_prices():
+    times, ohlcv = _candles(700)
+    clock = SimulatedClock(pd.Timestamp(times[600]).to_pydatetime() + pd.Timedelta(minutes=7))
+    frame = HistoricalCandles(times, ohlcv, clock)("5d")
+    assert frame.index[-1] == times[600]
+    assert len(frame) == 5 * 96
+    np.testing.assert_array_equal(frame.iloc[:-1].to_numpy(), ohlcv[121:600])
+    assert (frame.iloc[-1][['High', 'Low', 'Close']] == ohlcv[600, 0]).all()
+
+
+def test_replay_records_trades_and_honors_cooldown():
+    """TP/SL exits and the cooldown run on simulated time; side effects stay in memory."""
+    times, ohlcv = _candles(2500)
+    model = AlwaysBuy()
+    result = replay("SOL", times, ohlcv, model)
+    trader = result.trader
+
+    assert result.cycles == model.calls == len(times) - 5 * 96
+    buys = [t for t in result.trades if t["action"] == "BUY"]
+    sells = [t for t in result.trades if t["action"] == "SELL"]
+    assert len(sells) >= 2 and len(buys) - len(sells) in (0, 1)
+    assert {t["reason"] for t in sells} <= {"Take Profit", "Stop Loss"}
+    assert trader.wins + trader.losses == len(sells)
+
+    # Trades execute at the open of the candle forming at that moment
+    for trade in buys:
+        row = np.searchsorted(times, np.datetime64(trade["time"]), side='right') - 1
+        assert trade["entry_price"] == ohlcv[row, 0]
+
+    cooldown = pd.Timedelta(seconds=trader.cooldown_seconds)
+    for sell, next_buy in zip(sells, buys[1:]):
+        assert next_buy["time"] - sell["time"] >= cooldown
+
+    names = [name for _, name, _, _ in result.notifications]
+    assert names.count("notify_buy") == len(buys) and names.count("notify_sell") == len(sells)
+    assert sum(tag == "FTMO_Sim/Balance" for tag, _, _ in result.scalars) == len(sells)
+
+
+def test_inference_runs_once_per_closed_candle():
+    """60 s ticks reuse the cached action until a candle closes or the position changes; same trades."""
+    times, ohlcv = _candles(700)
+    no_cache = load_bot_config()
+    no_cache.config.setdefault('advanced', {})['inference_once_per_candle'] = False
+    cached, uncached = (replay("SOL", times, ohlcv, AlwaysBuy(), poll_seconds=60, bot_config=config)
+                        for config in (None, no_cache))
+
+    assert cached.trades == uncached.trades and cached.cycles == uncached.cycles
+    trader = cached.trader
+    assert uncached.trader.inference_runs == uncached.cycles
+    assert trader.inference_runs + trader.inference_hits == cached.cycles
+    n_candles = len(times) - 5 * 96
+    assert n_candles <= trader.inference_runs <= n_candles + len(cached.trades)
+    # Session metrics step once per closed candle too, whatever the polling rate
+    assert trader.session_metrics.n_steps == n_candles and trader.session_metrics.steps_per_day == 96
+
+
+def test_candle_store_feeds_identical_windows(tmp_path):
+    """A CandleStore-backed trader sees the same observation windows as direct downloads."""
+    times, ohlcv = _candles(900)
+    clock = SimulatedClock(pd.Timestamp(times[500]).to_pydatetime())
+    history = HistoricalCandles(times, ohlcv, clock)
+
+    def fetch(period=None, start=None):
+        frame = history("5d")
+        return frame if start is None else frame[frame.index >= pd.Timestamp(start).tz_localize(None)]
+
+    store = CandleStore(str(tmp_path / "candles.db"), fetch,
+                        time_fn=lambda: pd.Timestamp(clock.now()).tz_localize("UTC").timestamp())
+    traders = [LiveTrader("SOL", clock=clock, data_source=source, model=AlwaysBuy(), db=RecordingDatabase(clock),
+                          notifier=RecordingNotifier(clock), writer=RecordingWriter())
+               for source in (history, store)]
+    for _ in range(150):
+        direct, stored = (trader.fetch_market_data() for trader in traders)
+        np.testing.assert_array_equal(direct[0], stored[0])
+        assert direct[1] == stored[1]
+        clock.sleep(5 * 60)
@@ -0,0 +1,42 @@
+import numpy as np
+import pytest
+
+from conftest import make_market_df
+
+PPO = pytest.importorskip("stable_baselines3").PPO
+
+from backtest import batched_actions, run_episode, run_episodes_lockstep  # noqa: E402
+from trading_env import TradingEnv  # noqa: E402
+
+
+@pytest.fixture(scope="module")
+def model():
+    df = make_market_df(600)
+    return PPO("MlpPolicy", TradingEnv(df), n_steps=64, seed=0, device="cpu")
+
+
+def _envs():
+    df = make_market_df(900)
+    return [
+        TradingEnv(df, commission=0.0005),
+        TradingEnv(df.iloc[300:].reset_index(drop=True), stop_loss=0.05),  # other date range
+        TradingEnv(make_market_df(700, seed=3), risk_aversion=1.0),        # other asset
+        TradingEnv(df, position_size_pct=0.2),
+    ]
+
+
+def test_lockstep_matches_one_at_a_time(model):
+    """Every env's equity curve and trade count are identical to running it alone."""
+    single = [run_episode(env, model) for env in _envs()]
+    lockstep = run_episodes_lockstep(_envs(), model)
+    for (nw_single, trades_single), (nw_lock, trades_lock) in zip(single, lockstep):
+        assert trades_single == trades_lock
+        np.testing.assert_array_equal(nw_single, nw_lock)
+
+
+def test_batched_actions_match_predict(model):
+    """Batched argmax (with the near-tie fallback) equals per-row model.predict."""
+    obs = np.random.default_rng(0).normal(size=(32,) + model.observation_space.shape).astype(np.float32)
+    expected = [int(model.predict(o, deterministic=True)[0]) for o in obs]
+    assert batched_actions(model, obs).tolist() == expected
+    assert batched_actions(model, obs, tie_tolerance=np.inf).tolist() == expected  # all rows re-run
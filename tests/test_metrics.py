@@ -0,0 +1,87 @@
+import json
+import os
+
+import numpy as np
+import pytest
+
+from metrics import MetricsAccumulator, calculate_metrics
+
+RESULTS_FILE = os.path.join(os.path.dirname(__file__), "..", "reports", "results_summary.json")
+
+
+def _equity_curve(n, seed=1):
+    rng = np.random.default_rng(seed)
+    return 10000 * np.cumprod(1 + rng.normal(0.0001, 0.002, n))
+
+
+def _loop_dd_duration(net_worths):
+    running_max = np.maximum.accumulate(net_worths)
+    current = longest = 0
+    for in_dd in (running_max - net_worths) / running_max > 0:
+        current = current + 1 if in_dd else 0
+        longest = max(longest, current)
+    return longest
+
+
+@pytest.mark.parametrize("n", [2, 50, 5000])
+def test_drawdown_duration_matches_loop(n):
+    """Run-length drawdown duration equals the step-by-step count."""
+    net_worths = _equity_curve(n, seed=n)
+    assert calculate_metrics(net_worths)["max_dd_duration_steps"] == _loop_dd_duration(net_worths)
+    assert calculate_metrics(list(net_worths)) == calculate_metrics(net_worths)
+
+
+def test_flat_and_rising_curves():
+    metrics = calculate_metrics(np.linspace(100, 200, 97))
+    assert metrics["max_drawdown_pct"] == 0
+    assert metrics["max_dd_duration_steps"] == 0
+    assert metrics["calmar"] == 0
+
+
+@pytest.mark.parametrize("n", [1, 2, 3000])
+def test_accumulator_matches_batch(n):
+    """Streaming metrics agree with the batch function on the same curve."""
+    net_worths = _equity_curve(n)
+    acc = MetricsAccumulator()
+    for net_worth in net_worths:
+        acc.update(net_worth)
+    expected = calculate_metrics(net_worths) if n > 1 else None
+    streamed = acc.metrics()
+    if expected is None:
+        assert streamed["return_pct"] == 0 and np.isnan(streamed["sharpe"])
+        return
+    for key, value in expected.items():
+        assert streamed[key] == pytest.approx(value, rel=1e-9, abs=1e-12), key
+
+
+def test_accumulator_requires_data():
+    with pytest.raises(ValueError):
+        MetricsAccumulator().metrics()
+
+
+def test_stored_results_consistent():
+    """Stored backtest summaries carry the same keys and relations the metric functions produce."""
+    with open(RESULTS_FILE) as f:
+        results = json.load(f)
+    keys = set(calculate_metrics(_equity_curve(10)))
+    full = [r for r in results.values() if keys <= set(r)]
+    assert full
+    for run in results.values():
+        expected_return = (run["final_balance"] - run["initial_balance"]) / run["initial_balance"] * 100
+        assert run["return_pct"] == pytest.approx(expected_return, rel=1e-12)
+    for run in full:
+        assert run["calmar"] == pytest.approx(run["cagr"] / run["max_drawdown_pct"], rel=1e-12)
+        assert run["max_dd_duration_days"] == pytest.approx(run["max_dd_duration_steps"] / 96, rel=1e-12)
+
+
+def test_accumulator_state_round_trip():
+    """An accumulator restored from its JSON state continues exactly like the original."""
+    net_worths = _equity_curve(400)
+    acc = MetricsAccumulator()
+    for net_worth in net_worths[:250]:
+        acc.update(net_worth)
+    restored = MetricsAccumulator.from_state(json.loads(json.dumps(acc.get_state())))
+    for net_worth in net_worths[250:]:
+        acc.update(net_worth)
+        restored.update(net_worth)
+    assert restored.metrics() == acc.metrics()
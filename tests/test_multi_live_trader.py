@@ -0,0 +1,108 @@
+import asyncio
+import os
+import subprocess
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("stable_baselines3")
+
+from conftest import make_market_df  # noqa: E402
+from live_replay import (HistoricalCandles, RecordingDatabase, RecordingNotifier, RecordingWriter,  # noqa: E402
+                         SimulatedClock)
+from multi_live_trader import PolicyPool, build_traders, run_all  # noqa: E402
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SYMBOLS = ["BTC", "ETH", "SOL"]
+
+
+class ScriptedPolicy:
+    def __init__(self, action):
+        self.action = action
+        self.calls = 0
+
+    def predict(self, obs, deterministic=True):
+        self.calls += 1
+        return np.array(self.action), None
+
+
+class SlowSource:
+    """HistoricalCandles behind a blocking 'network' delay."""
+
+    def __init__(self, candles, delay):
+        self.candles = candles
+        self.delay = delay
+
+    def __call__(self, period):
+        time.sleep(self.delay)
+        return self.candles(period)
+
+
+async def no_wait(seconds):
+    await asyncio.sleep(0)
+
+
+@pytest.fixture
+def sessions():
+    df = make_market_df(n_rows=700, seed=11)
+    times = (pd.Timestamp("2025-01-01") + pd.to_timedelta(np.arange(len(df)) * 15, unit="min")).to_numpy()
+    ohlcv = df[HistoricalCandles.COLUMNS].to_numpy(dtype=np.float64)
+    clock = SimulatedClock(pd.Timestamp(times[600]).to_pydatetime())
+    candles = HistoricalCandles(times, ohlcv, clock)
+    loaded = []
+
+    def load(path):
+        loaded.append(path)
+        return ScriptedPolicy(1)
+
+    writer = RecordingWriter()
+    traders = build_traders(SYMBOLS, PolicyPool(load), writer,
+                            data_sources={symbol: SlowSource(candles, 0.3) for symbol in SYMBOLS},
+                            clock=clock, db=RecordingDatabase(clock), notifier=RecordingNotifier(clock))
+    return traders, loaded, writer
+
+
+def test_sessions_share_runtime_and_fetch_concurrently(sessions):
+    traders, loaded, writer = sessions
+    assert len(loaded) == len(SYMBOLS)
+    assert len({id(trader.notifier) for trader in traders}) == 1
+    assert {trader.writer.writer for trader in traders} == {writer}
+
+    t0 = time.perf_counter()
+    assert asyncio.run(run_all(traders, cycles=1, sleep=no_wait)) == [1, 1, 1]
+    elapsed = time.perf_counter() - t0
+    assert elapsed < 2 * 0.3  # three 0.3 s downloads overlapped
+    for trader in traders:
+        assert trader.current_position == 1 and trader.model.calls == 1
+
+
+def test_failing_session_does_not_stop_the_others(sessions):
+    traders, _, _ = sessions
+
+    def broken(market_data, current_price):
+        raise RuntimeError("boom")
+
+    traders[0].decide = broken
+    results = asyncio.run(run_all(traders, cycles=2, sleep=no_wait))
+    assert isinstance(results[0], Exception) and results[1:] == [2, 2]
+
+
+def test_event_writer_logs_scalars_without_torch(tmp_path):
+    """The default TensorBoard writer of the live bots never imports torch."""
+    pytest.importorskip("tensorboard")
+    from tensorboard.backend.event_processing.event_accumulator import EventAccumulator
+
+    script = ("import sys; from run_live_trader import EventWriter; from multi_live_trader import SymbolWriter; "
+              "writer = EventWriter(sys.argv[1]); view = SymbolWriter(writer, 'SOL'); "
+              "[view.add_scalar('FTMO_Sim/Balance', 200.0 + step, step) for step in range(3)]; writer.close(); "
+              "print('torch' in sys.modules)")
+    out = subprocess.run([sys.executable, "-c", script, str(tmp_path)], cwd=REPO, capture_output=True, text=True,
+                         check=True)
+    assert out.stdout.split()[-1] == "False"
+
+    events = EventAccumulator(str(tmp_path))
+    events.Reload()
+    assert [(e.step, e.value) for e in events.Scalars("SOL/FTMO_Sim/Balance")] == [(0, 200.0), (1, 201.0), (2, 202.0)]
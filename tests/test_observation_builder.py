@@ -0,0 +1,37 @@
+import numpy as np
+from observation_builder import ObservationBuilder, clean_scalar
+from trading_env import TradingEnv
+
+
+def test_clean_scalar_matches_nan_to_num():
+    """NaN and infinities are mapped exactly like np.nan_to_num on float32."""
+    for value in (float('nan'), float('inf'), -float('inf'), 1e300, -1e300, 0.25):
+        with np.errstate(over='ignore'):
+            expected = np.nan_to_num(np.array([value], dtype=np.float32))[0]
+        assert np.float32(clean_scalar(value)) == expected
+
+
+def test_builder_reuses_buffer():
+    """build() writes into the same array on every call."""
+    builder = ObservationBuilder(window_size=4, n_market_features=3)
+    first = builder.build(np.ones((4, 3), dtype=np.float32), 0.1, 0.0)
+    second = builder.build(np.zeros((4, 3), dtype=np.float32), -0.2, 1.0)
+    assert first is second
+    np.testing.assert_array_equal(second[:, 3], np.float32(-0.2))
+    np.testing.assert_array_equal(second[:, 4], np.float32(1.0))
+
+
+def test_reused_buffer_env_matches_default(market_df):
+    """The opt-in buffered observation equals the allocating one at every step."""
+    default_env = TradingEnv(market_df)
+    buffered_env = TradingEnv(market_df, reuse_obs_buffer=True)
+    obs_a, _ = default_env.reset()
+    obs_b, _ = buffered_env.reset()
+    rng = np.random.default_rng(1)
+    for _ in range(500):
+        np.testing.assert_array_equal(obs_a, obs_b)
+        action = int(rng.integers(0, 3))
+        obs_a, _, done, _, _ = default_env.step(action)
+        obs_b, _, _, _, _ = buffered_env.step(action)
+        if done:
+            break
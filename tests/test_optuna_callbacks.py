@@ -0,0 +1,36 @@
+import optuna
+import pytest
+from stable_baselines3 import PPO
+
+from optuna_callbacks import TrialEvalCallback
+from vec_trading_env import VecTradingEnv
+
+
+def _train(market_df, pruner, total_timesteps=1024):
+    study = optuna.create_study(direction="maximize", pruner=pruner)
+    trial = study.ask()
+    env = VecTradingEnv(market_df.iloc[:600], n_envs=4)
+    model = PPO("MlpPolicy", env, n_steps=64, batch_size=64, n_epochs=1, verbose=0, device="cpu")
+    scores = iter(range(100))
+    callback = TrialEvalCallback(trial, lambda m: next(scores), eval_freq=256)
+    model.learn(total_timesteps=total_timesteps, callback=callback)
+    return study, trial, model, callback
+
+
+def test_reports_one_value_per_evaluation(market_df):
+    """Intermediate scores are reported by evaluation index every eval_freq timesteps."""
+    study, trial, model, callback = _train(market_df, optuna.pruners.NopPruner())
+    assert not callback.is_pruned
+    callback.raise_if_pruned()
+    frozen = study.get_trials(deepcopy=False)[trial.number]
+    assert frozen.intermediate_values == {1: 0.0, 2: 1.0, 3: 2.0, 4: 3.0}
+
+
+def test_pruned_trial_stops_training(market_df):
+    """A pruning decision ends model.learn early and surfaces as TrialPruned."""
+    _, _, model, callback = _train(market_df, optuna.pruners.ThresholdPruner(lower=1e9))
+    assert callback.is_pruned
+    assert callback.eval_idx == 1
+    assert model.num_timesteps < 1024
+    with pytest.raises(optuna.TrialPruned):
+        callback.raise_if_pruned()
@@ -0,0 +1,64 @@
+import os
+
+import optuna
+from optuna.trial import TrialState
+
+from optuna_runner import load_existing_study, run_study
+from shared_market_data import SharedMarketData
+
+
+def quadratic(trial):
+    x = trial.suggest_float("x", -10, 10)
+    return -(x - 2) ** 2
+
+
+def test_parallel_workers_share_one_persistent_study(tmp_path, monkeypatch):
+    """Two spawned workers fill the same journal-backed study; a second run resumes instead of restarting."""
+    monkeypatch.delenv("OMP_NUM_THREADS", raising=False)
+    storage = str(tmp_path / "study.log")
+    study = run_study(quadratic, 12, "quad", storage, n_workers=2, sampler=optuna.samplers.RandomSampler(seed=0))
+    finished = study.get_trials(states=(TrialState.COMPLETE,))
+    assert len(finished) >= 12
+    assert len({t.params["x"] for t in finished}) == len(finished)  # reseeded workers don't duplicate
+    assert "OMP_NUM_THREADS" not in os.environ  # thread cap set in the workers only
+
+    resumed = run_study(quadratic, 15, "quad", storage)
+    assert 15 <= len(resumed.get_trials(states=(TrialState.COMPLETE,))) <= len(finished) + 3
+    assert load_existing_study("quad", storage).best_value == resumed.best_value
+
+
+def test_trials_interrupted_by_a_crash_are_requeued(tmp_path):
+    """A trial left RUNNING by a dead process is failed and re-run with the same params."""
+    storage = str(tmp_path / "study.db")
+    run_study(quadratic, 1, "crash", storage)
+    study = load_existing_study("crash", storage)
+    orphan = study.ask()
+    orphan.suggest_float("x", -10, 10)
+
+    study = run_study(quadratic, 2, "crash", storage)
+    trials = study.get_trials()
+    assert trials[orphan.number].state == TrialState.FAIL
+    assert trials[-1].state == TrialState.COMPLETE
+    assert trials[-1].params == orphan.params
+
+
+_attached = None
+
+
+def attach_market_data(handle):
+    global _attached
+    _attached = handle.attach()
+
+
+def mean_close(trial):
+    trial.suggest_float("x", -10, 10)
+    return float(_attached.close_prices.mean())
+
+
+def test_workers_attach_to_data_published_by_the_parent(tmp_path, market_df):
+    """worker_init_args reach the spawned workers: each attaches to the parent's shared arrays."""
+    with SharedMarketData(market_df) as shared:
+        study = run_study(mean_close, 4, "shared", str(tmp_path / "study.log"), n_workers=2,
+                          worker_init=attach_market_data, worker_init_args=(shared.handle,))
+    values = {t.value for t in study.get_trials(states=(TrialState.COMPLETE,))}
+    assert values == {float(market_df["Close"].mean())}
@@ -0,0 +1,69 @@
+import os
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+
+torch = pytest.importorskip("torch")
+PPO = pytest.importorskip("stable_baselines3").PPO
+
+from policy_export import NumpyPolicy, export_policy, exported_policy_path, load_policy  # noqa: E402
+from trading_env import TradingEnv  # noqa: E402
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BTC_MODEL = os.path.join(REPO, "models/PRODUCTION/BTC/ppo_btc_final.zip")
+
+
+def _observations(env, n=1500, seed=0):
+    """Observations from a random-action rollout plus off-distribution noise."""
+    rng = np.random.default_rng(seed)
+    obs, _ = env.reset(seed=seed)
+    rollout = []
+    for _ in range(n):
+        rollout.append(obs)
+        obs, _, done, truncated, _ = env.step(int(rng.integers(3)))
+        if done or truncated:
+            obs, _ = env.reset()
+    rollout = np.array(rollout)
+    return np.concatenate([rollout, rng.normal(0, 3, rollout.shape).astype(np.float32)])
+
+
+@pytest.mark.parametrize("policy_kwargs", [None, {"net_arch": [128, 32], "activation_fn": torch.nn.ReLU}])
+def test_exported_policy_matches_ppo_predict(tmp_path, market_df, policy_kwargs):
+    env = TradingEnv(market_df)
+    model = PPO("MlpPolicy", env, seed=0, device="cpu", policy_kwargs=policy_kwargs)
+    policy = NumpyPolicy.load(export_policy(model, str(tmp_path / "policy.npz")))
+
+    obs = _observations(env)
+    expected, _ = model.predict(obs, deterministic=True)
+    actions, _ = policy.predict(obs, deterministic=True)
+    np.testing.assert_array_equal(actions, expected)
+    single, _ = policy.predict(obs[0], deterministic=True)
+    assert single.shape == () and single.item() == model.predict(obs[0], deterministic=True)[0].item()
+
+
+def test_load_policy_uses_export_only_for_its_checkpoint(tmp_path, market_df):
+    model_path = str(tmp_path / "ppo.zip")
+    model = PPO("MlpPolicy", TradingEnv(market_df), seed=0, device="cpu")
+    model.save(model_path)
+    assert isinstance(load_policy(model_path), PPO)
+
+    export_policy(model, exported_policy_path(model_path), model_path)
+    assert isinstance(load_policy(model_path), NumpyPolicy)
+
+    PPO("MlpPolicy", TradingEnv(market_df), seed=1, device="cpu").save(model_path)  # retrained
+    assert isinstance(load_policy(model_path), PPO)
+
+
+@pytest.mark.skipif(not os.path.exists(exported_policy_path(BTC_MODEL)), reason="no exported BTC policy")
+def test_production_export_runs_without_torch(market_df):
+    obs = _observations(TradingEnv(market_df), n=500)
+    expected, _ = PPO.load(BTC_MODEL, device="cpu").predict(obs, deterministic=True)
+    np.testing.assert_array_equal(NumpyPolicy.load(exported_policy_path(BTC_MODEL)).predict(obs)[0], expected)
+
+    script = ("import sys; from run_live_trader import production_model_path; from policy_export import load_policy; "
+              "policy = load_policy(production_model_path('BTC')); "
+              "print(type(policy).__name__, 'torch' in sys.modules, 'stable_baselines3' in sys.modules)")
+    out = subprocess.run([sys.executable, "-c", script], cwd=REPO, capture_output=True, text=True, check=True)
+    assert out.stdout.split()[-3:] == ["NumpyPolicy", "False", "False"]
@@ -0,0 +1,86 @@
+import pickle
+
+import numpy as np
+import pytest
+from stable_baselines3.common.vec_env import DummyVecEnv, SubprocVecEnv
+
+from shared_market_data import SharedMarketData
+from trading_env import TradingEnv
+from vec_trading_env import VecTradingEnv
+
+
+def test_attached_env_matches_dataframe_env(market_df):
+    """An env over the shared arrays behaves exactly like one built from the DataFrame."""
+    with SharedMarketData(market_df) as shared:
+        attached = shared.handle.attach()
+        assert not attached.data_matrix.flags.writeable
+
+        env_df = TradingEnv(market_df, stop_loss=0.01)
+        env_shared = TradingEnv(market_data=attached, stop_loss=0.01)
+        obs_a, _ = env_df.reset()
+        obs_b, _ = env_shared.reset()
+        rng = np.random.default_rng(5)
+        for _ in range(300):
+            np.testing.assert_array_equal(obs_a, obs_b)
+            action = int(rng.integers(0, 3))
+            obs_a, reward_a, _, _, info_a = env_df.step(action)
+            obs_b, reward_b, _, _, info_b = env_shared.step(action)
+            assert reward_a == reward_b
+            assert info_a == info_b
+        del env_shared
+        attached.close()
+
+
+def test_handle_pickles_without_data(market_df):
+    """Workers receive block names only, not the feature matrix."""
+    with SharedMarketData(market_df) as shared:
+        assert len(pickle.dumps(shared.handle)) < 2048
+
+
+def test_subproc_workers_attach(market_df):
+    """SubprocVecEnv workers built from the shared handle step like DummyVecEnv."""
+    with SharedMarketData(market_df) as shared:
+        sub_env = SubprocVecEnv(shared.make_env_fns(2, commission=0.0005))
+        dummy_env = DummyVecEnv([lambda: TradingEnv(market_df, commission=0.0005) for _ in range(2)])
+        try:
+            np.testing.assert_array_equal(sub_env.reset(), dummy_env.reset())
+            rng = np.random.default_rng(2)
+            for _ in range(50):
+                actions = rng.integers(0, 3, 2)
+                obs_a, rew_a, _, _ = sub_env.step(actions)
+                obs_b, rew_b, _, _ = dummy_env.step(actions)
+                np.testing.assert_array_equal(obs_a, obs_b)
+                np.testing.assert_array_equal(rew_a.astype(np.float32), rew_b)
+        finally:
+            sub_env.close()
+
+
+def test_blocks_outlive_the_workers_and_are_unlinked_by_the_owner(market_df):
+    """Workers exiting leave the blocks alone; only SharedMarketData.close() removes them."""
+    shared = SharedMarketData(market_df)
+    sub_env = SubprocVecEnv(shared.make_env_fns(2))
+    sub_env.reset()
+    sub_env.close()
+
+    attached = shared.handle.attach()  # still there after the workers are gone
+    assert attached.close_prices.shape == (len(market_df),)
+    attached.close()
+    shared.close()
+    with pytest.raises(FileNotFoundError):
+        shared.handle.attach()
+
+
+def test_vec_env_over_shared_arrays(market_df):
+    """VecTradingEnv(market_data=...) steps like VecTradingEnv over the DataFrame."""
+    with SharedMarketData(market_df) as shared:
+        attached = shared.handle.attach()
+        env_shared = VecTradingEnv(market_data=attached, n_envs=3, stop_loss=0.01)
+        env_df = VecTradingEnv(market_df, n_envs=3, stop_loss=0.01)
+        np.testing.assert_array_equal(env_shared.reset(), env_df.reset())
+        rng = np.random.default_rng(9)
+        for _ in range(100):
+            actions = rng.integers(0, 3, 3)
+            obs_a, rew_a, _, _ = env_shared.step(actions)
+            obs_b, rew_b, _, _ = env_df.step(actions)
+            np.testing.assert_array_equal(obs_a, obs_b)
+            np.testing.assert_array_equal(rew_a, rew_b)
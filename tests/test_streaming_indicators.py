@@ -0,0 +1,81 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from feature_pipeline import OBS_COLS, add_indicators, build_features
+from streaming_indicators import EMA, RSI, RollingMax, RollingMeanStd, RollingMin, StreamingFeatures
+
+OHLCV = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+
+def _stream(indicator, values):
+    return np.array([indicator.update(x) for x in values], dtype=np.float64)
+
+
+def test_primitives_match_pandas(market_df):
+    """Each streaming indicator equals its batch pandas counterpart at every closed candle."""
+    close = market_df['Close'].iloc[:1500]
+    high = market_df['High'].iloc[:1500].tolist()
+    values = close.tolist()
+
+    np.testing.assert_allclose(
+        _stream(EMA(span=23), values), close.ewm(span=23, adjust=False).mean(), rtol=1e-12)
+    np.testing.assert_allclose(
+        _stream(EMA(span=200, min_periods=200), values),
+        close.ewm(span=200, min_periods=200, adjust=False).mean(), rtol=1e-12)
+    np.testing.assert_allclose(
+        _stream(RollingMax(35), high), pd.Series(high).rolling(35).max(), rtol=0)
+    np.testing.assert_allclose(
+        _stream(RollingMin(35), high), pd.Series(high).rolling(35).min(), rtol=0)
+
+    rolling = RollingMeanStd(20)
+    stats = np.array([rolling.update(x) for x in values])
+    np.testing.assert_allclose(stats[:, 0], close.rolling(20).mean(), rtol=1e-9)
+    np.testing.assert_allclose(stats[:, 1], close.rolling(20).std(ddof=0), rtol=1e-6)
+
+    expected_rsi = add_indicators(market_df[OHLCV].iloc[:1500].copy())['RSI']
+    np.testing.assert_allclose(_stream(RSI(14), values), expected_rsi, rtol=1e-10)
+
+
+@pytest.mark.parametrize("make", [
+    lambda: EMA(span=9), lambda: RSI(14), lambda: RollingMax(5), lambda: RollingMin(5), lambda: RollingMeanStd(5),
+])
+def test_preview_equals_update_without_side_effects(market_df, make):
+    """preview(x) returns what update(x) would, and leaves the state untouched."""
+    indicator = make()
+    for x in market_df['Close'].iloc[:40].tolist():
+        before = indicator.preview(x)
+        np.testing.assert_array_equal(indicator.preview(x), before)
+        np.testing.assert_allclose(before, indicator.update(x), rtol=1e-12)
+
+
+def test_streaming_features_match_batch_window(market_df):
+    """Window of closed rows + previewed forming candle equals the batch observation window."""
+    raw = market_df[OHLCV].iloc[:600].copy()
+    batch = np.nan_to_num(build_features(raw)[OBS_COLS].values.astype(np.float32))
+
+    features = StreamingFeatures(window_size=60)
+    closes = raw['Close'].tolist()
+    for close in closes[:-1]:
+        features.update(close)
+
+    np.testing.assert_allclose(features.window(closes[-1]), batch[-60:], rtol=1e-5, atol=1e-7)
+    np.testing.assert_allclose(features.window(), batch[-61:-1], rtol=1e-5, atol=1e-7)
+
+
+def test_breakout_signals_match_calculate_signals(market_df):
+    """The sniper bot's incremental signals equal calculate_signals on the same fetch, cycle after cycle."""
+    sniper = pytest.importorskip("sol_sniper_bot", exc_type=ImportError)
+    candles = market_df.iloc[:700].rename(columns=str.lower).reset_index(drop=True)
+    candles['timestamp'] = pd.date_range("2024-01-01", periods=len(candles), freq="15min")
+    params = sniper.PARAMS
+    signals = sniper.BreakoutSignals(params)
+
+    for end in (500, 501, 505, 510):
+        fetched = candles.iloc[max(0, end - signals.fetch_limit):end].reset_index(drop=True)
+        assert signals.overlaps(fetched)
+        price, level, ema = signals.calculate(fetched)
+        exp_price, exp_level, exp_ema = sniper.calculate_signals(candles.iloc[:end].copy(), params)
+        assert price == exp_price
+        assert level == exp_level
+        assert ema == pytest.approx(exp_ema, rel=1e-12)
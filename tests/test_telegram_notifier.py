@@ -0,0 +1,84 @@
+import threading
+import time
+
+from telegram_notifier import DIGEST_SEPARATOR, TelegramNotifier
+
+
+class FakeResponse:
+    def __init__(self, status_code=200, payload=None):
+        self.status_code = status_code
+        self.payload = payload or {"ok": True}
+        self.headers = {}
+
+    def json(self):
+        return self.payload
+
+    def raise_for_status(self):
+        pass
+
+
+class FakeSession:
+    """requests.Session stand-in: scripted responses, optional gate to hold the first POST."""
+
+    def __init__(self, responses=(), gate=None):
+        self.responses = list(responses)
+        self.gate = gate
+        self.sent = []
+        self.closed = False
+
+    def post(self, url, data=None, timeout=None):
+        if self.gate is not None:
+            self.gate.wait(5)
+        self.sent.append(data["text"])
+        return self.responses.pop(0) if self.responses else FakeResponse()
+
+    def close(self):
+        self.closed = True
+
+
+def _notifier(session, **kwargs):
+    return TelegramNotifier("token", "chat", enabled=False, session=session, **kwargs)
+
+
+def test_notify_never_waits_on_the_network():
+    gate = threading.Event()
+    session = FakeSession(gate=gate)
+    notifier = TelegramNotifier("token", "chat", session=session, coalesce_seconds=0)  # start message queued
+
+    t0 = time.perf_counter()
+    notifier.notify_stop_loss("SOL", 101.5, -1.5)
+    assert time.perf_counter() - t0 < 0.05  # while the first POST is still blocked
+
+    gate.set()
+    assert notifier.close()
+    assert session.closed and any("STOP LOSS" in text for text in session.sent)
+
+
+def test_rate_limit_retry_after_is_honored():
+    session = FakeSession([FakeResponse(429, {"ok": False, "parameters": {"retry_after": 0.2}})])
+    notifier = _notifier(session, coalesce_seconds=0)
+    notifier.enabled = True
+
+    t0 = time.perf_counter()
+    notifier.send_message("hola")
+    assert notifier.flush()
+    assert time.perf_counter() - t0 >= 0.2
+    assert session.sent == ["hola", "hola"] and notifier.delivered == 1
+    notifier.close()
+
+
+def test_burst_is_coalesced_into_a_digest_and_full_queue_drops_oldest():
+    gate = threading.Event()
+    session = FakeSession(gate=gate)
+    notifier = _notifier(session, max_queue=3, coalesce_seconds=0.2)
+    notifier.enabled = True
+
+    notifier.send_message("m0")
+    time.sleep(0.3)  # the worker is now blocked posting m0
+    for idx in range(1, 6):
+        notifier.send_message(f"m{idx}")
+    gate.set()
+    assert notifier.close()
+
+    assert session.sent[0] == "m0"
+    assert session.sent[1] == DIGEST_SEPARATOR.join(["⚠️ 2 mensajes descartados (cola llena)", "m3", "m4", "m5"])
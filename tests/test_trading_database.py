@@ -0,0 +1,66 @@
+import sqlite3
+
+from trading_database import SCHEMA_VERSION, TradingDatabase
+
+LEGACY_SCHEMA = """
+    CREATE TABLE trades (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+        symbol TEXT NOT NULL, action TEXT NOT NULL,
+        entry_price REAL, exit_price REAL, pnl_pct REAL, pnl_usd REAL,
+        balance_after REAL, reason TEXT, win INTEGER, trade_duration_minutes INTEGER
+    );
+    INSERT INTO trades (symbol, action, pnl_pct, pnl_usd, win) VALUES ('SOL', 'BUY', NULL, NULL, NULL);
+    INSERT INTO trades (symbol, action, pnl_pct, pnl_usd, win) VALUES ('SOL', 'SELL', 2.0, 4.0, 1);
+"""
+
+
+def _plan(db, query, params):
+    return " ".join(row[-1] for row in db.conn.execute(f"EXPLAIN QUERY PLAN {query}", params))
+
+
+def test_legacy_database_is_migrated_in_place(tmp_path):
+    db_path = str(tmp_path / "bot.db")
+    legacy = sqlite3.connect(db_path)
+    legacy.executescript(LEGACY_SCHEMA)
+    legacy.close()
+
+    db = TradingDatabase(db_path)
+    assert db.conn.execute("PRAGMA user_version").fetchone()[0] == SCHEMA_VERSION
+    assert db.conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    indexes = {name for (name,) in db.conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+    assert {"idx_trades_symbol_timestamp", "idx_trades_symbol_action"} <= indexes
+    assert db.get_statistics("SOL")["total_trades"] == 1
+    assert db.migrate() == SCHEMA_VERSION  # already current: nothing to do
+    db.close()
+
+
+def test_dashboard_queries_use_covering_indexes(tmp_path):
+    db = TradingDatabase(str(tmp_path / "bot.db"))
+    summary = _plan(db, "SELECT COUNT(*), AVG(pnl_pct), SUM(pnl_usd), MIN(balance_after) FROM trades "
+                        "WHERE symbol = ? AND timestamp >= datetime('now', '-30 days')", ("SOL",))
+    stats = _plan(db, "SELECT COUNT(*), SUM(win), MAX(pnl_pct), SUM(pnl_usd) FROM trades "
+                      "WHERE symbol = ? AND action = 'SELL'", ("SOL",))
+    recent = _plan(db, "SELECT * FROM trades WHERE symbol = ? ORDER BY timestamp DESC LIMIT 10", ("SOL",))
+    assert "COVERING INDEX idx_trades_symbol_timestamp" in summary
+    assert "COVERING INDEX idx_trades_symbol_action" in stats
+    assert "idx_trades_symbol_timestamp" in recent and "TEMP B-TREE" not in recent
+    db.close()
+
+
+def test_open_reader_does_not_block_the_writer(tmp_path):
+    db_path = str(tmp_path / "bot.db")
+    writer = TradingDatabase(db_path)
+    writer.log_trade("SOL", "BUY", entry_price=100.0)
+
+    dashboard = sqlite3.connect(db_path)
+    dashboard.execute("BEGIN")
+    assert dashboard.execute("SELECT COUNT(*) FROM trades").fetchone()[0] == 1  # read snapshot held open
+
+    writer.conn.execute("PRAGMA busy_timeout=0")  # fail at once instead of waiting
+    writer.log_trade("SOL", "SELL", exit_price=101.0, pnl_usd=1.0)
+    assert dashboard.execute("SELECT COUNT(*) FROM trades").fetchone()[0] == 1  # still its snapshot
+    dashboard.rollback()
+    assert dashboard.execute("SELECT COUNT(*) FROM trades").fetchone()[0] == 2
+    dashboard.close()
+    writer.close()
@@ -0,0 +1,49 @@
+import json
+
+import numpy as np
+from trading_env import TradingEnv
+
+
+def test_precomputed_arrays_match_dataframe(market_df):
+    """The cached price/indicator arrays mirror the DataFrame columns."""
+    env = TradingEnv(market_df)
+    np.testing.assert_array_equal(env.close_prices, market_df['Close'].values)
+    np.testing.assert_array_equal(env.is_bull_market, (market_df['Close'] > market_df['EMA_200']).values)
+    expected_width = (market_df['BBU_20_2.0'] - market_df['BBL_20_2.0']) / market_df['Close']
+    np.testing.assert_array_equal(env.bb_width, expected_width.values)
+
+
+def test_episode_runs_to_completion(market_df):
+    """A random-action episode terminates with finite rewards and net worth."""
+    env = TradingEnv(market_df, stop_loss=0.01)
+    env.reset()
+    rng = np.random.default_rng(0)
+    done = False
+    steps = 0
+    while not done:
+        obs, reward, done, truncated, info = env.step(int(rng.integers(0, 3)))
+        assert np.isfinite(reward)
+        steps += 1
+    assert obs.shape == (env.window_size, env.n_features)
+    assert np.isfinite(info['net_worth'])
+    assert steps > 0
+
+
+def test_state_snapshot_resumes_episode(market_df):
+    """set_state(get_state()) on a fresh env (even with more candles) continues the episode identically."""
+    rng = np.random.default_rng(0)
+    actions = rng.integers(0, 3, 400)
+    env = TradingEnv(market_df.iloc[:1500])
+    env.reset()
+    for action in actions[:200]:
+        env.step(action)
+    state = json.loads(json.dumps(env.get_state()))
+    expected = [env.step(action) for action in actions[200:]]
+
+    resumed = TradingEnv(market_df)
+    obs = resumed.set_state(state)
+    assert obs.shape == resumed.observation_space.shape
+    for action, (obs_a, reward_a, *_, info_a) in zip(actions[200:], expected):
+        obs_b, reward_b, *_, info_b = resumed.step(action)
+        np.testing.assert_array_equal(obs_a, obs_b)
+        assert (reward_a, info_a) == (reward_b, info_b)
@@ -0,0 +1,80 @@
+import numpy as np
+import pytest
+from trading_env import TradingEnv
+from vec_trading_env import VecTradingEnv
+
+
+def _scalar_reset(env, start):
+    env.reset()
+    env.current_step = start
+    return env._next_observation()
+
+
+def test_parity_with_scalar_env(market_df):
+    """Every batched episode reproduces a scalar TradingEnv step for step, including auto-resets."""
+    params = {"commission": 0.0005, "stop_loss": 0.01, "cooldown_steps": 3, "risk_aversion": 1.5}
+    n_rows = len(market_df)
+    starts = [60, 400, 1500, n_rows - 120]
+
+    vec_env = VecTradingEnv(market_df, n_envs=len(starts), start_steps=starts, **params)
+    scalar_envs = [TradingEnv(market_df, **params) for _ in starts]
+
+    vec_obs = vec_env.reset()
+    scalar_obs = [_scalar_reset(env, s) for env, s in zip(scalar_envs, starts)]
+    rng = np.random.default_rng(3)
+    n_dones = 0
+
+    for _ in range(1200):
+        np.testing.assert_array_equal(vec_obs, np.stack(scalar_obs))
+        actions = rng.integers(0, 3, len(starts))
+        vec_obs, rewards, dones, infos = vec_env.step(actions)
+
+        for i, env in enumerate(scalar_envs):
+            obs, reward, done, _, info = env.step(int(actions[i]))
+            assert rewards[i] == np.float32(reward)
+            assert dones[i] == done
+            for key, value in info.items():
+                assert infos[i][key] == value, key
+            if done:
+                n_dones += 1
+                np.testing.assert_array_equal(infos[i]["terminal_observation"], obs)
+                obs = _scalar_reset(env, starts[i])
+            scalar_obs[i] = obs
+
+    assert n_dones > 0
+
+
+def test_rejects_bad_start_steps(market_df):
+    """Start offsets must leave room for a full observation window."""
+    with pytest.raises(ValueError):
+        VecTradingEnv(market_df, n_envs=2, start_steps=[10, 100])
+
+
+def test_default_first_episodes_are_staggered(market_df):
+    """Batched rollouts start at different points of the data; later episodes start at window_size."""
+    vec_env = VecTradingEnv(market_df, n_envs=4)
+    vec_env.reset()
+    first = np.array(vec_env.get_attr("current_step"))
+    assert first[0] == vec_env.window_size and len(set(first)) == 4
+    assert np.all(np.diff(first) > (vec_env.end_step - vec_env.window_size) // 8)
+
+    dones = np.zeros(4, dtype=bool)
+    while not dones[-1]:  # the last env's first episode is the shortest
+        _, _, done, _ = vec_env.step(np.zeros(4, dtype=np.int64))
+        dones |= done
+    assert vec_env.get_attr("current_step", indices=[3]) == [vec_env.window_size]
+
+
+def test_attributes_are_per_episode_or_shared(market_df):
+    """Account state is read / written per episode; shared parameters can't be set for a subset."""
+    vec_env = VecTradingEnv(market_df, n_envs=3, start_steps=[60, 200, 400])
+    vec_env.set_attr("balance", 150.0, indices=[1])
+    assert vec_env.get_attr("balance") == [vec_env.template.initial_balance, 150.0, vec_env.template.initial_balance]
+    assert vec_env.get_attr("current_step", indices=2) == [400]
+
+    vec_env.set_attr("stop_loss", 0.02)
+    assert vec_env.get_attr("stop_loss") == [0.02] * 3
+    with pytest.raises(ValueError):
+        vec_env.set_attr("stop_loss", 0.05, indices=[0])
+    with pytest.raises(AttributeError):
+        vec_env.env_method("_next_observation")
@@ -0,0 +1,92 @@
+import os
+import sqlite3
+import subprocess
+import sys
+import textwrap
+import time
+
+import pytest
+
+from write_behind_db import WriteBehindDatabase
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_writes_are_queued_group_committed_and_visible_to_reads(tmp_path):
+    db = WriteBehindDatabase(str(tmp_path / "bot.db"))
+    t0 = time.perf_counter()
+    acks = [db.log_trade("SOL", "BUY", entry_price=100.0 + idx, balance_after=200.0) for idx in range(500)]
+    db.update_bot_state("SOL", 201.0, 1, 150.0, 3, 1)
+    assert time.perf_counter() - t0 < 0.5  # no fsync in the caller
+
+    state = db.get_bot_state("SOL")  # reads flush first
+    assert state["balance"] == 201.0 and state["position"] == 1
+    assert all(ack.done() for ack in acks)
+    assert [ack.result() for ack in acks] == list(range(1, 501))
+    assert db.written == 501 and db.commits < 501
+    assert len(db.get_recent_trades("SOL", limit=1000)) == 500
+    assert db.close()
+
+
+def test_bad_event_fails_alone(tmp_path):
+    db = WriteBehindDatabase(str(tmp_path / "bot.db"))
+    ok = db.log_trade("SOL", "BUY", entry_price=1.0)
+    bad = db.log_trade("SOL", "BUY", no_such_column=1.0)
+    after = db.log_trade("SOL", "SELL", exit_price=2.0, pnl_usd=1.0)
+    assert db.flush()
+    assert ok.result() and after.result()
+    with pytest.raises(TypeError):
+        bad.result()
+    assert len(db.get_recent_trades("SOL")) == 2
+    db.close()
+
+
+CRASH_SCRIPT = textwrap.dedent("""
+    import os, signal, sys, time
+    from write_behind_db import WriteBehindDatabase
+
+    db = WriteBehindDatabase(sys.argv[1])
+    for idx in range(3000):
+        ack = db.log_trade("SOL", "BUY", entry_price=float(idx))
+        ack.add_done_callback(lambda f, idx=idx: print(f"ACK {idx}", flush=True))
+        if idx % 10 == 0:
+            time.sleep(0.001)
+        if idx == 1500:
+            os.kill(os.getpid(), signal.SIGKILL)  # crash mid-stream: no flush, no close
+""")
+
+
+@pytest.mark.skipif(not hasattr(os, "kill") or sys.platform == "win32", reason="needs SIGKILL")
+def test_no_acknowledged_trade_is_lost_on_crash(tmp_path):
+    db_path = str(tmp_path / "bot.db")
+    proc = subprocess.run([sys.executable, "-c", CRASH_SCRIPT, db_path], cwd=REPO, capture_output=True, text=True,
+                          env={**os.environ, "PYTHONPATH": REPO})
+    assert proc.returncode == -9
+    acked = {int(line.split()[1]) for line in proc.stdout.splitlines() if line.startswith("ACK ")}
+    assert acked
+
+    conn = sqlite3.connect(db_path)
+    assert conn.execute("PRAGMA integrity_check").fetchone()[0] == "ok"
+    stored = {int(price) for (price,) in conn.execute("SELECT entry_price FROM trades")}
+    conn.close()
+    assert acked <= stored
+
+
+def test_writer_connection_syncs_every_commit(tmp_path, monkeypatch):
+    """Acks promise durability: the writer commits with synchronous=FULL, not the reader's NORMAL."""
+    import write_behind_db
+
+    connections = []
+
+    class Recording(write_behind_db.TradingDatabase):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            connections.append(self.conn)
+
+    monkeypatch.setattr(write_behind_db, "TradingDatabase", Recording)
+    db = WriteBehindDatabase(str(tmp_path / "bot.db"))
+    assert db.flush()  # the writer thread has opened its connection
+    reader, writer = connections
+    assert reader.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+    assert writer.execute("PRAGMA synchronous").fetchone()[0] == 2  # FULL
+    db.close()
@@ -7,11 +7,39 @@ import json
 from datetime import datetime
 from pathlib import Path
 
+# Schema migrations, applied in order; PRAGMA user_version = how many have run
+MIGRATIONS = [
+    # 1: Covering indexes for the dashboard / healthcheck queries
+    #    (get_recent_trades, get_performance_summary / get_statistics)
+    [
+        '''CREATE INDEX IF NOT EXISTS idx_trades_symbol_timestamp
+           ON trades (symbol, timestamp, win, pnl_pct, pnl_usd, balance_after)''',
+        '''CREATE INDEX IF NOT EXISTS idx_trades_symbol_action
+           ON trades (symbol, action, win, pnl_pct, pnl_usd)''',
+        'ANALYZE trades',
+    ],
+]
+SCHEMA_VERSION = len(MIGRATIONS)
+
+# Connection tuning: WAL lets the dashboard / healthcheck read while the bot writes
+# (readers never block the writer); synchronous=NORMAL is crash-safe in WAL mode and
+# only syncs at checkpoints (a power loss can drop the last commits; pass "FULL" to avoid it)
+PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "cache_size": -16000,  # 16 MB page cache
+    "temp_store": "MEMORY",
+    "busy_timeout": 5000,  # ms to wait for a lock instead of failing
+}
+
 class TradingDatabase:
-    def __init__(self, db_path="trading_bot.db"):
+    def __init__(self, db_path="trading_bot.db", synchronous=PRAGMAS["synchronous"]):
         self.db_path = db_path
         self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        for name, value in {**PRAGMAS, "synchronous": synchronous}.items():
+            self.conn.execute(f"PRAGMA {name}={value}")
         self.create_tables()
+        self.migrate()
         print(f"📊 Database initialized: {db_path}")
     
     def create_tables(self):
@@ -84,10 +112,21 @@ class TradingDatabase:
         self.conn.commit()
         print("✅ Database tables created/verified")
     
+    def migrate(self):
+        """Apply the schema migrations this file has not seen yet (tracked in PRAGMA user_version)"""
+        version = self.conn.execute("PRAGMA user_version").fetchone()[0]
+        for number, statements in enumerate(MIGRATIONS[version:], start=version + 1):
+            with self.conn:
+                for statement in statements:
+                    self.conn.execute(statement)
+                self.conn.execute(f"PRAGMA user_version={number}")
+            print(f"🔧 Database migrated to schema v{number}")
+        return version
+    
     def log_trade(self, symbol, action, entry_price=None, exit_price=None, 
                    pnl_pct=None, pnl_usd=None, balance_after=None, reason="", 
-                   trade_duration_minutes=0):
-        """Log a trade to the database"""
+                   trade_duration_minutes=0, commit=True):
+        """Log a trade to the database (commit=False leaves the transaction open for a group commit)"""
         cursor = self.conn.cursor()
         
         win = None
@@ -101,18 +140,21 @@ class TradingDatabase:
         ''', (symbol, action, entry_price, exit_price, pnl_pct, pnl_usd, 
               balance_after, reason, win, trade_duration_minutes))
         
-        self.conn.commit()
+        if commit:
+            self.conn.commit()
         return cursor.lastrowid
     
-    def update_bot_state(self, symbol, balance, position, entry_price, wins, losses):
+    def update_bot_state(self, symbol, balance, position, entry_price, wins, losses, last_update=None,
+                         commit=True):
         """Update or insert bot state"""
         cursor = self.conn.cursor()
         cursor.execute('''
             INSERT OR REPLACE INTO bot_state 
             (symbol, current_balance, current_position, entry_price, last_update, wins, losses)
             VALUES (?, ?, ?, ?, ?, ?, ?)
-        ''', (symbol, balance, position, entry_price, datetime.now(), wins, losses))
-        self.conn.commit()
+        ''', (symbol, balance, position, entry_price, last_update or datetime.now(), wins, losses))
+        if commit:
+            self.conn.commit()
     
     def get_bot_state(self, symbol):
         """Retrieve bot state (for recovery after restart)"""
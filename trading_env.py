@@ -2,6 +2,8 @@ import gymnasium as gym
 import numpy as np
 import pandas as pd
 from gymnasium import spaces
+from observation_builder import ObservationBuilder
+from feature_pipeline import OBS_COLS, add_observation_features, has_observation_features
 
 class TradingEnv(gym.Env):
     """
@@ -10,13 +12,19 @@ class TradingEnv(gym.Env):
     """
     metadata = {'render.modes': ['human']}
 
-    def __init__(self, df, initial_balance=10000, commission=0.0001, window_size=60, 
+    # Arrays step()/_next_observation() run on; also what SharedMarketData publishes
+    MARKET_ARRAYS = ('data_matrix', 'close_prices', 'ema_200', 'bb_upper', 'bb_lower', 'is_bull_market', 'bb_width')
+    # Everything step() mutates: a snapshot of these resumes the episode exactly
+    STATE_ATTRS = ('balance', 'net_worth', 'max_net_worth', 'shares_held', 'entry_price', 'total_shares_sold',
+                   'total_sales_value', 'total_trades', 'current_step', 'steps_since_trade', 'steps_since_sell',
+                   'highest_price_since_entry')
+
+    def __init__(self, df=None, initial_balance=10000, commission=0.0001, window_size=60, 
                  cooldown_steps=8, stop_loss=0.02, trailing_stop_threshold=0.03, 
                  trailing_stop_drop=0.015, risk_aversion=2.5, ema_penalty=0.05, 
-                 vol_penalty=0.05, position_size_pct=0.40):
+                 vol_penalty=0.05, position_size_pct=0.40, reuse_obs_buffer=False, market_data=None):
         super(TradingEnv, self).__init__()
 
-        self.df = df.reset_index(drop=True)
         self.window_size = window_size
         self.initial_balance = initial_balance
         self.commission = commission
@@ -34,39 +42,48 @@ class TradingEnv(gym.Env):
         # Action Space: 0 = Hold, 1 = Buy, 2 = Sell
         self.action_space = spaces.Discrete(3)
 
-        # --- PHASE 3: Features ---
-        # 1. Log Returns
-        self.df['Log_Ret'] = np.log(self.df['Close'] / self.df['Close'].shift(1)).fillna(0)
-        
-        # 2. RSI (Normalized 0-1)
-        self.df['RSI_Norm'] = self.df['RSI'] / 100.0
-        
-        # 3. MACD (Momentum Architecture) - REPLACES BOLINGER
-        ema_12 = self.df['Close'].ewm(span=12, adjust=False).mean()
-        ema_26 = self.df['Close'].ewm(span=26, adjust=False).mean()
-        macd = ema_12 - ema_26
-        signal = macd.ewm(span=9, adjust=False).mean()
-        self.df['MACD_Hist'] = (macd - signal) / self.df['Close'] # Normalized
-        self.df['MACD_Hist'] = self.df['MACD_Hist'].fillna(0)
-        
-        # 4. EMA Distances (Short & Long Term)
-        self.df['EMA_20_Dist'] = (self.df['Close'] / self.df['EMA_20']) - 1
-        self.df['EMA_50_Dist'] = (self.df['Close'] / self.df['EMA_50']) - 1
-        self.df['EMA_200_Dist'] = (self.df['Close'] / self.df['EMA_200']) - 1 # MARKET REGIME
-
         # Select Features (MOMENTUM FOCUSED)
-        self.obs_cols = ['Log_Ret', 'RSI_Norm', 'MACD_Hist', 'EMA_20_Dist', 'EMA_50_Dist', 'EMA_200_Dist']
+        self.obs_cols = list(OBS_COLS)
         self.n_features = len(self.obs_cols) + 2 # +2 for account
         
-        # Pre-compute Data Matrix
-        self.data_matrix = self.df[self.obs_cols].values.astype(np.float32)
+        if market_data is not None:
+            # Attach to precomputed arrays (e.g. SharedMarketData in a SubprocVecEnv worker), no DataFrame copy
+            self.df = None
+            self.market_data = market_data # keeps the underlying buffers alive
+            for name in self.MARKET_ARRAYS:
+                setattr(self, name, getattr(market_data, name))
+        else:
+            self.df = df.reset_index(drop=True)
+            self._compute_features()
         
         self.observation_space = spaces.Box(
             low=-np.inf, high=np.inf, shape=(self.window_size, self.n_features), dtype=np.float32
         )
 
+        # Opt-in: write observations into one reused buffer (no per-step allocations).
+        # The returned array is overwritten on the next step, so callers must copy to keep it.
+        self.obs_builder = ObservationBuilder(self.window_size, len(self.obs_cols)) if reuse_obs_buffer else None
+
         self.reset()
 
+    def _compute_features(self):
+        """Build observation features and price/indicator arrays from self.df."""
+        # --- PHASE 3: Features --- (shared with backtest/live trading, see feature_pipeline.py)
+        # Frames from feature_pipeline.load_features() already carry them
+        if not has_observation_features(self.df):
+            add_observation_features(self.df)
+
+        # Pre-compute Data Matrix (NaN cleanup done once here instead of every observation)
+        self.data_matrix = np.nan_to_num(self.df[self.obs_cols].values.astype(np.float32))
+
+        # Pre-compute Price/Indicator Arrays (step() runs on plain floats, no pandas lookups)
+        self.close_prices = self.df['Close'].to_numpy(dtype=np.float64)
+        self.ema_200 = self.df['EMA_200'].to_numpy(dtype=np.float64)
+        self.bb_upper = self.df['BBU_20_2.0'].to_numpy(dtype=np.float64)
+        self.bb_lower = self.df['BBL_20_2.0'].to_numpy(dtype=np.float64)
+        self.is_bull_market = self.close_prices > self.ema_200
+        self.bb_width = (self.bb_upper - self.bb_lower) / self.close_prices
+
     def reset(self, seed=None, options=None):
         super().reset(seed=seed)
         
@@ -80,7 +97,7 @@ class TradingEnv(gym.Env):
         self.total_trades = 0
         
         self.current_step = self.window_size
-        self.end_step = len(self.df) - 1
+        self.end_step = len(self.close_prices) - 1
         
         # Inactivity & Cooldown Tracker
         self.steps_since_trade = 0
@@ -91,6 +108,22 @@ class TradingEnv(gym.Env):
         
         return self._next_observation(), {}
 
+    def get_state(self):
+        """Account / episode state as plain Python values (JSON-serializable)."""
+        return {name: getattr(self, name).item() if hasattr(getattr(self, name), 'item') else getattr(self, name)
+                for name in self.STATE_ATTRS}
+
+    def set_state(self, state):
+        """
+        Restore a get_state() snapshot and return the observation at that point.
+        The market arrays may be longer than when the snapshot was taken (appended candles).
+        """
+        if not self.window_size <= state['current_step'] <= self.end_step:
+            raise ValueError(f"Snapshot step {state['current_step']} outside [{self.window_size}, {self.end_step}]")
+        for name in self.STATE_ATTRS:
+            setattr(self, name, state[name])
+        return self._next_observation()
+
     def _next_observation(self):
         # 1. Market Features (Fast Slice)
         market_obs = self.data_matrix[self.current_step - self.window_size : self.current_step]
@@ -98,9 +131,12 @@ class TradingEnv(gym.Env):
         # 2. Account Features
         balance_ratio = np.log(self.balance / self.initial_balance + 1e-9)
         
-        current_price = self.df.iat[self.current_step - 1, self.df.columns.get_loc('Close')]
+        current_price = self.close_prices[self.current_step - 1]
         position_val = self.shares_held * current_price
         position_ratio = position_val / self.net_worth
+
+        if self.obs_builder is not None:
+            return self.obs_builder.build(market_obs, balance_ratio, position_ratio)
         
         account_obs = np.full((self.window_size, 2), [balance_ratio, position_ratio], dtype=np.float32)
         
@@ -113,8 +149,8 @@ class TradingEnv(gym.Env):
         done = False
         
         # Safe Price
-        idx = min(self.current_step, len(self.df) - 1)
-        current_price = self.df.iat[idx, self.df.columns.get_loc('Close')]
+        idx = min(self.current_step, self.end_step)
+        current_price = float(self.close_prices[idx])
 
         # --- PHASE 6.1: Professional Risk Management ---
         reward = 0
@@ -150,8 +186,7 @@ class TradingEnv(gym.Env):
                 reward += 0.1 
         
         # 5. EMA 200 TREND FILTER (Institutional Grade)
-        ema_200 = self.df.iat[idx, self.df.columns.get_loc('EMA_200')]
-        is_bull_market = current_price > ema_200
+        is_bull_market = self.is_bull_market[idx]
         
         if action == 1: # Buying
             if is_bull_market:
@@ -161,7 +196,7 @@ class TradingEnv(gym.Env):
         elif self.shares_held > 0 and not is_bull_market:
             reward -= 0.01 # Small cost for "holding underwater" in bear market        
         # 4. Volatility Filter: Penalize if BB is too narrow (Low Volatility)
-        bb_width = (self.df.iat[idx, self.df.columns.get_loc('BBU_20_2.0')] - self.df.iat[idx, self.df.columns.get_loc('BBL_20_2.0')]) / current_price
+        bb_width = self.bb_width[idx]
         if (action == 1 or action == 2) and bb_width < 0.01: # Less than 1% width
             reward -= self.vol_penalty # Don't trade in a flat market
 
@@ -223,8 +258,8 @@ class TradingEnv(gym.Env):
             done = True
         
         # --- Reward Calculation (Nivel Pro) ---
-        idx_new = min(self.current_step, len(self.df) - 1)
-        next_price = self.df.iat[idx_new, self.df.columns.get_loc('Close')]
+        idx_new = min(self.current_step, self.end_step)
+        next_price = float(self.close_prices[idx_new])
         new_net_worth = self.balance + (self.shares_held * next_price)
         
         step_return = (new_net_worth - self.net_worth) / self.net_worth
@@ -4,6 +4,9 @@ from stable_baselines3 import PPO
 from stable_baselines3.common.vec_env import DummyVecEnv
 from stable_baselines3.common.callbacks import CheckpointCallback
 from trading_env import TradingEnv
+from vec_trading_env import VecTradingEnv, rollout_n_steps
+
+N_ENVS = 8 # Parallel training episodes (one batched NumPy step)
 
 def train_agent():
     print("🚀 Starting Professional Agent Training...")
@@ -23,7 +26,7 @@ def train_agent():
     print(f"📊 Data Split: Train={len(df_train)} rows, Val={len(df_val)} rows")
 
     # 2. Create the Environments
-    env_train = DummyVecEnv([lambda: TradingEnv(df_train)])
+    env_train = VecTradingEnv(df_train, n_envs=N_ENVS)
     env_val = DummyVecEnv([lambda: TradingEnv(df_val)])
     
     # 3. Define Model (PPO - Actor Critic)
@@ -38,13 +41,13 @@ def train_agent():
         env_val, 
         best_model_save_path=f'./models/best_{model_name}',
         log_path=log_dir, 
-        eval_freq=10000,
+        eval_freq=10000 // N_ENVS,
         deterministic=True, 
         render=False
     )
     
     checkpoint_callback = CheckpointCallback(
-        save_freq=50000, 
+        save_freq=50000 // N_ENVS, 
         save_path='./models/', 
         name_prefix=model_name
     )
@@ -59,7 +62,7 @@ def train_agent():
         verbose=1, 
         tensorboard_log=log_dir,
         learning_rate=0.0001,
-        n_steps=2048,
+        n_steps=rollout_n_steps(2048, N_ENVS), # 2048 transitions per update across the N_ENVS episodes
         batch_size=64,
         gamma=0.99,
         ent_coef=0.05, # High Exploration
@@ -4,6 +4,9 @@ from stable_baselines3 import PPO
 from stable_baselines3.common.vec_env import DummyVecEnv
 from stable_baselines3.common.callbacks import EvalCallback
 from trading_env import TradingEnv
+from vec_trading_env import VecTradingEnv, rollout_n_steps
+
+N_ENVS = 8 # Parallel training episodes (one batched NumPy step)
 
 def train_phase7_evolution():
     print("🚀 Iniciando Fase 7: Evolución Técnica y Filtro de Tendencia (EMA 200 + Trailing Stop)...")
@@ -21,7 +24,7 @@ def train_phase7_evolution():
     df_val = df.iloc[split_idx:]
     
     # Entorno con fricción institucional
-    env_train = DummyVecEnv([lambda: TradingEnv(df_train, commission=0.0005)])
+    env_train = VecTradingEnv(df_train, n_envs=N_ENVS, commission=0.0005)
     env_val = DummyVecEnv([lambda: TradingEnv(df_val, commission=0.0005)])
 
     # 2. CARGAR CEREBRO MAESTRO (Phase 6.1 FIXED)
@@ -33,7 +36,8 @@ def train_phase7_evolution():
     print(f"📥 Evolucionando cerebro FIXED: {model_path}")
     
     # Cargamos el modelo
-    model = PPO.load(model_path, env=env_train)
+    # Phase 6 trained with PPO's default rollout (2048 steps, one env): same rollout across N_ENVS
+    model = PPO.load(model_path, env=env_train, n_steps=rollout_n_steps(2048, N_ENVS))
     
     # 3. HIPERPARÁMETROS DE ESPECIALIZACIÓN (Fine-Tuning)
     model.learning_rate = 0.00002 # Aún más lento para no romper la disciplina previa
@@ -49,7 +53,7 @@ def train_phase7_evolution():
         env_val, 
         best_model_save_path='./models/BTC/best_ppo_btc_phase7',
         log_path=log_dir, 
-        eval_freq=10000,
+        eval_freq=10000 // N_ENVS,
         deterministic=True
     )
     
@@ -13,6 +13,9 @@ from stable_baselines3.common.callbacks import CheckpointCallback, EvalCallback
 
 # Import custom environment
 from trading_env import TradingEnv
+from vec_trading_env import PPO_DEFAULT_N_STEPS, VecTradingEnv, rollout_n_steps
+from shared_market_data import SharedMarketData
+from policy_export import export_policy, exported_policy_path
 # Import new configuration system
 from config import get_asset_config
 
@@ -32,7 +35,8 @@ def load_hyperparams(symbol_name: str) -> Dict[str, Any]:
         print("⚠️⚠️ ALERTA: No se encontraron hiperparámetros. Usando valores por defecto de PPO.")
         return {}
 
-def train_production_asset(symbol_name: str, total_timesteps: Optional[int] = None):
+def train_production_asset(symbol_name: str, total_timesteps: Optional[int] = None, n_envs: int = 8,
+                           subproc: bool = False):
     symbol_name = symbol_name.upper()
     print(f"\n🚀 Iniciando Entrenamiento de PRODUCCIÓN para {symbol_name}...")
     
@@ -66,11 +70,21 @@ def train_production_asset(symbol_name: str, total_timesteps: Optional[int] = No
 
     # 3. Environment Setup
     # Create the training environment with asset-specific parameters
-    env_train = DummyVecEnv([lambda: TradingEnv(df_train, **config.env_params)])
+    shared_data = None
+    if subproc:
+        # One TradingEnv per worker process, all attached to one shared copy of the features
+        shared_data = SharedMarketData(df_train)
+        env_train = SubprocVecEnv(shared_data.make_env_fns(n_envs, **config.env_params))
+    else:
+        # n_envs episodes simulated in one batched NumPy step
+        env_train = VecTradingEnv(df_train, n_envs=n_envs, **config.env_params)
     env_val = DummyVecEnv([lambda: TradingEnv(df_val, **config.env_params)])
 
     # 4. Hyperparameters & Model Setup
     hyperparams = load_hyperparams(symbol_name)
+    # The tuned n_steps is the rollout of one env: split it across the batched episodes so each
+    # PPO update still sees the same number of transitions
+    hyperparams["n_steps"] = rollout_n_steps(hyperparams.get("n_steps", PPO_DEFAULT_N_STEPS), n_envs)
     
     # Define paths for saving
     models_dir = f"models/PRODUCTION/{symbol_name}"
@@ -107,9 +121,9 @@ def train_production_asset(symbol_name: str, total_timesteps: Optional[int] = No
         model = PPO("MlpPolicy", env=env_train, verbose=1, device="cuda", tensorboard_log=log_dir, **hyperparams)
 
     # 5. Callbacks
-    # Save a checkpoint every 50k steps
+    # Save a checkpoint every 50k steps (callback frequencies count vectorized steps of n_envs transitions)
     checkpoint_callback = CheckpointCallback(
-        save_freq=50000, 
+        save_freq=max(50000 // n_envs, 1), 
         save_path=models_dir, 
         name_prefix=f"ppo_{symbol_name.lower()}_ckpt"
     )
@@ -119,7 +133,7 @@ def train_production_asset(symbol_name: str, total_timesteps: Optional[int] = No
         env_val, 
         best_model_save_path=os.path.join(models_dir, "best_model"),
         log_path=log_dir, 
-        eval_freq=10000,
+        eval_freq=max(10000 // n_envs, 1),
         deterministic=True, 
         render=False
     )
@@ -133,16 +147,26 @@ def train_production_asset(symbol_name: str, total_timesteps: Optional[int] = No
         final_path = os.path.join(models_dir, f"ppo_{symbol_name.lower()}_final")
         model.save(final_path)
         print(f"💾 Modelo final guardado en: {final_path}.zip")
+        # Lightweight actor for the live bots (NumPy only, no torch / SB3 at inference)
+        policy_path = export_policy(model, exported_policy_path(final_path + ".zip"), final_path + ".zip")
+        print(f"📦 Política exportada para inferencia en vivo: {policy_path}")
         print("✅ Entrenamiento de producción finalizado.")
         
     except Exception as e:
         print(f"❌ Error crítico durante el entrenamiento: {e}")
+    finally:
+        env_train.close()
+        if shared_data is not None:
+            shared_data.close()
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Train Production Bot")
     parser.add_argument("asset", type=str, help="Asset symbol (BTC, SOL, ETH)")
     parser.add_argument("--steps", type=int, default=None, help="Overide training steps")
+    parser.add_argument("--n-envs", type=int, default=8, help="Parallel episodes in the batched training env")
+    parser.add_argument("--subproc", action="store_true",
+                        help="Run the n_envs episodes in SubprocVecEnv worker processes (shared-memory features)")
     
     args = parser.parse_args()
     
-    train_production_asset(args.asset, args.steps)
+    train_production_asset(args.asset, args.steps, args.n_envs, args.subproc)
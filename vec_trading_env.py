@@ -0,0 +1,288 @@
+"""
+Vectorized Trading Environment
+Simulates N TradingEnv episodes in lockstep with NumPy (SB3 VecEnv compatible)
+"""
+import numpy as np
+from stable_baselines3.common.vec_env.base_vec_env import VecEnv
+
+from trading_env import TradingEnv
+
+PPO_DEFAULT_N_STEPS = 2048
+
+
+def rollout_n_steps(n_steps, n_envs):
+    """
+    PPO n_steps per env that keeps a rollout of n_steps transitions per update with n_envs
+    batched episodes (PPO collects n_steps * n_envs). The tuned hyperparameters
+    (best_hyperparams_*.json) and the scripts' n_steps are single-env rollout sizes.
+    """
+    return max(n_steps // n_envs, 1)
+
+
+class VecTradingEnv(VecEnv):
+    """
+    Batched drop-in for DummyVecEnv([lambda: TradingEnv(df, **env_params)] * n_envs).
+
+    Features are computed once (by a template TradingEnv) and shared by all
+    episodes. Account state (balance, shares_held, entry_price, cooldown,
+    trailing-stop peak, ...) is kept as length-N arrays, so one step() call
+    advances every episode with a handful of vectorized operations.
+
+    start_steps: offset of each episode into the shared feature matrix; it auto-resets
+    to it. By default the first episodes are staggered evenly across the data, so the
+    N rollouts are decorrelated, and every later episode starts at window_size like
+    TradingEnv.
+
+    market_data: precomputed arrays instead of df (e.g. a SharedMarketData handle
+    attached in an Optuna worker), as in TradingEnv.
+    """
+
+    # Per-episode account state (length-N arrays); every other attribute is shared configuration
+    STATE_ATTRS = ('balance', 'net_worth', 'max_net_worth', 'shares_held', 'entry_price',
+                   'highest_price_since_entry', 'total_shares_sold', 'total_trades', 'current_step',
+                   'steps_since_trade', 'steps_since_sell')
+
+    def __init__(self, df=None, n_envs=8, start_steps=None, market_data=None, **env_params):
+        self.template = TradingEnv(df, market_data=market_data, **env_params)
+        t = self.template
+
+        self.data_matrix = t.data_matrix
+        self.close_prices = t.close_prices
+        self.is_bull_market = t.is_bull_market
+        self.bb_width = t.bb_width
+        self.window_size = t.window_size
+        self.end_step = t.end_step
+        self.n_market_features = len(t.obs_cols)
+
+        if start_steps is None:
+            self.start_steps = np.full(n_envs, t.window_size, dtype=np.int64)
+            first_steps = t.window_size + np.arange(n_envs) * (t.end_step - t.window_size + 1) // n_envs
+        else:
+            self.start_steps = first_steps = np.asarray(start_steps, dtype=np.int64)
+        if len(self.start_steps) != n_envs:
+            raise ValueError(f"start_steps has {len(self.start_steps)} entries, expected {n_envs}")
+        if self.start_steps.min() < t.window_size or self.start_steps.max() > t.end_step:
+            raise ValueError(f"start_steps must be within [{t.window_size}, {t.end_step}]")
+        self.first_steps = np.asarray(first_steps, dtype=np.int64)  # Offsets of reset() (first episodes)
+
+        # Window offsets reused to gather every episode's market slice in one indexing op
+        self._window_offsets = np.arange(-t.window_size, 0)
+        self.buf_obs = np.zeros((n_envs, t.window_size, t.n_features), dtype=np.float32)
+        self.actions = np.zeros(n_envs, dtype=np.int64)
+
+        super().__init__(n_envs, t.observation_space, t.action_space)
+        self._reset_state(np.ones(n_envs, dtype=bool), self.first_steps)
+
+    # --- State Management ---
+    def _reset_state(self, mask, steps=None):
+        """Reset the account state of the episodes selected by mask (mirrors TradingEnv.reset)."""
+        n = self.num_envs
+        initial = float(self.template.initial_balance)
+        if not hasattr(self, 'balance'):
+            self.balance = np.zeros(n)
+            self.net_worth = np.zeros(n)
+            self.max_net_worth = np.zeros(n)
+            self.shares_held = np.zeros(n)
+            self.entry_price = np.zeros(n)
+            self.highest_price_since_entry = np.zeros(n)
+            self.total_shares_sold = np.zeros(n, dtype=np.int64)
+            self.total_trades = np.zeros(n, dtype=np.int64)
+            self.current_step = np.zeros(n, dtype=np.int64)
+            self.steps_since_trade = np.zeros(n, dtype=np.int64)
+            self.steps_since_sell = np.zeros(n, dtype=np.int64)
+
+        self.balance[mask] = initial
+        self.net_worth[mask] = initial
+        self.max_net_worth[mask] = initial
+        self.shares_held[mask] = 0.0
+        self.entry_price[mask] = 0.0
+        self.highest_price_since_entry[mask] = 0.0
+        self.total_shares_sold[mask] = 0
+        self.total_trades[mask] = 0
+        self.current_step[mask] = (self.start_steps if steps is None else steps)[mask]
+        self.steps_since_trade[mask] = 0
+        self.steps_since_sell[mask] = self.template.cooldown_steps
+
+    def _write_observations(self, mask=None):
+        """Write the observation of the selected episodes into buf_obs."""
+        envs = np.arange(self.num_envs) if mask is None else np.flatnonzero(mask)
+        steps = self.current_step[envs]
+        n = self.n_market_features
+
+        rows = steps[:, None] + self._window_offsets
+        self.buf_obs[envs, :, :n] = self.data_matrix[rows]
+
+        # Account features (same formula and float32 cleanup as TradingEnv._next_observation)
+        balance_ratio = np.log(self.balance[envs] / self.template.initial_balance + 1e-9)
+        position_ratio = self.shares_held[envs] * self.close_prices[steps - 1] / self.net_worth[envs]
+        with np.errstate(over='ignore'):
+            account = np.nan_to_num(np.stack([balance_ratio, position_ratio], axis=1).astype(np.float32))
+        self.buf_obs[envs, :, n:] = account[:, None, :]
+
+    # --- VecEnv API ---
+    def reset(self):
+        self._reset_state(np.ones(self.num_envs, dtype=bool), self.first_steps)
+        self._write_observations()
+        self._reset_seeds()
+        self._reset_options()
+        return self.buf_obs.copy()
+
+    def step_async(self, actions):
+        self.actions = np.asarray(actions).reshape(self.num_envs).astype(np.int64)
+
+    def step_wait(self):
+        t = self.template
+        action = self.actions.copy()
+        n = self.num_envs
+
+        idx = np.minimum(self.current_step, self.end_step)
+        price = self.close_prices[idx]
+
+        reward = np.zeros(n)
+        penalty = np.zeros(n)
+        zeros = np.zeros(n)
+
+        # 1. Cooldown Logic
+        self.steps_since_sell += 1
+        blocked = (action == 1) & (self.steps_since_sell < t.cooldown_steps)
+        action[blocked] = 0
+        penalty -= np.where(blocked, 0.05, zeros)
+
+        # 2-4. Stop Loss, Trailing Stop and Take-Profit Bonus (open positions only)
+        holding = self.shares_held > 0
+        self.highest_price_since_entry = np.where(
+            holding & (price > self.highest_price_since_entry), price, self.highest_price_since_entry)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            unrealized_pnl = (price - self.entry_price) / self.entry_price
+            peak_drawdown = (self.highest_price_since_entry - price) / self.highest_price_since_entry
+
+        stop_hit = holding & (unrealized_pnl <= -t.stop_loss)
+        action[stop_hit] = 2
+        penalty -= np.where(stop_hit, 0.1, zeros)
+
+        trail_hit = holding & (unrealized_pnl >= t.ts_threshold) & (peak_drawdown >= t.ts_drop)
+        action[trail_hit] = 2
+        reward += np.where(trail_hit, 0.05, zeros)
+
+        reward += np.where(holding & (unrealized_pnl >= 0.05), 0.1, zeros)
+
+        # 5. EMA 200 Trend Filter
+        bull = self.is_bull_market[idx]
+        buying = action == 1
+        reward += np.where(buying, np.where(bull, 0.02, -t.ema_penalty), zeros)
+        reward -= np.where(~buying & holding & ~bull, 0.01, zeros)
+
+        # Volatility Filter
+        trading = (action == 1) | (action == 2)
+        reward -= np.where(trading & (self.bb_width[idx] < 0.01), t.vol_penalty, zeros)
+
+        # --- Action Execution ---
+        invalid_action_penalty = np.zeros(n)
+
+        buy = buying & (self.balance > 10)
+        amount_to_invest = self.balance * t.position_size_pct
+        amount_to_invest = np.where(amount_to_invest < 10, self.balance, amount_to_invest)
+        shares_bought = (amount_to_invest / price) * (1 - t.commission)
+        total_value_before = self.shares_held * self.entry_price
+        new_value = shares_bought * price
+        new_shares = self.shares_held + shares_bought
+        with np.errstate(divide='ignore', invalid='ignore'):
+            new_entry = (total_value_before + new_value) / new_shares
+        self.entry_price = np.where(buy & (new_shares > 0), new_entry, self.entry_price)
+        self.balance = np.where(buy, self.balance - amount_to_invest, self.balance)
+        self.shares_held = np.where(buy, new_shares, self.shares_held)
+        self.highest_price_since_entry = np.where(buy, price, self.highest_price_since_entry)
+        self.total_trades += buy
+        invalid_action_penalty = np.where(buying & ~buy, -0.1, invalid_action_penalty)
+
+        selling = action == 2
+        sell = selling & (self.shares_held > 0)
+        sale_value = (self.shares_held * price) * (1 - t.commission)
+        self.balance = np.where(sell, self.balance + sale_value, self.balance)
+        self.shares_held = np.where(sell, 0.0, self.shares_held)
+        self.entry_price = np.where(sell, 0.0, self.entry_price)
+        self.highest_price_since_entry = np.where(sell, 0.0, self.highest_price_since_entry)
+        self.total_shares_sold += sell
+        self.steps_since_sell[sell] = 0
+        reward += np.where(sell, 0.05, zeros)
+        invalid_action_penalty = np.where(selling & ~sell, -0.1, invalid_action_penalty)
+
+        # Overtrading Friction
+        trade_executed = buy | sell
+        reward -= np.where(trade_executed, 0.01, zeros)
+        self.steps_since_trade = np.where(trade_executed, 0, self.steps_since_trade + 1)
+
+        # Time Management
+        self.current_step += 1
+        done = self.current_step > self.end_step
+
+        # --- Reward Calculation ---
+        next_price = self.close_prices[np.minimum(self.current_step, self.end_step)]
+        new_net_worth = self.balance + (self.shares_held * next_price)
+        step_return = (new_net_worth - self.net_worth) / self.net_worth
+        reward += np.where(step_return < 0, step_return * t.risk_aversion * 100, step_return * 100)
+        reward += (penalty + invalid_action_penalty)
+
+        flat = self.shares_held == 0
+        reward -= np.where(flat & (self.steps_since_trade > 150), 0.005, zeros)
+        reward -= np.where(flat & (self.steps_since_trade > 96), 0.01, zeros)
+
+        self.max_net_worth = np.where(new_net_worth > self.max_net_worth, new_net_worth, self.max_net_worth)
+        drawdown = (self.max_net_worth - new_net_worth) / self.max_net_worth
+        reward -= np.where(drawdown > 0.10, drawdown * 0.5, zeros)
+
+        reward += np.where(done & (new_net_worth > t.initial_balance), 10.0, zeros)
+        self.net_worth = new_net_worth
+
+        blown_up = self.net_worth <= t.initial_balance * 0.5
+        done |= blown_up
+        reward = np.where(blown_up, -100.0, reward)
+
+        infos = [
+            {
+                "net_worth": nw,
+                "max_net_worth": max_nw,
+                "shares_held": shares,
+                "trade_executed": executed,
+                "total_trades": trades,
+                "TimeLimit.truncated": False,
+            }
+            for nw, max_nw, shares, executed, trades in zip(
+                self.net_worth.tolist(), self.max_net_worth.tolist(), self.shares_held.tolist(),
+                trade_executed.tolist(), self.total_trades.tolist())
+        ]
+
+        self._write_observations()
+        if done.any():
+            for i in np.flatnonzero(done):
+                infos[i]["terminal_observation"] = self.buf_obs[i].copy()
+            self._reset_state(done)
+            self._write_observations(done)
+
+        return self.buf_obs.copy(), reward.astype(np.float32), done, infos
+
+    def close(self):
+        pass
+
+    def get_attr(self, attr_name, indices=None):
+        """Per-episode values for STATE_ATTRS; the shared value (stop_loss, spaces, ...) otherwise."""
+        if attr_name in self.STATE_ATTRS:
+            values = getattr(self, attr_name)
+            return [values[i].item() for i in self._get_indices(indices)]
+        return [getattr(self.template, attr_name) for _ in self._get_indices(indices)]
+
+    def set_attr(self, attr_name, value, indices=None):
+        if attr_name in self.STATE_ATTRS:
+            getattr(self, attr_name)[list(self._get_indices(indices))] = value
+            return
+        if sorted(set(self._get_indices(indices))) != list(range(self.num_envs)):
+            raise ValueError(f"{attr_name} is shared by every episode of VecTradingEnv: set it for all indices")
+        setattr(self.template, attr_name, value)
+
+    def env_method(self, method_name, *method_args, indices=None, **method_kwargs):
+        # The template's methods would read its own (unused) account state, not episode i's
+        raise AttributeError(f"VecTradingEnv keeps no TradingEnv per episode to call {method_name}() on; "
+                             f"use get_attr / set_attr for the account state")
+
+    def env_is_wrapped(self, wrapper_class, indices=None):
+        return [False for _ in self._get_indices(indices)]
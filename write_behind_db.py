@@ -0,0 +1,139 @@
+"""
+Write-Behind Database
+TradingDatabase writes (log_trade, update_bot_state) taken off the trading loop: events
+go into an in-memory queue and a writer thread applies them in order, committing each
+burst as one transaction (one fsync for the group instead of one per call)
+"""
+import atexit
+import logging
+import queue
+import threading
+from concurrent.futures import Future
+from datetime import datetime
+
+from trading_database import TradingDatabase
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+class WriteBehindDatabase:
+    """
+    Drop-in for TradingDatabase in the live loop. log_trade / update_bot_state return at
+    once with a Future (the ack): it resolves (trade row id / None) only after the
+    transaction holding the write has committed, so an acknowledged write survives a crash
+    (process, OS or power loss: the writer connection runs with synchronous=FULL).
+    Every other TradingDatabase method is a read: pending writes are flushed first, so
+    reads always see them. close() flushes and stops the writer.
+    """
+
+    def __init__(self, db_path="trading_bot.db", max_batch=256):
+        self.db_path = db_path
+        self.max_batch = max_batch
+        self.reader = TradingDatabase(db_path)  # Creates the tables; serves the reads
+        self.queue = queue.Queue()
+        self.commits = 0
+        self.written = 0
+        self._closed = False
+        self._writer = threading.Thread(target=self._run, name="db-writer", daemon=True)
+        self._writer.start()
+        atexit.register(self.close)  # Normal interpreter exit still flushes
+
+    # --- Writes (queued) ---
+    def _submit(self, method, kwargs):
+        if self._closed:
+            raise RuntimeError("WriteBehindDatabase is closed")
+        ack = Future()
+        self.queue.put((method, kwargs, ack))
+        return ack
+
+    def log_trade(self, symbol, action, **fields):
+        """Queue a trade; returns a Future with the row id once it is committed."""
+        return self._submit("log_trade", {"symbol": symbol, "action": action, **fields})
+
+    def update_bot_state(self, symbol, balance, position, entry_price, wins, losses):
+        """Queue a bot state update (timestamped now, not when it is written)."""
+        return self._submit("update_bot_state", {
+            "symbol": symbol, "balance": balance, "position": position, "entry_price": entry_price,
+            "wins": wins, "losses": losses, "last_update": datetime.now()})
+
+    def flush(self, timeout=None):
+        """Block until everything queued so far is committed (or failed). Returns True if it was."""
+        try:
+            return self._submit("flush", {}).exception(timeout) is None
+        except TimeoutError:
+            return False
+
+    def close(self, timeout=30.0):
+        """Flush with the durability guarantee, then stop the writer and close the connections."""
+        if self._closed:
+            return True
+        drained = self.flush(timeout)
+        self._closed = True
+        self.queue.put(_STOP)
+        self._writer.join(timeout)
+        self.reader.close()
+        atexit.unregister(self.close)
+        return drained
+
+    # --- Reads (see every queued write) ---
+    def __getattr__(self, name):
+        if name == "reader":
+            raise AttributeError(name)
+        attr = getattr(self.reader, name)
+        if not callable(attr):
+            return attr
+
+        def read(*args, **kwargs):
+            self.flush()
+            return attr(*args, **kwargs)
+        return read
+
+    # --- Writer thread ---
+    def _run(self):
+        # The writer's own connection. synchronous=FULL: an acked commit is on disk even after an
+        # OS crash / power loss (WAL + NORMAL only survives process crashes); the group commit
+        # pays that fsync once per burst
+        db = TradingDatabase(self.db_path, synchronous="FULL")
+        try:
+            while True:
+                item = self.queue.get()
+                if item is _STOP:
+                    return
+                batch = [item]
+                # Group commit: everything that queued up while the last commit ran
+                while len(batch) < self.max_batch:
+                    try:
+                        item = self.queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if item is _STOP:
+                        self.queue.put(_STOP)
+                        break
+                    batch.append(item)
+                self._commit(db, batch)
+        finally:
+            db.conn.close()
+
+    def _apply(self, db, method, kwargs):
+        return None if method == "flush" else getattr(db, method)(commit=False, **kwargs)
+
+    def _commit(self, db, batch):
+        try:
+            results = [self._apply(db, method, kwargs) for method, kwargs, _ in batch]
+            db.conn.commit()
+        except Exception as e:
+            db.conn.rollback()
+            if len(batch) > 1:
+                # One bad event must not sink the group: commit them one by one
+                for item in batch:
+                    self._commit(db, [item])
+                return
+            logger.error(f"❌ Error guardando {batch[0][0]} en {self.db_path}: {e}")
+            batch[0][2].set_exception(e)
+            return
+        self.commits += 1
+        self.written += sum(method != "flush" for method, _, _ in batch)
+        for (_, _, ack), result in zip(batch, results):
+            ack.set_result(result)